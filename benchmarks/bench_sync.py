@@ -0,0 +1,266 @@
+"""
+End-to-end benchmarks of the sync against the local Notion and Google Tasks stub
+servers of tests/stubs. Runs offline.
+
+Usage:
+    python -m benchmarks.bench_sync [--sizes 100 1000 10000] [--engine sync|async]
+                                    [--latency SECONDS] [--rate-limit-every N]
+                                    [--json PATH] [--show-output]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from rich.console import Console
+from rich.table import Table
+
+from services.sync_notion_google_task.async_syncer import (
+    AsyncNotionToGoogleTaskSyncer,
+)
+from services.sync_notion_google_task.main import NotionToGoogleTaskSyncer
+from tests.stubs import GoogleTasksStubServer, NotionStubServer
+from tests.stubs.environment import build_stub_syncer
+
+DEFAULT_SIZES = [100, 1000, 10000]
+TAGS = ["Work", "Home", "Errands", "Health", "Learning"]
+# Share of the synced tasks completed in Google Tasks before the reverse sync
+COMPLETED_SHARE = 0.1
+# Share of tasks created in Google Tasks before the reverse sync
+CREATED_SHARE = 0.05
+
+SYNCER_CLASSES = {
+    "sync": NotionToGoogleTaskSyncer,
+    "async": AsyncNotionToGoogleTaskSyncer,
+}
+
+
+def seed_notion(notion_stub: NotionStubServer, size: int, seed: int = 0) -> None:
+    """Fills the Notion stub with pages due for today, half of them with a due date."""
+    rng = random.Random(seed)
+    for index in range(size):
+        notion_stub.add_page(
+            f"Benchmark page {index}",
+            tag=TAGS[index % len(TAGS)],
+            due_date=f"2024-01-{rng.randint(1, 28):02d}" if index % 2 else None,
+            importance=rng.choice([None, "Low", "Medium", "High"]),
+            text=f"Notes of page {index}",
+        )
+
+
+def change_google_tasks(google_stub: GoogleTasksStubServer, size: int) -> None:
+    """Completes and creates tasks in the Google Tasks stub, as a user would."""
+    tasks = [
+        task
+        for tasklist_tasks in google_stub.tasks.values()
+        for task in tasklist_tasks.values()
+    ]
+    now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    for task in tasks[: int(size * COMPLETED_SHARE)]:
+        task.update(status="completed", completed=now, updated=now)
+    tasklist_ids = list(google_stub.tasklists)
+    for index in range(int(size * CREATED_SHARE)):
+        google_stub.add_task(
+            tasklist_ids[index % len(tasklist_ids)], f"Created in Google {index}"
+        )
+
+
+def measure(
+    phase: str,
+    run: Callable[[], None],
+    notion_stub: NotionStubServer,
+    google_stub: GoogleTasksStubServer,
+    show_output: bool,
+) -> Dict:
+    """
+    Runs a sync phase, measuring its wall time, the requests received by the stub
+    servers and the peak of memory allocated meanwhile.
+    """
+    notion_before = notion_stub.http_requests
+    google_before = google_stub.http_requests
+    google_calls_before = sum(google_stub.request_counts.values())
+    rate_limited_before = (
+        notion_stub.rate_limited_count + google_stub.rate_limited_count
+    )
+
+    output = contextlib.nullcontext() if show_output else open(os.devnull, "w")
+    tracemalloc.start()
+    started = time.perf_counter()
+    with output as devnull, contextlib.redirect_stdout(devnull or sys.stdout):
+        run()
+    wall_seconds = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "phase": phase,
+        "wall_seconds": round(wall_seconds, 3),
+        "notion_requests": notion_stub.http_requests - notion_before,
+        "google_requests": google_stub.http_requests - google_before,
+        "google_calls": sum(google_stub.request_counts.values()) - google_calls_before,
+        "rate_limited": notion_stub.rate_limited_count
+        + google_stub.rate_limited_count
+        - rate_limited_before,
+        "peak_memory_mb": round(peak_memory / 2**20, 1),
+    }
+
+
+def run_size(size: int, args: argparse.Namespace) -> List[Dict]:
+    """
+    Benchmarks a database of the given size:
+    - pages_to_google: the first sync, creating a task for every page.
+    - pages_to_google_unchanged: the next sync, with nothing to change.
+    - google_to_notion: the reverse sync after tasks were completed and created.
+    """
+    stub_options = {
+        "latency": args.latency,
+        "rate_limit_every": args.rate_limit_every,
+    }
+    syncer_class = SYNCER_CLASSES[args.engine]
+    results = []
+    with NotionStubServer(**stub_options) as notion_stub, GoogleTasksStubServer(
+        **stub_options
+    ) as google_stub, tempfile.TemporaryDirectory() as project_root:
+        seed_notion(notion_stub, size)
+        last_sync = datetime.utcnow() - timedelta(hours=1)
+
+        def sync_run(
+            sync: Callable[[NotionToGoogleTaskSyncer], None],
+        ) -> Callable[[], None]:
+            def run():
+                # A new syncer per phase, as every run is a new process
+                syncer = build_stub_syncer(
+                    notion_stub,
+                    google_stub,
+                    project_root,
+                    syncer_class=syncer_class,
+                    verbose=False,
+                )
+                try:
+                    sync(syncer)
+                finally:
+                    syncer.close()
+
+            return run
+
+        pages_to_google = sync_run(
+            lambda syncer: syncer.sync_pages_to_google_tasks(
+                last_successful_sync=last_sync
+            )
+        )
+        results.append(
+            measure(
+                "pages_to_google",
+                pages_to_google,
+                notion_stub,
+                google_stub,
+                args.show_output,
+            )
+        )
+        results.append(
+            measure(
+                "pages_to_google_unchanged",
+                pages_to_google,
+                notion_stub,
+                google_stub,
+                args.show_output,
+            )
+        )
+
+        change_google_tasks(google_stub, size)
+        google_to_notion = sync_run(
+            lambda syncer: syncer.sync_google_tasks_to_notion(
+                last_successful_sync=last_sync
+            )
+        )
+        results.append(
+            measure(
+                "google_to_notion",
+                google_to_notion,
+                notion_stub,
+                google_stub,
+                args.show_output,
+            )
+        )
+
+    for result in results:
+        result["size"] = size
+        result["engine"] = args.engine
+    return results
+
+
+def print_results(results: List[Dict]) -> None:
+    table = Table(title="Sync benchmarks")
+    columns = [
+        ("size", "Pages"),
+        ("phase", "Phase"),
+        ("wall_seconds", "Wall (s)"),
+        ("notion_requests", "Notion req."),
+        ("google_requests", "Google req."),
+        ("google_calls", "Google calls"),
+        ("rate_limited", "429s"),
+        ("peak_memory_mb", "Peak mem. (MB)"),
+    ]
+    for key, header in columns:
+        if key == "phase":
+            table.add_column(header, no_wrap=True)
+        else:
+            table.add_column(header, justify="right")
+    for result in results:
+        table.add_row(*(str(result[key]) for key, _ in columns))
+    # Piped output defaults to 80 columns, too narrow for the table
+    Console(width=max(Console().width, 110)).print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the sync against local Notion and Google Tasks stubs."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Numbers of Notion pages to benchmark (default: 100 1000 10000).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=sorted(SYNCER_CLASSES),
+        default="sync",
+        help="Sync engine to benchmark (default: sync).",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Latency added by the stub servers to every request, in seconds.",
+    )
+    parser.add_argument(
+        "--rate-limit-every",
+        type=int,
+        default=0,
+        help="Answer every Nth request with a 429 (default: 0, disabled).",
+    )
+    parser.add_argument("--json", type=str, help="Write the results to this JSON file.")
+    parser.add_argument(
+        "--show-output",
+        action="store_true",
+        help="Show the output of the syncer instead of discarding it.",
+    )
+    args = parser.parse_args()
+
+    results: List[Dict] = []
+    for size in args.sizes:
+        results.extend(run_size(size, args))
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=2)
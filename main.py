@@ -1,10 +1,21 @@
 import argparse
+import contextlib
 import os
 from datetime import datetime
 from typing import List, Optional
 
-from services.sync_notion_google_task.main import NotionToGoogleTaskSyncer
+from rich.console import Console
 
+from services.common.profiling import RunProfiler
+from services.common.tracing import Tracer
+from services.notion.src.notion_client import NotionClient
+from services.notion.src.rate_limiter import TokenBucketRateLimiter
+from services.sync_notion_google_task.async_syncer import (
+    AsyncNotionToGoogleTaskSyncer,
+)
+from services.sync_notion_google_task.journal import SyncJournal
+from services.sync_notion_google_task.main import NotionToGoogleTaskSyncer
+from services.sync_notion_google_task.planner import SyncPlanner
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -31,7 +42,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "--page-id",
         type=str,
-        help="ID of the Notion page to sync. When provided, automatically sets mode to 'single'.",
+        help="ID of the Notion page to sync, or its unique task ID. When provided, automatically sets mode to 'single'.",
     )
     parser.add_argument(
         "--page-title",
@@ -43,6 +54,59 @@ if __name__ == "__main__":
         action="store_true",
         help="Skip syncing Google Tasks to Notion (useful for webhook processing).",
     )
+    parser.add_argument(
+        "--engine",
+        choices=["sync", "async", "plan"],
+        default="sync",
+        help="Sync engine: 'sync' runs every call in sequence, 'async' overlaps the Notion and Google Tasks calls and processes task lists concurrently, 'plan' computes every operation first and executes them grouped by type.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the sync plan without executing it. Implies --engine plan.",
+    )
+    parser.add_argument(
+        "--plan-file",
+        type=str,
+        help="Write the sync plan to this JSON file. Implies --engine plan.",
+    )
+    parser.add_argument(
+        "--tasklist-workers",
+        type=int,
+        help="Number of Google task lists synced to Notion in parallel (default: 1, or 4 with --engine async).",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=str,
+        help="Write the outbound request metrics of the run to this JSON file.",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        type=str,
+        help="Write the outbound request metrics of the run to this Prometheus textfile.",
+    )
+    parser.add_argument(
+        "--trace-file",
+        type=str,
+        help="Write the spans of the sync phases to this JSON file, in the Chrome trace format (open it in chrome://tracing or ui.perfetto.dev).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run with cProfile and tracemalloc, writing a .prof file and an allocation report to --profile-dir.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=str,
+        default=".",
+        help="Directory of the --profile reports (default: current directory).",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=20,
+        help="Number of functions and allocation sites reported by --profile (default: 20).",
+    )
 
     args = parser.parse_args()
 
@@ -50,6 +114,9 @@ if __name__ == "__main__":
     if args.page_id is not None:
         args.mode = "single"
 
+    if args.dry_run or args.plan_file:
+        args.engine = "plan"
+
     # Validate arguments
     if args.mode == "single" and args.page_id is None:
         parser.error("--page-id is required when --mode=single")
@@ -61,23 +128,57 @@ if __name__ == "__main__":
     free_mobile_user_id = os.getenv("FREE_MOBILE_USER_ID")
     free_mobile_api_key = os.getenv("FREE_MOBILE_API_KEY")
     last_successful_sync = os.getenv("LAST_SUCCESSFUL_SYNC")
+    # Optional: share the Notion rate limit between runs on the same machine.
+    # Empty values, as left by .env_template, count as unset.
+    notion_rate_limit = os.getenv("NOTION_RATE_LIMIT") or NotionClient.RATE_LIMIT
+    notion_rate_burst = os.getenv("NOTION_RATE_BURST") or NotionClient.RATE_BURST
+    notion_rate_lock_file = os.getenv("NOTION_RATE_LOCK_FILE") or None
+    try:
+        notion_rate_limit = float(notion_rate_limit)
+    except ValueError:
+        parser.error(f"NOTION_RATE_LIMIT must be a number, got '{notion_rate_limit}'")
+    try:
+        notion_rate_burst = int(notion_rate_burst)
+    except ValueError:
+        parser.error(f"NOTION_RATE_BURST must be an integer, got '{notion_rate_burst}'")
+    if notion_rate_limit <= 0:
+        parser.error("NOTION_RATE_LIMIT must be positive")
+    if notion_rate_burst < 1:
+        parser.error("NOTION_RATE_BURST must be at least 1")
 
     assert notion_api_key, "NOTION_API environment variable is required."
     assert database_id, "DATABASE_ID environment variable is required."
     assert token_path, "TOKEN_PATH environment variable is required."
     assert project_root, "PROJECT_ROOT environment variable is required."
-    
+
     # Last successful sync is optional when processing a single page
     if args.mode == "full":
         assert (
             last_successful_sync
         ), "LAST_SUCCESSFUL_SYNC environment variable is required for full sync mode."
-        last_successful_sync = datetime.fromisoformat(last_successful_sync.replace("Z", ""))
-    
+        last_successful_sync = datetime.fromisoformat(
+            last_successful_sync.replace("Z", "")
+        )
+
     assert free_mobile_user_id, "FREE_MOBILE_USER_ID environment variable is required."
     assert free_mobile_api_key, "FREE_MOBILE_API_KEY environment variable is required."
 
-    syncer = NotionToGoogleTaskSyncer(
+    if args.tasklist_workers is not None and args.tasklist_workers < 1:
+        parser.error("--tasklist-workers must be at least 1")
+    if args.profile_top < 1:
+        parser.error("--profile-top must be at least 1")
+
+    syncer_options = {}
+    if args.tasklist_workers is not None:
+        syncer_options["tasklist_workers"] = args.tasklist_workers
+    if args.trace_file:
+        syncer_options["tracer"] = Tracer()
+    syncer_class = (
+        AsyncNotionToGoogleTaskSyncer
+        if args.engine == "async"
+        else NotionToGoogleTaskSyncer
+    )
+    syncer = syncer_class(
         notion_api_key=notion_api_key,
         database_id=database_id,
         project_root=project_root,
@@ -85,19 +186,74 @@ if __name__ == "__main__":
         sms_user=free_mobile_user_id,
         sms_password=free_mobile_api_key,
         verbose=args.verbose,
+        notion_rate_limiter=TokenBucketRateLimiter(
+            rate=notion_rate_limit,
+            burst=notion_rate_burst,
+            lock_file=notion_rate_lock_file,
+        ),
+        **syncer_options,
     )
 
-    if args.mode == "single":
-        # Process a single page
-        print(f"Processing single Notion page (ID: {args.page_id})")
-        # Use a list with the specific page ID
-        syncer.sync_pages_to_google_tasks(
-            single_page_id=args.page_id,
-        )
-    else:
-        # Full synchronization
-        print("Processing full database synchronization")
-        syncer.sync_pages_to_google_tasks(last_successful_sync=last_successful_sync)
-        
-        if not args.skip_google_to_notion:
-            syncer.sync_google_tasks_to_notion(last_successful_sync=last_successful_sync)
+    profiler = (
+        RunProfiler(args.profile_dir, top=args.profile_top)
+        if args.profile
+        else contextlib.nullcontext()
+    )
+    try:
+        with profiler:
+            if args.engine == "plan":
+                planner = SyncPlanner(
+                    syncer,
+                    journal=SyncJournal(
+                        os.path.join(project_root, ".cache", "sync_journal.jsonl")
+                    ),
+                    dry_run=args.dry_run,
+                )
+                if not args.dry_run:
+                    # Finish the operations of an interrupted run before planning anew
+                    resumed_plan = planner.resume()
+                    if len(resumed_plan):
+                        resumed_plan.print(Console(), verbose=args.verbose)
+                        planner.execute(resumed_plan)
+                plan = planner.plan(
+                    last_successful_sync=(
+                        None if args.mode == "single" else last_successful_sync
+                    ),
+                    single_page_id=args.page_id if args.mode == "single" else None,
+                    google_to_notion=not args.skip_google_to_notion,
+                )
+                plan.print(Console(), verbose=args.verbose)
+                if args.plan_file:
+                    with open(args.plan_file, "w", encoding="utf-8") as plan_file:
+                        plan_file.write(plan.to_json())
+                if not args.dry_run:
+                    planner.execute(plan)
+            elif args.mode == "single":
+                # Process a single page
+                print(f"Processing single Notion page (ID: {args.page_id})")
+                # Use a list with the specific page ID
+                syncer.sync_pages_to_google_tasks(
+                    single_page_id=args.page_id,
+                )
+            else:
+                # Full synchronization
+                print("Processing full database synchronization")
+                syncer.sync_pages_to_google_tasks(
+                    last_successful_sync=last_successful_sync
+                )
+
+                if not args.skip_google_to_notion:
+                    syncer.sync_google_tasks_to_notion(
+                        last_successful_sync=last_successful_sync
+                    )
+    finally:
+        syncer.close()
+        syncer.metrics.print_summary()
+        if args.metrics_json:
+            syncer.metrics.write_json(args.metrics_json)
+        if args.metrics_prom:
+            syncer.metrics.write_prometheus(args.metrics_prom)
+        if args.trace_file:
+            syncer.tracer.write(args.trace_file)
+        if args.profile and profiler.stats is not None:
+            profiler.print_summary()
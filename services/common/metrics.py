@@ -0,0 +1,395 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Status label of requests that got no HTTP response, e.g. timeouts
+NO_RESPONSE = "error"
+
+
+def payload_size(payload: Any) -> int:
+    """
+    Args:
+        payload (Any): A request or response body.
+
+    Returns:
+        int: Its size in bytes, 0 when it is empty or not text.
+    """
+    if isinstance(payload, str):
+        return len(payload.encode("utf-8"))
+    if isinstance(payload, (bytes, bytearray)):
+        return len(payload)
+    return 0
+
+
+@dataclass
+class Observation:
+    """Outcome of a timed request, filled in by the caller before the timing ends."""
+
+    status: Optional[int] = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+
+class Histogram:
+    """
+    Histogram of latencies over fixed buckets. Counts are kept per bucket and made
+    cumulative on export, as Prometheus expects.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Args:
+            buckets (Sequence[float]): Sorted upper bounds of the buckets, in seconds.
+        """
+        self.buckets = tuple(buckets)
+        # The last count is the +Inf bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Adds a latency, in seconds."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile by linear interpolation within its bucket, like
+        Prometheus' histogram_quantile. The +Inf bucket is bounded by the maximum.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            Optional[float]: The estimated latency in seconds, None if empty.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * max(0.0, rank - cumulative) / count
+            cumulative += count
+        return self.max
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        """
+        Returns:
+            List[Tuple[str, int]]: The `le` label and cumulative count of every
+            bucket, "+Inf" last.
+        """
+        bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        cumulative, result = 0, []
+        for bound, count in zip(bounds, self.counts):
+            cumulative += count
+            result.append((bound, cumulative))
+        return result
+
+
+@dataclass
+class EndpointMetrics:
+    """Requests sent to an endpoint of a service."""
+
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    latency: Histogram = field(default_factory=Histogram)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe accounting of the outbound requests of a run, per service and
+    endpoint: count, status codes, retries, bytes sent and received, and a latency
+    histogram.
+
+    Clients time every HTTP attempt with `time`. Calls carried by a batch request
+    are recorded with `observe` without a latency, the batch request itself being
+    timed.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Args:
+            buckets (Sequence[float]): Upper bounds of the latency buckets, in seconds.
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+
+    def observe(
+        self,
+        service: str,
+        endpoint: str,
+        status: Optional[int],
+        seconds: Optional[float] = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        retry: bool = False,
+    ) -> None:
+        """
+        Records a request.
+
+        Args:
+            service (str): Name of the remote service, e.g. "notion".
+            endpoint (str): Name of the endpoint, without IDs.
+            status (Optional[int]): HTTP status code, None if no response was received.
+            seconds (Optional[float]): Latency of the request, None if unknown.
+            bytes_sent (int): Size of the request body.
+            bytes_received (int): Size of the response body.
+            retry (bool): Whether the request is a retry of a failed attempt.
+        """
+        if not isinstance(status, int):
+            status = None
+        with self._lock:
+            metrics = self.endpoints.get((service, endpoint))
+            if metrics is None:
+                metrics = EndpointMetrics(latency=Histogram(self.buckets))
+                self.endpoints[(service, endpoint)] = metrics
+            metrics.requests += 1
+            metrics.retries += int(retry)
+            metrics.errors += int(status is None or status >= 400)
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+            metrics.statuses[NO_RESPONSE if status is None else str(status)] += 1
+            if seconds is not None:
+                metrics.latency.observe(seconds)
+
+    @contextmanager
+    def time(
+        self, service: str, endpoint: str, retry: bool = False
+    ) -> Iterator[Observation]:
+        """
+        Times a request, recording it when the block exits, including on errors.
+
+        Args:
+            service (str): Name of the remote service, e.g. "notion".
+            endpoint (str): Name of the endpoint, without IDs.
+            retry (bool): Whether the request is a retry of a failed attempt.
+
+        Yields:
+            Observation: To be filled with the status and sizes of the request.
+        """
+        observation = Observation()
+        started = time.perf_counter()
+        try:
+            yield observation
+        finally:
+            self.observe(
+                service,
+                endpoint,
+                observation.status,
+                seconds=time.perf_counter() - started,
+                bytes_sent=observation.bytes_sent,
+                bytes_received=observation.bytes_received,
+                retry=retry,
+            )
+
+    def _snapshot(self) -> List[Tuple[Tuple[str, str], EndpointMetrics]]:
+        with self._lock:
+            return sorted(self.endpoints.items())
+
+    def to_dict(self) -> Dict[str, List[Dict]]:
+        """
+        Returns:
+            Dict[str, List[Dict]]: The metrics of every endpoint, JSON serialisable.
+        """
+        endpoints = []
+        for (service, endpoint), metrics in self._snapshot():
+            latency = metrics.latency
+            endpoints.append(
+                {
+                    "service": service,
+                    "endpoint": endpoint,
+                    "requests": metrics.requests,
+                    "retries": metrics.retries,
+                    "errors": metrics.errors,
+                    "statuses": dict(metrics.statuses),
+                    "bytes_sent": metrics.bytes_sent,
+                    "bytes_received": metrics.bytes_received,
+                    "latency": {
+                        "count": latency.count,
+                        "sum": round(latency.sum, 6),
+                        "p50": latency.quantile(0.5),
+                        "p95": latency.quantile(0.95),
+                        "max": round(latency.max, 6),
+                        "buckets": dict(latency.cumulative_counts()),
+                    },
+                }
+            )
+        return {"endpoints": endpoints}
+
+    def to_prometheus(self, prefix: str = "notion2googletasks") -> str:
+        """
+        Renders the metrics in the Prometheus text format, e.g. for the textfile
+        collector of node_exporter.
+
+        Args:
+            prefix (str): Prefix of the metric names.
+
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+        snapshot = self._snapshot()
+
+        def labels(service: str, endpoint: str, **extra: str) -> str:
+            pairs = {"service": service, "endpoint": endpoint, **extra}
+            return ",".join(
+                f'{name}="{_escape_label(str(value))}"' for name, value in pairs.items()
+            )
+
+        lines = [
+            f"# HELP {prefix}_requests_total Outbound requests by status code.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        for (service, endpoint), metrics in snapshot:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(
+                    f"{prefix}_requests_total{{{labels(service, endpoint, status=status)}}} {count}"
+                )
+        lines += [
+            f"# HELP {prefix}_retries_total Outbound requests retrying a failed attempt.",
+            f"# TYPE {prefix}_retries_total counter",
+        ]
+        for (service, endpoint), metrics in snapshot:
+            lines.append(
+                f"{prefix}_retries_total{{{labels(service, endpoint)}}} {metrics.retries}"
+            )
+        lines += [
+            f"# HELP {prefix}_bytes_total Bytes of the outbound request and response bodies.",
+            f"# TYPE {prefix}_bytes_total counter",
+        ]
+        for (service, endpoint), metrics in snapshot:
+            for direction, count in (
+                ("sent", metrics.bytes_sent),
+                ("received", metrics.bytes_received),
+            ):
+                lines.append(
+                    f"{prefix}_bytes_total{{{labels(service, endpoint, direction=direction)}}} {count}"
+                )
+        lines += [
+            f"# HELP {prefix}_request_duration_seconds Latency of the outbound requests.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        for (service, endpoint), metrics in snapshot:
+            latency = metrics.latency
+            for bound, count in latency.cumulative_counts():
+                lines.append(
+                    f"{prefix}_request_duration_seconds_bucket"
+                    f"{{{labels(service, endpoint, le=bound)}}} {count}"
+                )
+            lines.append(
+                f"{prefix}_request_duration_seconds_sum{{{labels(service, endpoint)}}} {latency.sum:.6f}"
+            )
+            lines.append(
+                f"{prefix}_request_duration_seconds_count{{{labels(service, endpoint)}}} {latency.count}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str) -> None:
+        """Writes the metrics to a JSON file."""
+        self._write(path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, path: str) -> None:
+        """Writes the metrics to a Prometheus textfile."""
+        self._write(path, self.to_prometheus())
+
+    @staticmethod
+    def _write(path: str, content: str) -> None:
+        """
+        Writes a file atomically, so that collectors never read a partial file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(content)
+        os.replace(tmp_path, path)
+
+    def print_summary(self, console: Optional[Console] = None) -> None:
+        """
+        Prints a table of the requests of every endpoint.
+
+        Args:
+            console (Optional[Console]): Console to print to. Defaults to one wide
+                                         enough for the table, even when piped.
+        """
+        console = console or Console(width=max(Console().width, 140))
+        snapshot = self._snapshot()
+        if not snapshot:
+            console.print("[yellow]No outbound request was recorded.[/yellow]")
+            return
+
+        table = Table(title="Outbound requests")
+        table.add_column("Service", no_wrap=True)
+        table.add_column("Endpoint", no_wrap=True)
+        for header in (
+            "Requests",
+            "Retries",
+            "Errors",
+            "Sent",
+            "Received",
+            "p50",
+            "p95",
+            "Total",
+        ):
+            table.add_column(header, justify="right")
+        table.add_column("Statuses")
+
+        def duration(seconds: Optional[float]) -> str:
+            return "-" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+        for (service, endpoint), metrics in snapshot:
+            latency = metrics.latency
+            table.add_row(
+                service,
+                endpoint,
+                str(metrics.requests),
+                str(metrics.retries),
+                f"[red]{metrics.errors}[/red]" if metrics.errors else "0",
+                _format_bytes(metrics.bytes_sent),
+                _format_bytes(metrics.bytes_received),
+                duration(latency.quantile(0.5)),
+                duration(latency.quantile(0.95)),
+                f"{latency.sum:.2f} s" if latency.count else "-",
+                " ".join(
+                    f"{status}x{count}"
+                    for status, count in sorted(metrics.statuses.items())
+                ),
+            )
+        console.print(table)
+
+
+def _escape_label(value: str) -> str:
+    """Escapes a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
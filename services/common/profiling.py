@@ -0,0 +1,189 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+# Source files whose functions are reported by print_summary: the Notion client,
+# the Google Tasks manager and the syncer
+FOCUS_PATHS = (
+    "services/notion/src/notion_client.py",
+    "services/google_task/src/retrieve_tasks.py",
+    "services/sync_notion_google_task/",
+)
+
+
+class RunProfiler:
+    """
+    Profiles a run with cProfile and tracemalloc, as a context manager.
+
+    On exit, writes `<name>-<timestamp>.prof`, readable with pstats or snakeviz, and
+    `<name>-<timestamp>-allocations.txt`, the top allocation sites still alive at the
+    end of the run, to output_dir.
+
+    Before Python 3.12, cProfile only sees the thread it is enabled in, so threads
+    started during the run get a profiler of their own, merged into the report.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = ".",
+        name: str = "sync",
+        top: int = 20,
+        focus_paths: Sequence[str] = FOCUS_PATHS,
+    ):
+        """
+        Args:
+            output_dir (str): Directory the reports are written to.
+            name (str): Prefix of the report file names.
+            top (int): Number of functions and allocation sites reported.
+            focus_paths (Sequence[str]): Source paths whose functions print_summary
+                                         reports, matched as substrings.
+        """
+        self.output_dir = output_dir
+        self.top = top
+        self.focus_paths = tuple(focus_paths)
+        timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        prefix = os.path.join(output_dir, f"{name}-{timestamp}")
+        self.profile_path = f"{prefix}.prof"
+        self.allocations_path = f"{prefix}-allocations.txt"
+        self.stats: Optional[pstats.Stats] = None
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_memory = 0
+        self._profiler = cProfile.Profile()
+        self._thread_profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        self._profile_threads = sys.version_info < (3, 12)
+
+    def _profile_thread(self, frame, event, arg):
+        """
+        Installed by threading.setprofile in new threads: replaces itself with a
+        profiler dedicated to the thread on its first event.
+        """
+        profiler = cProfile.Profile()
+        with self._lock:
+            self._thread_profilers.append(profiler)
+        profiler.enable()
+
+    def __enter__(self) -> "RunProfiler":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        if self._profile_threads:
+            threading.setprofile(self._profile_thread)
+        self._started_at = time.perf_counter()
+        self._cpu_started_at = time.process_time()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._profiler.disable()
+        self.wall_seconds = time.perf_counter() - self._started_at
+        self.cpu_seconds = time.process_time() - self._cpu_started_at
+        if self._profile_threads:
+            threading.setprofile(None)
+        snapshot = tracemalloc.take_snapshot()
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        self.stats = pstats.Stats(self._profiler)
+        with self._lock:
+            thread_profilers = list(self._thread_profilers)
+        for profiler in thread_profilers:
+            # Threads that made no call have no stats to merge
+            try:
+                self.stats.add(profiler)
+            except TypeError:
+                continue
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.stats.dump_stats(self.profile_path)
+        self._write_allocations(snapshot)
+
+    def _write_allocations(self, snapshot: tracemalloc.Snapshot) -> None:
+        """Writes the top allocation sites of a snapshot, by size."""
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+        statistics = snapshot.statistics("lineno")
+        with open(self.allocations_path, "w", encoding="utf-8") as report:
+            report.write(
+                f"Peak traced memory: {self.peak_memory / 2**20:.1f} MB\n"
+                f"Top {self.top} allocation sites alive at the end of the run:\n"
+            )
+            for rank, statistic in enumerate(statistics[: self.top], start=1):
+                frame = statistic.traceback[0]
+                report.write(
+                    f"{rank:>3}. {statistic.size / 1024:>10.1f} KB "
+                    f"{statistic.count:>8} blocks  {frame.filename}:{frame.lineno}\n"
+                )
+
+    def hottest_functions(self) -> List[Tuple[str, int, float, float]]:
+        """
+        Returns:
+            List[Tuple[str, int, float, float]]: The `top` functions of the focus
+            paths by cumulative time: their location, number of calls, own time
+            and cumulative time in seconds.
+        """
+        if self.stats is None:
+            return []
+        functions = []
+        for (filename, lineno, function), (
+            _,
+            calls,
+            own,
+            cumulative,
+            _,
+        ) in self.stats.stats.items():
+            path = filename.replace(os.sep, "/")
+            focus = next((focus for focus in self.focus_paths if focus in path), None)
+            if focus is None:
+                continue
+            location = f"{path[path.index(focus):]}:{lineno}({function})"
+            functions.append((location, calls, own, cumulative))
+        functions.sort(key=lambda function: function[3], reverse=True)
+        return functions[: self.top]
+
+    def print_summary(self, console: Optional[Console] = None) -> None:
+        """
+        Prints the wall and CPU time of the run, its hottest functions and where
+        the reports were written. A CPU time well below the wall time means the
+        run mostly waited on I/O.
+
+        Args:
+            console (Optional[Console]): Console to print to.
+        """
+        console = console or Console(width=max(Console().width, 120))
+        table = Table(title=f"Hottest functions (top {self.top} by cumulative time)")
+        table.add_column("Function", no_wrap=True)
+        table.add_column("Calls", justify="right")
+        table.add_column("Own (s)", justify="right")
+        table.add_column("Cumulative (s)", justify="right")
+        for location, calls, own, cumulative in self.hottest_functions():
+            table.add_row(location, str(calls), f"{own:.3f}", f"{cumulative:.3f}")
+        console.print(table)
+        console.print(
+            f"[blue]Wall time: {self.wall_seconds:.2f}s, CPU time: "
+            f"{self.cpu_seconds:.2f}s, peak traced memory: "
+            f"{self.peak_memory / 2**20:.1f} MB[/blue]"
+        )
+        console.print(
+            f"[green]Profile written to {self.profile_path}, allocations to "
+            f"{self.allocations_path}[/green]"
+        )
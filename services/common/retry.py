@@ -0,0 +1,126 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional, TypeVar
+
+from rich import print
+
+T = TypeVar("T")
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Decides whether an attempt should be retried from its result or exception.
+# Returns None to stop, or the minimum delay in seconds (e.g. from Retry-After).
+RetryDecision = Callable[[Optional[object], Optional[BaseException]], Optional[float]]
+
+
+class RetryPolicy:
+    """
+    Retries transient failures with capped exponential backoff and full jitter.
+
+    Callers decide which failures are retryable, so that non-idempotent calls are
+    only retried when the server is known not to have processed them. Attempts are
+    counted per call site in `counters`.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ):
+        """
+        Args:
+            max_attempts (int): Maximum number of attempts, including the first one.
+            base_delay (float): Backoff delay of the first retry in seconds.
+            max_delay (float): Upper bound of the backoff delay in seconds.
+            sleep (Callable[[float], None]): Function used to wait between attempts.
+            jitter (Callable[[float, float], float]): Draws the delay within a range.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._jitter = jitter
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "retries": 0, "failures": 0}
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Args:
+            attempt (int): Number of attempts already made.
+            retry_after (Optional[float]): Minimum delay requested by the server.
+
+        Returns:
+            float: The delay before the next attempt in seconds.
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = self._jitter(0, ceiling)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    def count(self, site: str, counter: str, amount: int = 1) -> None:
+        """Increments a counter of a call site."""
+        with self._lock:
+            self.counters[site][counter] += amount
+
+    def call(self, site: str, func: Callable[[], T], should_retry: RetryDecision) -> T:
+        """
+        Calls func until it succeeds, should_retry declines, or attempts run out.
+
+        Args:
+            site (str): Name of the call site used for the counters.
+            func (Callable[[], T]): The call to attempt.
+            should_retry (RetryDecision): Decides whether an attempt is retried.
+
+        Returns:
+            T: The result of the last attempt.
+
+        Raises:
+            BaseException: The exception of the last attempt, if it raised.
+        """
+        self.count(site, "calls")
+        attempt = 0
+        while True:
+            attempt += 1
+            result, error = None, None
+            try:
+                result = func()
+            except Exception as e:
+                error = e
+
+            retry_after = should_retry(result, error)
+            if retry_after is None or attempt >= self.max_attempts:
+                if retry_after is not None or error is not None:
+                    self.count(site, "failures")
+                if error is not None:
+                    raise error
+                return result
+
+            self.wait(site, attempt, retry_after)
+
+    def wait(
+        self, site: str, attempt: int, retry_after: Optional[float] = None
+    ) -> None:
+        """
+        Counts a retry and sleeps for the backoff delay before the next attempt.
+
+        Args:
+            site (str): Name of the call site used for the counters.
+            attempt (int): Number of attempts already made.
+            retry_after (Optional[float]): Minimum delay requested by the server.
+        """
+        delay = self.backoff(attempt, retry_after)
+        self.count(site, "retries")
+        print(
+            f"[yellow]Transient failure on {site}, retrying in {delay:.1f}s "
+            f"(attempt {attempt + 1}/{self.max_attempts})[/yellow]"
+        )
+        self._sleep(delay)
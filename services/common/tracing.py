@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - optional dependency
+    otel_trace = None
+
+T = TypeVar("T")
+
+
+class Span:
+    """A timed operation of a run, with attributes named as in OpenTelemetry."""
+
+    __slots__ = ("name", "start_ns", "end_ns", "thread_id", "attributes", "_otel_span")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], otel_span: Any = None):
+        self.name = name
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+        self._otel_span = otel_span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Sets an attribute of the span, e.g. the number of items processed."""
+        self.attributes[key] = value
+        if self._otel_span is not None:
+            self._otel_span.set_attribute(key, value)
+
+
+class _NoopSpan:
+    """Span of a disabled tracer, discarding its attributes."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Records the spans of a run and writes them in the Chrome trace event format,
+    which chrome://tracing and https://ui.perfetto.dev open without any exporter.
+
+    Spans nest by thread, as they are opened. When the OpenTelemetry API is
+    installed, every span is also started as an OpenTelemetry span, so that an
+    SDK configured by the caller exports them as well. A disabled tracer records
+    nothing and costs next to nothing.
+    """
+
+    def __init__(self, enabled: bool = True, name: str = "notion2googletasks"):
+        """
+        Args:
+            enabled (bool): Whether spans are recorded.
+            name (str): Name of the process in the trace, and of the OpenTelemetry tracer.
+        """
+        self.enabled = enabled
+        self.name = name
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+        self._thread_names: Dict[int, str] = {}
+        self._origin_ns = time.perf_counter_ns()
+        self._otel_tracer = (
+            otel_trace.get_tracer(name) if enabled and otel_trace is not None else None
+        )
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """
+        Times the enclosed block as a span, recorded even if the block raises.
+
+        Args:
+            name (str): Name of the span, e.g. "notion.parse".
+            **attributes: Attributes of the span.
+
+        Yields:
+            Span: The span, to set attributes on once known.
+        """
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+        if self._otel_tracer is None:
+            span = Span(name, attributes)
+            try:
+                yield span
+            finally:
+                self._finish(span)
+            return
+        with self._otel_tracer.start_as_current_span(
+            name, attributes=attributes
+        ) as otel_span:
+            span = Span(name, attributes, otel_span)
+            try:
+                yield span
+            finally:
+                self._finish(span)
+
+    def iter_spans(
+        self, name: str, iterable: Iterable[T], **attributes: Any
+    ) -> Iterator[T]:
+        """
+        Iterates over a lazy iterable, timing the production of every item as a
+        span, e.g. the pages of a paginated query.
+
+        Args:
+            name (str): Name of the spans.
+            iterable (Iterable[T]): The iterable.
+            **attributes: Attributes of the spans.
+
+        Yields:
+            T: The items of the iterable.
+        """
+        iterator = iter(iterable)
+        index = 0
+        while True:
+            with self.span(name, index=index, **attributes):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+            index += 1
+
+    def _finish(self, span: Span) -> None:
+        span.end_ns = time.perf_counter_ns()
+        with self._lock:
+            self._spans.append(span)
+            if span.thread_id not in self._thread_names:
+                self._thread_names[span.thread_id] = threading.current_thread().name
+
+    @property
+    def spans(self) -> List[Span]:
+        """The finished spans, in the order they ended."""
+        with self._lock:
+            return list(self._spans)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: The spans as complete ("X") events of the Chrome trace
+            event format, with timestamps in microseconds since the tracer started.
+        """
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            thread_names = dict(self._thread_names)
+
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.name}}
+        ]
+        for thread_id, thread_name in thread_names.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                }
+            )
+        for span in sorted(spans, key=lambda span: span.start_ns):
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": (span.start_ns - self._origin_ns) / 1000,
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {
+                        key: (
+                            value
+                            if isinstance(value, (str, int, float, bool))
+                            or value is None
+                            else str(value)
+                        )
+                        for key, value in span.attributes.items()
+                    },
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> None:
+        """
+        Writes the trace to a JSON file.
+
+        Args:
+            path (str): Path of the trace file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
@@ -1,7 +1,10 @@
 import urllib.parse
+from typing import Optional
 
 import requests
 
+from services.common.metrics import MetricsRegistry, payload_size
+
 
 class SMSAPIError(Exception):
     """Base class for SMS API-related errors."""
@@ -38,16 +41,20 @@ class SMSAPI:
 
     BASE_URL = "https://smsapi.free-mobile.fr/sendmsg"
 
-    def __init__(self, user: str, password: str) -> None:
+    def __init__(
+        self, user: str, password: str, metrics: Optional[MetricsRegistry] = None
+    ) -> None:
         """
         Initializes the SMSAPI client.
 
         Args:
             user (str): The user identifier.
             password (str): The password associated with the user account.
+            metrics (Optional[MetricsRegistry]): Registry recording every request sent.
         """
         self.user: str = user
         self.password: str = password
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
 
     def send_sms(self, msg: str) -> None:
         """
@@ -70,8 +77,11 @@ class SMSAPI:
             f"{self.BASE_URL}?user={self.user}&pass={self.password}&msg={encoded_msg}"
         )
 
-        # Send the GET request
-        response: requests.Response = requests.get(url)
+        # Send the GET request, recorded without its query string and credentials
+        with self.metrics.time("free_mobile_sms", "GET /sendmsg") as observation:
+            response: requests.Response = requests.get(url)
+            observation.status = response.status_code
+            observation.bytes_received = payload_size(response.content)
 
         # Handle the response
         self._handle_response(response)
@@ -91,13 +101,9 @@ class SMSAPI:
             ServerError: For HTTP 500 error.
         """
         error_map: dict[int, SMSAPIError] = {
-            400: MissingParameter(
-                "One of the mandatory parameters is missing."
-            ),
+            400: MissingParameter("One of the mandatory parameters is missing."),
             402: TooManySMS("Too many SMS messages sent in a short time."),
-            403: ServiceNotEnabled(
-                "Service not activated, or incorrect login/key."
-            ),
+            403: ServiceNotEnabled("Service not activated, or incorrect login/key."),
             500: ServerError("Server error, please try again later."),
         }
 
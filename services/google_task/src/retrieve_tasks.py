@@ -1,12 +1,60 @@
+import itertools
+import threading
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+import httplib2
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest, HttpRequest, build_http
 
-from services.google_task.src.authentification import (load_credentials,
-                                                       print_token_ttl,
-                                                       refresh_access_token)
+from services.common.metrics import MetricsRegistry, Observation, payload_size
+from services.common.retry import RETRYABLE_STATUS_CODES, RetryPolicy
+from services.google_task.src.authentification import (
+    load_credentials,
+    print_token_ttl,
+    refresh_access_token,
+)
+from services.google_task.src.tasklist_snapshot import TasklistSnapshot
+
+# Statuses answered for a task, or task list, that was deleted
+MISSING_TASK_STATUSES = (404, 410)
+
+
+def is_missing_task_error(error: Optional[BaseException]) -> bool:
+    """
+    Args:
+        error (Optional[BaseException]): The error raised by a task request, if any.
+
+    Returns:
+        bool: Whether the error means that the task, or its task list, was deleted.
+    """
+    return isinstance(error, HttpError) and error.resp.status in MISSING_TASK_STATUSES
+
+
+class _ObservedHttp:
+    """
+    Proxy of an httplib2 connection recording the status and body sizes of the
+    requests sent through it into a metrics observation.
+    """
+
+    def __init__(self, http: Any, observation: Observation):
+        self._http = http
+        self._observation = observation
+
+    def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+        response, content = self._http.request(
+            uri, method, body, headers, *args, **kwargs
+        )
+        self._observation.status = response.status
+        self._observation.bytes_sent += payload_size(body)
+        self._observation.bytes_received += payload_size(content)
+        return response, content
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._http, name)
 
 
 class GoogleTasksManager:
@@ -14,16 +62,90 @@ class GoogleTasksManager:
     A manager class for Google Tasks API to handle task lists, tasks, and subtasks.
     """
 
-    def __init__(self, token_path: str):
+    # Maximum page size allowed by tasks.list
+    TASKS_PAGE_SIZE = 100
+    # Partial response: only the task fields read by the syncer
+    TASK_FIELDS = "id,title,status,completed,updated,due"
+    # Maximum number of calls carried by a single batch request
+    BATCH_SIZE = 50
+
+    def __init__(
+        self,
+        token_path: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        api_endpoint: Optional[str] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
         """
         Initializes the GoogleTasksManager with the provided token path.
 
         Args:
             token_path (str): Path to the token file.
+            retry_policy (Optional[RetryPolicy]): Policy retrying transient failures.
+            api_endpoint (Optional[str]): Root URL of the API, e.g. a local stub
+                                          server. Defaults to the Google endpoint.
+            metrics (Optional[MetricsRegistry]): Registry recording every request sent.
         """
         self.token_path: str = token_path
         self.credentials: Credentials = self._get_credentials()
-        self.service = build("tasks", "v1", credentials=self.credentials)
+        self.api_endpoint = api_endpoint
+        client_options = {"api_endpoint": api_endpoint} if api_endpoint else None
+        self.service = build(
+            "tasks", "v1", credentials=self.credentials, client_options=client_options
+        )
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        # httplib2 connections are not thread-safe: worker threads get their own
+        # connection, and their own request queue, see _thread_http.
+        self._local = threading.local()
+        self._request_ids = itertools.count()
+
+    @property
+    def _queued_requests(self) -> List[Tuple[str, HttpRequest, str, bool]]:
+        """Requests queued by the calling thread: (key, request, call site, idempotent)."""
+        if not hasattr(self._local, "queued_requests"):
+            self._local.queued_requests = []
+        return self._local.queued_requests
+
+    @_queued_requests.setter
+    def _queued_requests(
+        self, queued_requests: List[Tuple[str, HttpRequest, str, bool]]
+    ):
+        self._local.queued_requests = queued_requests
+
+    def _thread_http(self) -> Optional[AuthorizedHttp]:
+        """
+        Returns the HTTP connection requests of the calling thread must be sent with.
+
+        Returns:
+            Optional[AuthorizedHttp]: None on the main thread, where the connection
+            of the service is used, or a connection dedicated to the worker thread.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return None
+        if not hasattr(self._local, "http"):
+            self._local.http = AuthorizedHttp(self.credentials, http=build_http())
+        return self._local.http
+
+    def _observed_execute(
+        self, execute: Callable[..., Any], http: Any, site: str, retry: bool = False
+    ) -> Any:
+        """
+        Calls the execute method of a request or batch through the thread's
+        connection, recording the HTTP request in the metrics registry.
+
+        Args:
+            execute (Callable[..., Any]): The execute method of a request or batch.
+            http (Any): Connection of the request, used on the main thread.
+            site (str): Name of the call site used for the metrics.
+            retry (bool): Whether the request is a retry of a failed attempt.
+
+        Returns:
+            Any: The result of execute.
+        """
+        http = self._thread_http() or http
+        with self.metrics.time("google_tasks", site, retry=retry) as observation:
+            return execute(http=_ObservedHttp(http, observation))
 
     def _get_credentials(self) -> Credentials:
         """
@@ -35,6 +157,56 @@ class GoogleTasksManager:
         credentials = load_credentials(self.token_path)
         return refresh_access_token(credentials, self.token_path)
 
+    def _execute(self, request: HttpRequest, site: str, idempotent: bool = True) -> Any:
+        """
+        Executes a request, retrying transient failures with the retry policy.
+
+        Args:
+            request (HttpRequest): The request to execute.
+            site (str): Name of the call site used for the retry counters.
+            idempotent (bool): Whether the request can safely be sent more than once.
+
+        Returns:
+            Any: The response of the request.
+        """
+        attempts = itertools.count(1)
+        return self.retry_policy.call(
+            site,
+            lambda: self._observed_execute(
+                request.execute, request.http, site, retry=next(attempts) > 1
+            ),
+            lambda response, error: self._retry_delay(error, idempotent),
+        )
+
+    @staticmethod
+    def _retry_delay(
+        error: Optional[BaseException], idempotent: bool
+    ) -> Optional[float]:
+        """
+        Decides whether a failed request should be retried.
+
+        Args:
+            error (Optional[BaseException]): The error raised by the request, if any.
+            idempotent (bool): Whether the request can safely be sent more than once.
+
+        Returns:
+            Optional[float]: None to give up, or the minimum delay before retrying.
+        """
+        if isinstance(error, HttpError):
+            status = error.resp.status
+            if status == 429:
+                # Rate limited requests were not processed and are always safe to retry
+                try:
+                    return float(error.resp.get("retry-after", 0))
+                except (TypeError, ValueError):
+                    return 0.0
+            if status in RETRYABLE_STATUS_CODES and idempotent:
+                return 0.0
+            return None
+        if isinstance(error, (TimeoutError, ConnectionError, httplib2.HttpLib2Error)):
+            return 0.0 if idempotent else None
+        return None
+
     def list_task_lists(self) -> Dict[str, str]:
         """
         Lists all task lists.
@@ -44,7 +216,9 @@ class GoogleTasksManager:
         """
         try:
             print_token_ttl(self.credentials)
-            tasklists = self.service.tasklists().list().execute()
+            tasklists = self._execute(
+                self.service.tasklists().list(), "tasks.tasklists.list"
+            )
             return {tl["title"]: tl["id"] for tl in tasklists.get("items", [])}
         except Exception as e:
             raise Exception(f"Error listing task lists: {e}")
@@ -61,8 +235,10 @@ class GoogleTasksManager:
         """
         try:
             tasklist = {"title": task_list_name}
-            created_tasklist = (
-                self.service.tasklists().insert(body=tasklist).execute()
+            created_tasklist = self._execute(
+                self.service.tasklists().insert(body=tasklist),
+                "tasks.tasklists.insert",
+                idempotent=False,
             )
             return {
                 "title": created_tasklist["title"],
@@ -71,6 +247,37 @@ class GoogleTasksManager:
         except Exception as e:
             raise Exception(f"Error creating task list: {e}")
 
+    def iter_tasks(self, tasklist_id: str, **list_params: Any) -> Iterator[Dict]:
+        """
+        Iterates over all tasks of a task list, following `nextPageToken` and
+        requesting only the fields listed in TASK_FIELDS.
+
+        Args:
+            tasklist_id (str): ID of the task list.
+            **list_params: Extra parameters for tasks.list (showCompleted, updatedMin...).
+
+        Yields:
+            dict: Each task resource.
+        """
+        page_token: Optional[str] = None
+        while True:
+            params = dict(
+                tasklist=tasklist_id,
+                maxResults=self.TASKS_PAGE_SIZE,
+                fields=f"nextPageToken,items({self.TASK_FIELDS})",
+                **list_params,
+            )
+            if page_token:
+                params["pageToken"] = page_token
+            response = self._execute(
+                self.service.tasks().list(**params), "tasks.tasks.list"
+            )
+            yield from response.get("items", [])
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
     def list_tasks_in_tasklist(
         self, tasklist_id: str, include_completed: bool = True
     ) -> Dict[str, Dict[str, Any]]:
@@ -85,14 +292,10 @@ class GoogleTasksManager:
             dict: A dictionary with task titles as keys and task details as values.
         """
         try:
-            tasks = (
-                self.service.tasks()
-                .list(
-                    tasklist=tasklist_id,
-                    showCompleted=include_completed,
-                    showHidden=include_completed,
-                )
-                .execute()
+            tasks = self.iter_tasks(
+                tasklist_id,
+                showCompleted=include_completed,
+                showHidden=include_completed,
             )
             return {
                 task.get("title", "No Title"): {
@@ -100,11 +303,28 @@ class GoogleTasksManager:
                     "status": task.get("status"),
                     "completed": task.get("completed"),
                 }
-                for task in tasks.get("items", [])
+                for task in tasks
             }
         except Exception as e:
             raise Exception(f"Error listing tasks in task list: {e}")
 
+    def get_tasklist_snapshot(self, tasklist_id: str) -> TasklistSnapshot:
+        """
+        Lists all tasks of a task list once, completed and hidden ones included.
+
+        Args:
+            tasklist_id (str): ID of the task list.
+
+        Returns:
+            TasklistSnapshot: The tasks, from which the created, completed and
+                              active views are derived.
+        """
+        try:
+            tasks = self.iter_tasks(tasklist_id, showCompleted=True, showHidden=True)
+            return TasklistSnapshot(tasklist_id, tasks)
+        except Exception as e:
+            raise Exception(f"Error listing tasks in task list: {e}")
+
     def create_task(
         self,
         tasklist_id: str,
@@ -125,29 +345,47 @@ class GoogleTasksManager:
             dict: Details of the created task.
         """
         try:
-            task_body = {"title": task_title, "notes": task_notes}
-            if due_date:
-                if isinstance(due_date, datetime):
-                    due_date = (
-                        due_date.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
-                    )  # Convert datetime to RFC 3339
-                elif not isinstance(due_date, str):
-                    raise ValueError(
-                        "due_date must be a datetime object or an ISO 8601 formatted string"
-                    )
-                task_body["due"] = due_date
-            response = (
-                self.service.tasks()
-                .insert(tasklist=tasklist_id, body=task_body)
-                .execute()
+            task_body = self._build_task_body(task_title, task_notes, due_date)
+            response = self._execute(
+                self.service.tasks().insert(tasklist=tasklist_id, body=task_body),
+                "tasks.tasks.insert",
+                idempotent=False,
             )
             return response
         except Exception as e:
             raise Exception(f"Error creating task: {e}")
 
-    def get_task_details(
-        self, tasklist_id: str, task_id: str
+    @staticmethod
+    def _build_task_body(
+        task_title: str,
+        task_notes: Optional[str] = None,
+        due_date: Optional[datetime] = None,
     ) -> Dict[str, Any]:
+        """
+        Builds the request body of a new task.
+
+        Args:
+            task_title (str): Title of the task.
+            task_notes (Optional[str]): Notes for the task (optional).
+            due_date (Optional[datetime]): Due date as a datetime object or RFC 3339 string (optional).
+
+        Returns:
+            dict: The task resource body.
+        """
+        task_body = {"title": task_title, "notes": task_notes}
+        if due_date:
+            if isinstance(due_date, datetime):
+                due_date = (
+                    due_date.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+                )  # Convert datetime to RFC 3339
+            elif not isinstance(due_date, str):
+                raise ValueError(
+                    "due_date must be a datetime object or an ISO 8601 formatted string"
+                )
+            task_body["due"] = due_date
+        return task_body
+
+    def get_task_details(self, tasklist_id: str, task_id: str) -> Dict[str, Any]:
         """
         Fetches details of a specific task.
 
@@ -159,8 +397,9 @@ class GoogleTasksManager:
             dict: Details of the task.
         """
         try:
-            task = (
-                self.service.tasks().get(tasklist=tasklist_id, task=task_id).execute()
+            task = self._execute(
+                self.service.tasks().get(tasklist=tasklist_id, task=task_id),
+                "tasks.tasks.get",
             )
             return {
                 "title": task.get("title", "No Title"),
@@ -185,16 +424,15 @@ class GoogleTasksManager:
             bool: True if the task was successfully deleted.
         """
         try:
-            self.service.tasks().delete(
-                tasklist=tasklist_id, task=task_id
-            ).execute()
+            self._execute(
+                self.service.tasks().delete(tasklist=tasklist_id, task=task_id),
+                "tasks.tasks.delete",
+            )
             return True
         except Exception as e:
             raise Exception(f"Error deleting task: {e}")
 
-    def mark_task_completed(
-        self, tasklist_id: str, task_id: str
-    ) -> Dict[str, Any]:
+    def mark_task_completed(self, tasklist_id: str, task_id: str) -> Dict[str, Any]:
         """
         Marks a specific task as completed.
 
@@ -206,14 +444,13 @@ class GoogleTasksManager:
             dict: Details of the updated task.
         """
         try:
-            return (
-                self.service.tasks()
-                .patch(
+            return self._execute(
+                self.service.tasks().patch(
                     tasklist=tasklist_id,
                     task=task_id,
                     body={"status": "completed"},
-                )
-                .execute()
+                ),
+                "tasks.tasks.patch",
             )
         except Exception as e:
             raise Exception(f"Error marking task as completed: {e}")
@@ -245,20 +482,19 @@ class GoogleTasksManager:
                 "notes": subtask_notes,
                 "due": due_date,
             }
-            created_task = (
-                self.service.tasks()
-                .insert(tasklist=tasklist_id, body=subtask_body)
-                .execute()
+            created_task = self._execute(
+                self.service.tasks().insert(tasklist=tasklist_id, body=subtask_body),
+                "tasks.tasks.insert",
+                idempotent=False,
             )
 
-            return (
-                self.service.tasks()
-                .move(
+            return self._execute(
+                self.service.tasks().move(
                     tasklist=tasklist_id,
                     task=created_task["id"],
                     parent=parent_task_id,
-                )
-                .execute()
+                ),
+                "tasks.tasks.move",
             )
         except Exception as e:
             raise Exception(f"Error creating subtask: {e}")
@@ -277,15 +513,11 @@ class GoogleTasksManager:
             dict: A dictionary with task titles as keys and task details as values.
         """
         try:
-            tasks = (
-                self.service.tasks()
-                .list(
-                    tasklist=tasklist_id,
-                    showCompleted=True,
-                    showHidden=True,
-                    updatedMin=last_checked.isoformat() + "Z",
-                )
-                .execute()
+            tasks = self.iter_tasks(
+                tasklist_id,
+                showCompleted=True,
+                showHidden=True,
+                updatedMin=last_checked.isoformat() + "Z",
             )
             return {
                 task.get("title", "No Title"): {
@@ -294,7 +526,7 @@ class GoogleTasksManager:
                     "completed": task.get("completed"),
                     "updated": task.get("updated"),
                 }
-                for task in tasks.get("items", [])
+                for task in tasks
                 if task.get("status") == "completed"
             }
         except Exception as e:
@@ -318,19 +550,15 @@ class GoogleTasksManager:
             dict: A dictionary with task titles as keys and task details as values.
         """
         try:
-            tasks = (
-                self.service.tasks()
-                .list(
-                    tasklist=tasklist_id,
+            filtered_tasks = list(
+                self.iter_tasks(
+                    tasklist_id,
                     showCompleted=True,
                     showHidden=True,
                     updatedMin=last_checked.isoformat() + "Z",
                 )
-                .execute()
             )
 
-            filtered_tasks = tasks.get("items", [])
-
             # Apply filtering only if only_needs_action is True
             if only_needs_action:
                 filtered_tasks = [
@@ -367,21 +595,206 @@ class GoogleTasksManager:
             dict: Details of the updated task.
         """
         try:
-            return (
-                self.service.tasks()
-                .patch(
+            return self._execute(
+                self.service.tasks().patch(
                     tasklist=tasklist_id,
                     task=task_id,
                     body={"title": new_title},
-                )
-                .execute()
+                ),
+                "tasks.tasks.patch",
             )
         except Exception as e:
             raise Exception(f"Error modifying task title: {e}")
 
-    def extract_task_id_from_task_title(
-        self, task_title: str
-    ) -> Optional[int]:
+    def _queue_request(
+        self, request: HttpRequest, site: str, idempotent: bool = True
+    ) -> str:
+        """
+        Queues a request for the next call to execute_queued_requests.
+
+        Args:
+            request (HttpRequest): The request to queue.
+            site (str): Name of the call site used for the retry counters.
+            idempotent (bool): Whether the request can safely be sent more than once.
+
+        Returns:
+            str: The key of the request in the execute_queued_requests results.
+        """
+        request_id = str(next(self._request_ids))
+        self._queued_requests.append((request_id, request, site, idempotent))
+        return request_id
+
+    def queue_create_task(
+        self,
+        tasklist_id: str,
+        task_title: str,
+        task_notes: Optional[str] = None,
+        due_date: Optional[datetime] = None,
+    ) -> str:
+        """
+        Queues the creation of a task, see create_task.
+
+        Returns:
+            str: The key of the request in the execute_queued_requests results.
+        """
+        task_body = self._build_task_body(task_title, task_notes, due_date)
+        return self._queue_request(
+            self.service.tasks().insert(tasklist=tasklist_id, body=task_body),
+            "tasks.tasks.insert",
+            idempotent=False,
+        )
+
+    def queue_mark_task_completed(self, tasklist_id: str, task_id: str) -> str:
+        """
+        Queues marking a task as completed, see mark_task_completed.
+
+        Returns:
+            str: The key of the request in the execute_queued_requests results.
+        """
+        return self._queue_request(
+            self.service.tasks().patch(
+                tasklist=tasklist_id, task=task_id, body={"status": "completed"}
+            ),
+            "tasks.tasks.patch",
+        )
+
+    def queue_modify_task_title(
+        self, tasklist_id: str, task_id: str, new_title: str
+    ) -> str:
+        """
+        Queues a task title change, see modify_task_title.
+
+        Returns:
+            str: The key of the request in the execute_queued_requests results.
+        """
+        return self._queue_request(
+            self.service.tasks().patch(
+                tasklist=tasklist_id, task=task_id, body={"title": new_title}
+            ),
+            "tasks.tasks.patch",
+        )
+
+    def queue_update_task(
+        self,
+        tasklist_id: str,
+        task_id: str,
+        task_title: str,
+        task_notes: Optional[str] = None,
+        due_date: Optional[datetime] = None,
+    ) -> str:
+        """
+        Queues an update of the title, notes and due date of a task.
+
+        Args:
+            tasklist_id (str): ID of the task list.
+            task_id (str): ID of the task.
+            task_title (str): New title of the task.
+            task_notes (Optional[str]): New notes of the task (optional).
+            due_date (Optional[datetime]): New due date as a datetime object (optional).
+
+        Returns:
+            str: The key of the request in the execute_queued_requests results.
+        """
+        task_body = self._build_task_body(task_title, task_notes, due_date)
+        return self._queue_request(
+            self.service.tasks().patch(
+                tasklist=tasklist_id, task=task_id, body=task_body
+            ),
+            "tasks.tasks.patch",
+        )
+
+    def execute_queued_requests(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Executes the queued requests in batches of up to BATCH_SIZE calls.
+        Requests failing with a transient error are sent again in a new batch,
+        following the retry policy.
+
+        Returns:
+            dict: Every queued request key mapped to {"response": ..., "error": ...},
+                  where error is None if the call succeeded.
+        """
+        pending_requests, self._queued_requests = self._queued_requests, []
+        results: Dict[str, Dict[str, Any]] = {}
+        attempt = 0
+
+        while pending_requests:
+            attempt += 1
+            for request_id, _, site, _ in pending_requests:
+                results.pop(request_id, None)
+                if attempt == 1:
+                    self.retry_policy.count(site, "calls")
+            self._execute_batches(pending_requests, results, retry=attempt > 1)
+
+            retryable_requests = []
+            retry_after = 0.0
+            for queued_request in pending_requests:
+                request_id, _, site, idempotent = queued_request
+                delay = self._retry_delay(results[request_id]["error"], idempotent)
+                if delay is None:
+                    continue
+                if attempt >= self.retry_policy.max_attempts:
+                    self.retry_policy.count(site, "failures")
+                    continue
+                retryable_requests.append(queued_request)
+                retry_after = max(retry_after, delay)
+
+            if retryable_requests:
+                self.retry_policy.wait("tasks.batch", attempt, retry_after)
+            pending_requests = retryable_requests
+        return results
+
+    def _execute_batches(
+        self,
+        queued_requests: List[Tuple[str, HttpRequest, str, bool]],
+        results: Dict[str, Dict[str, Any]],
+        retry: bool = False,
+    ) -> None:
+        """
+        Sends queued requests in batches of up to BATCH_SIZE calls. Every call is
+        recorded in the metrics registry, their latency being the batch's.
+
+        Args:
+            queued_requests (list): The queued requests to send.
+            results (dict): Filled with the response or error of every request.
+            retry (bool): Whether the requests are retries of failed attempts.
+        """
+        sites = {request_id: site for request_id, _, site, _ in queued_requests}
+
+        def callback(request_id, response, exception):
+            results[request_id] = {"response": response, "error": exception}
+            if isinstance(exception, HttpError):
+                status = exception.resp.status
+            else:
+                status = None if exception is not None else 200
+            self.metrics.observe("google_tasks", sites[request_id], status, retry=retry)
+
+        for start in range(0, len(queued_requests), self.BATCH_SIZE):
+            chunk = queued_requests[start : start + self.BATCH_SIZE]
+            batch = self._new_batch(callback)
+            for request_id, request, _, _ in chunk:
+                batch.add(request, request_id=request_id)
+            try:
+                self._observed_execute(
+                    batch.execute, chunk[0][1].http, "tasks.batch", retry=retry
+                )
+                batch_error = Exception("No response received in batch")
+            except Exception as e:
+                batch_error = e
+            for request_id, _, _, _ in chunk:
+                results.setdefault(request_id, {"response": None, "error": batch_error})
+
+    def _new_batch(self, callback: Callable[..., None]) -> BatchHttpRequest:
+        """
+        Creates a batch request. The batch URL of the discovery document ignores the
+        API endpoint override, so it is derived from the endpoint when one is set.
+        """
+        if not self.api_endpoint:
+            return self.service.new_batch_http_request(callback=callback)
+        return BatchHttpRequest(
+            callback=callback, batch_uri=f"{self.api_endpoint.rstrip('/')}/batch"
+        )
+
+    def extract_task_id_from_task_title(self, task_title: str) -> Optional[int]:
         """
         Extracts the Notion page ID from the Google Task title.
 
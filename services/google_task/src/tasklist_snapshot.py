@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class TasklistSnapshot:
+    """
+    All the tasks of a task list, completed and hidden ones included, fetched with a
+    single listing.
+
+    The views used by the Google Tasks to Notion sync are derived in memory with the
+    same filters as the corresponding GoogleTasksManager methods, instead of listing
+    the task list once per view.
+    """
+
+    def __init__(self, tasklist_id: str, tasks: Iterable[Dict[str, Any]]):
+        """
+        Args:
+            tasklist_id (str): ID of the task list.
+            tasks (Iterable[Dict[str, Any]]): The task resources of the task list.
+        """
+        self.tasklist_id = tasklist_id
+        self.tasks: List[Dict[str, Any]] = list(tasks)
+
+    @staticmethod
+    def _parse_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+        """Parses an RFC 3339 timestamp of the API into an aware datetime."""
+        if not timestamp:
+            return None
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+    def _updated_since(self, last_checked: datetime) -> List[Dict[str, Any]]:
+        """
+        Returns the tasks updated at or after last_checked, as `updatedMin` would.
+        Naive datetimes are taken as UTC, like the "Z" suffix sent by the manager.
+        """
+        if last_checked.tzinfo is None:
+            last_checked = last_checked.replace(tzinfo=timezone.utc)
+        updated_tasks = []
+        for task in self.tasks:
+            updated = self._parse_timestamp(task.get("updated"))
+            if updated is not None and updated >= last_checked:
+                updated_tasks.append(task)
+        return updated_tasks
+
+    def created_since(
+        self, last_checked: datetime, only_needs_action: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Same view as GoogleTasksManager.get_created_tasks_since.
+
+        Args:
+            last_checked (datetime): The timestamp of the last check.
+            only_needs_action (bool): Whether to include only tasks that need action.
+
+        Returns:
+            dict: A dictionary with task titles as keys and task details as values.
+        """
+        return {
+            task.get("title", "No Title"): {
+                "id": task["id"],
+                "status": task.get("status"),
+                "completed": task.get("completed"),
+                "updated": task.get("updated"),
+                "due": task.get("due"),
+            }
+            for task in self._updated_since(last_checked)
+            if not only_needs_action or task.get("status") == "needsAction"
+        }
+
+    def completed_since(self, last_checked: datetime) -> Dict[str, Dict[str, Any]]:
+        """
+        Same view as GoogleTasksManager.get_completed_tasks_since.
+
+        Args:
+            last_checked (datetime): The timestamp of the last check.
+
+        Returns:
+            dict: A dictionary with task titles as keys and task details as values.
+        """
+        return {
+            task.get("title", "No Title"): {
+                "id": task["id"],
+                "status": task.get("status"),
+                "completed": task.get("completed"),
+                "updated": task.get("updated"),
+            }
+            for task in self._updated_since(last_checked)
+            if task.get("status") == "completed"
+        }
+
+    def active(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Same view as GoogleTasksManager.list_tasks_in_tasklist with
+        include_completed=False: the tasks that still need action.
+
+        Returns:
+            dict: A dictionary with task titles as keys and task details as values.
+        """
+        return {
+            task.get("title", "No Title"): {
+                "id": task["id"],
+                "status": task.get("status"),
+                "completed": task.get("completed"),
+            }
+            for task in self.tasks
+            if task.get("status") != "completed"
+        }
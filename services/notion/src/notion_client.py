@@ -1,13 +1,73 @@
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 from rich import print
 
+from services.common.metrics import MetricsRegistry, payload_size
+from services.common.retry import RETRYABLE_STATUS_CODES, RetryPolicy
+from services.common.tracing import Tracer
+from services.notion.src.notion_page import NotionPage, resolve_fields
+from services.notion.src.page_id_cache import PageIdCache
+from services.notion.src.rate_limiter import TokenBucketRateLimiter
+from services.notion.src.ttl_cache import MISSING, TTLCache
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter applying a default timeout to requests sent without one."""
+
+    def __init__(self, *args, timeout: float, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
 
 class NotionClient:
-    def __init__(self, notion_api_key: str, database_id: str, project_root: str):
+    # Root of the Notion API endpoints
+    API_BASE_URL = "https://api.notion.com/v1"
+    # Default (connect, read) timeout in seconds for Notion API calls
+    DEFAULT_TIMEOUT = (5, 30)
+    # Maximum number of kept-alive connections to api.notion.com
+    POOL_MAXSIZE = 10
+    # Maximum number of conditions Notion accepts in a compound filter
+    QUERY_ID_CHUNK_SIZE = 100
+    # Maximum number of requests sent concurrently to the Notion API
+    MAX_CONCURRENT_REQUESTS = 3
+    # Notion allows an average of 3 requests per second per integration
+    RATE_LIMIT = 3.0
+    RATE_BURST = 3
+    # Parent project pages are rarely renamed, so their names are cached for a week
+    PARENT_NAME_CACHE_SIZE = 1024
+    PARENT_NAME_TTL = 7 * 24 * 60 * 60
+    # Index of page titles used to resolve parent pages by name
+    PARENT_INDEX_CACHE_SIZE = 50000
+    PARENT_INDEX_TTL = 24 * 60 * 60
+
+    def __init__(
+        self,
+        notion_api_key: str,
+        database_id: str,
+        project_root: str,
+        session: Optional[requests.Session] = None,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        page_id_cache: Optional[PageIdCache] = None,
+        parent_name_cache: Optional[TTLCache] = None,
+        parent_index_cache: Optional[TTLCache] = None,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        base_url: str = API_BASE_URL,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Tracer] = None,
+    ):
         """
         Initialize the NotionClient with API key, database ID, and project root.
 
@@ -15,75 +75,332 @@ class NotionClient:
             notion_api_key (str): Notion API key.
             database_id (str): Notion database ID.
             project_root (str): Path to the project root directory.
+            session (Optional[requests.Session]): HTTP session to send requests with.
+                                                  Defaults to a pooled keep-alive session.
+            timeout (Union[float, Tuple[float, float]]): Default request timeout in seconds.
+            page_id_cache (Optional[PageIdCache]): Cache of unique ID to page ID mappings.
+                                                   Defaults to a cache under `project_root/.cache`.
+            parent_name_cache (Optional[TTLCache]): Cache of parent page names by page ID.
+                                                    Defaults to a cache persisted under `project_root/.cache`.
+            parent_index_cache (Optional[TTLCache]): Index of page IDs by lowercase title.
+                                                     Defaults to a cache persisted under `project_root/.cache`.
+            rate_limiter (Optional[TokenBucketRateLimiter]): Limiter shared by every request.
+                                                             Defaults to RATE_LIMIT requests per second.
+            retry_policy (Optional[RetryPolicy]): Policy retrying transient failures.
+            base_url (str): Root of the API endpoints, e.g. a local stub server.
+            metrics (Optional[MetricsRegistry]): Registry recording every request sent.
+            tracer (Optional[Tracer]): Tracer timing the parent name resolution.
         """
         self.notion_api_key = notion_api_key
         self.database_id = database_id
         self.project_root = project_root
+        self.base_url = base_url.rstrip("/")
         self.headers = {
             "Authorization": f"Bearer {self.notion_api_key}",
             "Content-Type": "application/json",
             "Notion-Version": "2022-06-28",
         }
+        self.session = session if session is not None else self._build_session(timeout)
+        if rate_limiter is None:
+            rate_limiter = TokenBucketRateLimiter(self.RATE_LIMIT, self.RATE_BURST)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.tracer = tracer if tracer is not None else Tracer(enabled=False)
+        if page_id_cache is None:
+            page_id_cache = PageIdCache(
+                os.path.join(project_root, ".cache", "notion_page_ids.sqlite3")
+            )
+        self.page_id_cache = page_id_cache
+        if parent_name_cache is None:
+            parent_name_cache = TTLCache(
+                maxsize=self.PARENT_NAME_CACHE_SIZE,
+                ttl=self.PARENT_NAME_TTL,
+                path=os.path.join(project_root, ".cache", "parent_page_names.json"),
+            )
+        self.parent_name_cache = parent_name_cache
+        if parent_index_cache is None:
+            parent_index_cache = TTLCache(
+                maxsize=self.PARENT_INDEX_CACHE_SIZE,
+                ttl=self.PARENT_INDEX_TTL,
+                path=os.path.join(project_root, ".cache", "parent_page_index.json"),
+            )
+        self.parent_index_cache = parent_index_cache
+        # Names that could not be resolved at all are not searched again
+        self._missing_parent_names: Set[str] = set()
+        self.parent_name_cache.load()
+        self.parent_index_cache.load()
+
+    def _build_session(
+        self, timeout: Union[float, Tuple[float, float]]
+    ) -> requests.Session:
+        """
+        Builds a session reusing connections to the Notion API across calls.
 
-    def get_filtered_sorted_database(
+        Args:
+            timeout (Union[float, Tuple[float, float]]): Default request timeout in seconds.
+
+        Returns:
+            requests.Session: The configured session.
+        """
+        session = requests.Session()
+        adapter = TimeoutHTTPAdapter(
+            timeout=timeout,
+            pool_connections=1,
+            pool_maxsize=self.POOL_MAXSIZE,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive"
+        return session
+
+    def close(self) -> None:
+        """Closes the HTTP session and its pooled connections, and the caches."""
+        self.session.close()
+        self.page_id_cache.close()
+
+    def __enter__(self) -> "NotionClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _request(
+        self, method: str, url: str, idempotent: bool = True, **kwargs
+    ) -> requests.Response:
+        """
+        Sends a request to the Notion API through the client session, waiting for
+        the rate limiter before every attempt.
+
+        Rate limited requests (429) pause the limiter for the `Retry-After` delay and
+        are always retried, since Notion did not process them. Server errors and
+        network failures are only retried for idempotent requests. Every attempt is
+        recorded in the metrics registry.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+            idempotent (bool): Whether the request can safely be sent more than once.
+            **kwargs: Extra arguments for requests (json, params...).
+
+        Returns:
+            requests.Response: The HTTP response of the last attempt.
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed.
+        """
+
+        site = self._call_site(method, url)
+        attempts = 0
+
+        def send() -> requests.Response:
+            nonlocal attempts
+            attempts += 1
+            self.rate_limiter.acquire()
+            with self.metrics.time("notion", site, retry=attempts > 1) as observation:
+                response = self.session.request(
+                    method, url, headers=self.headers, **kwargs
+                )
+                observation.status = response.status_code
+                observation.bytes_sent = payload_size(
+                    getattr(response.request, "body", None)
+                )
+                observation.bytes_received = payload_size(response.content)
+            return response
+
+        def should_retry(response, error) -> Optional[float]:
+            if isinstance(error, requests.exceptions.ConnectTimeout):
+                # The request never reached Notion
+                return 0.0
+            if isinstance(error, requests.exceptions.RequestException):
+                return 0.0 if idempotent else None
+            if error is not None:
+                return None
+            if response.status_code == 429:
+                retry_after = self._parse_retry_after(response)
+                self.rate_limiter.pause(retry_after)
+                return retry_after
+            if response.status_code in RETRYABLE_STATUS_CODES and idempotent:
+                return 0.0
+            return None
+
+        return self.retry_policy.call(site, send, should_retry)
+
+    @staticmethod
+    def _call_site(method: str, url: str) -> str:
+        """
+        Names the endpoint of a request for counters, replacing IDs with `{id}`.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+
+        Returns:
+            str: The call site, e.g. "PATCH /v1/pages/{id}".
+        """
+        path = urlsplit(url).path
+        segments = path.split("/")
+        for index in range(1, len(segments)):
+            if segments[index - 1] in ("pages", "databases", "blocks", "users"):
+                segments[index] = "{id}"
+        return f"{method} {'/'.join(segments)}"
+
+    @staticmethod
+    def _parse_retry_after(response: requests.Response, default: float = 1.0) -> float:
+        """
+        Args:
+            response (requests.Response): A 429 response.
+            default (float): Delay used when the header is missing or invalid.
+
+        Returns:
+            float: The delay requested by the `Retry-After` header, in seconds.
+        """
+        try:
+            return max(0.0, float(response.headers.get("Retry-After", default)))
+        except (TypeError, ValueError):
+            return default
+
+    def _build_query_payload(
         self,
         query_page_ids: List[int] = [-1],
         last_successful_sync: Optional[datetime] = None,
-    ) -> Optional[Dict]:
+    ) -> Dict:
         """
-        Fetches the database information from Notion with specified filters and sorting.
+        Builds the database query payload with the specified filters and sorting.
+
         Args:
             query_page_ids (List[int], optional): A list of page IDs to filter the database query.
                                                   Defaults to [-1], which loads the default query payload from a JSON file.
             last_successful_sync (Optional[datetime], optional): If provided, adds a filter to only retrieve
                                                                 pages modified since this timestamp.
+
         Returns:
-            Optional[Dict]: The JSON response from the Notion API if the request is successful; None otherwise.
+            Dict: The query payload.
+
+        Raises:
+            FileNotFoundError: If the default query payload file is missing.
         """
-        url = f"https://api.notion.com/v1/databases/{self.database_id}/query"
+        if query_page_ids == [-1]:
+            with open(
+                f"{self.project_root}/services/notion/config/query_payload.json",
+                "r",
+            ) as file:
+                query_payload = json.load(file)
+
+            if last_successful_sync:
+                sync_timestamp = last_successful_sync.isoformat()
+
+                timestamp_filter = {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": sync_timestamp},
+                }
 
-        try:
-            if query_page_ids == [-1]:
-                with open(
-                    f"{self.project_root}/services/notion/config/query_payload.json",
-                    "r",
-                ) as file:
-                    query_payload = json.load(file)
-
-                if last_successful_sync:
-                    sync_timestamp = last_successful_sync.isoformat()
-
-                    timestamp_filter = {
-                        "timestamp": "last_edited_time",
-                        "last_edited_time": {"on_or_after": sync_timestamp},
-                    }
-
-                    if "filter" in query_payload:
-                        if "and" in query_payload["filter"]:
-                            query_payload["filter"]["and"].append(timestamp_filter)
-                        else:
-                            existing_filter = query_payload["filter"]
-                            query_payload["filter"] = {
-                                "and": [existing_filter, timestamp_filter]
-                            }
+                if "filter" in query_payload:
+                    if "and" in query_payload["filter"]:
+                        query_payload["filter"]["and"].append(timestamp_filter)
                     else:
-                        query_payload["filter"] = timestamp_filter
-            else:
-                query_payload = {
-                    "filter": {
-                        "or": [
-                            {
-                                "property": "ID",
-                                "unique_id": {"equals": page_id},
-                            }
-                            for page_id in query_page_ids
-                        ]
-                    }
+                        existing_filter = query_payload["filter"]
+                        query_payload["filter"] = {
+                            "and": [existing_filter, timestamp_filter]
+                        }
+                else:
+                    query_payload["filter"] = timestamp_filter
+        else:
+            query_payload = {
+                "filter": {
+                    "or": [
+                        {
+                            "property": "ID",
+                            "unique_id": {"equals": page_id},
+                        }
+                        for page_id in query_page_ids
+                    ]
                 }
+            }
+        return query_payload
 
-            response = requests.post(url, headers=self.headers, json=query_payload)
+    def iter_database_query(
+        self,
+        query_page_ids: List[int] = [-1],
+        last_successful_sync: Optional[datetime] = None,
+        page_size: int = 100,
+    ) -> Iterator[Dict]:
+        """
+        Lazily pages through the database query, following `next_cursor` until
+        Notion reports there are no more results.
+
+        Args:
+            query_page_ids (List[int], optional): A list of page IDs to filter the database query.
+                                                  Defaults to [-1], which loads the default query payload from a JSON file.
+            last_successful_sync (Optional[datetime], optional): If provided, only retrieve pages
+                                                                modified since this timestamp.
+            page_size (int, optional): Number of results per request (Notion allows up to 100).
+
+        Yields:
+            Dict: The JSON response of each query request.
+
+        Raises:
+            requests.exceptions.RequestException: If a request fails.
+            FileNotFoundError: If the default query payload file is missing.
+        """
+        query_payload = self._build_query_payload(query_page_ids, last_successful_sync)
+        query_payload["page_size"] = page_size
+        yield from self._iter_query_responses(query_payload)
+
+    def _iter_query_responses(
+        self, query_payload: Dict, params: Optional[Dict] = None
+    ) -> Iterator[Dict]:
+        """
+        Sends a database query and follows `next_cursor` through all result pages.
+
+        Args:
+            query_payload (Dict): The query payload, updated with the cursor in place.
+            params (Optional[Dict]): Query string parameters, e.g. `filter_properties`.
+
+        Yields:
+            Dict: The JSON response of each query request.
+
+        Raises:
+            requests.exceptions.RequestException: If a request fails.
+        """
+        url = f"{self.base_url}/databases/{self.database_id}/query"
+        while True:
+            response = self._request("POST", url, json=query_payload, params=params)
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            yield data
+
+            next_cursor = data.get("next_cursor")
+            if not data.get("has_more") or not next_cursor:
+                break
+            query_payload["start_cursor"] = next_cursor
+
+    def get_filtered_sorted_database(
+        self,
+        query_page_ids: List[int] = [-1],
+        last_successful_sync: Optional[datetime] = None,
+    ) -> Optional[Dict]:
+        """
+        Fetches the database information from Notion with specified filters and sorting.
+        All result pages are fetched and merged into a single response.
+        Args:
+            query_page_ids (List[int], optional): A list of page IDs to filter the database query.
+                                                  Defaults to [-1], which loads the default query payload from a JSON file.
+            last_successful_sync (Optional[datetime], optional): If provided, adds a filter to only retrieve
+                                                                pages modified since this timestamp.
+        Returns:
+            Optional[Dict]: The merged JSON response from the Notion API if the requests are successful; None otherwise.
+        """
+        try:
+            results: List[Dict] = []
+            for data in self.iter_database_query(query_page_ids, last_successful_sync):
+                results.extend(data.get("results", []))
+            return {
+                "object": "list",
+                "results": results,
+                "has_more": False,
+                "next_cursor": None,
+            }
 
         except requests.exceptions.RequestException as e:
             print(f"[red]Error fetching database: {e}[/red]")
@@ -91,7 +408,7 @@ class NotionClient:
         except FileNotFoundError as e:
             print(f"[red]Error loading query payload: {e}[/red]")
             return None
-        
+
     def get_page_by_id(self, page_id: str) -> Optional[Dict]:
         """
         Fetches a single page from Notion by its ID.
@@ -102,10 +419,10 @@ class NotionClient:
         Returns:
             Optional[Dict]: The JSON response from the Notion API if successful; None otherwise.
         """
-        url = f"https://api.notion.com/v1/pages/{page_id.replace('-', '')}"
+        url = f"{self.base_url}/pages/{page_id.replace('-', '')}"
 
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request("GET", url)
             response.raise_for_status()
             return response.json()
 
@@ -118,6 +435,7 @@ class NotionClient:
     ) -> Dict[str, Optional[str]]:
         """
         Fetches names of multiple parent pages in one batch to minimize API calls.
+        Names are served from the parent name cache when possible.
 
         Args:
             parent_page_ids (Set[str]): A set of unique parent page IDs (without hyphens).
@@ -126,34 +444,97 @@ class NotionClient:
             Dict[str, Optional[str]]: A dictionary mapping parent page IDs to their names.
         """
         parent_page_names: Dict[str, Optional[str]] = {}
+        missing_page_ids: Set[str] = set()
         for page_id in parent_page_ids:
             page_id = page_id.replace("-", "")
-            url = f"https://api.notion.com/v1/pages/{page_id}"
+            cached_name = self.parent_name_cache.get(page_id)
+            if cached_name is MISSING:
+                missing_page_ids.add(page_id)
+            else:
+                parent_page_names[page_id] = cached_name
+
+        errors: Dict[str, Exception] = {}
+        if missing_page_ids:
+            max_workers = min(self.MAX_CONCURRENT_REQUESTS, len(missing_page_ids))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._fetch_parent_page_name, page_id): page_id
+                    for page_id in missing_page_ids
+                }
+                for future in as_completed(futures):
+                    page_id = futures[future]
+                    try:
+                        parent_page_names[page_id] = future.result()
+                        self.parent_name_cache.set(page_id, parent_page_names[page_id])
+                    except requests.exceptions.RequestException as e:
+                        errors[page_id] = e
+                        parent_page_names[page_id] = None
+            self.parent_name_cache.save()
+
+        for page_id, error in errors.items():
+            print(f"[red]Error fetching parent page {page_id}: {error}[/red]")
+        return parent_page_names
 
-            try:
-                response = requests.get(url, headers=self.headers)
-                response.raise_for_status()
-                data = response.json()
+    def _fetch_parent_page_name(self, page_id: str) -> Optional[str]:
+        """
+        Fetches the name of a single parent page.
 
-                title_property = (
-                    data.get("properties", {}).get("Name", {}).get("title", None)
-                )
-                if title_property and len(title_property) > 0:
-                    parent_page_names[page_id] = (
-                        title_property[0].get("text", {}).get("content", None)
-                    )
-                else:
-                    parent_page_names[page_id] = None
+        Args:
+            page_id (str): The parent page ID (without hyphens).
 
-            except requests.exceptions.RequestException as e:
-                print(f"[red]Error fetching parent page {page_id}: {e}[/red]")
-                parent_page_names[page_id] = None
+        Returns:
+            Optional[str]: The page name, or None if the page has no title.
 
-        return parent_page_names
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+        """
+        url = f"{self.base_url}/pages/{page_id}"
+        response = self._request("GET", url)
+        response.raise_for_status()
+        data = response.json()
+
+        title_property = data.get("properties", {}).get("Name", {}).get("title", None)
+        if title_property and len(title_property) > 0:
+            return title_property[0].get("text", {}).get("content", None)
+        return None
+
+    def refresh_parent_index(self) -> None:
+        """
+        Rebuilds the index of page IDs by lowercase title from a single paginated
+        query of the database, requesting only the title property. Lookups only
+        query the pages they miss, this scan of the whole database is on demand.
+        """
+        titles: Dict[str, str] = {}
+        try:
+            for data in self._iter_query_responses(
+                {"page_size": 100}, params={"filter_properties": "title"}
+            ):
+                for page in data.get("results", []):
+                    title_property = (
+                        page.get("properties", {}).get("Name", {}).get("title", None)
+                    )
+                    if title_property and len(title_property) > 0:
+                        page_title = (
+                            title_property[0].get("text", {}).get("content", "")
+                        )
+                        if page_title:
+                            titles[page_title.lower()] = page.get("id", "").replace(
+                                "-", ""
+                            )
+        except requests.exceptions.RequestException as e:
+            print(f"[red]Error building the parent page index: {e}[/red]")
+            return
+
+        self.parent_index_cache.clear()
+        for page_title, page_id in titles.items():
+            self.parent_index_cache.set(page_title, page_id)
+        self.parent_index_cache.save()
 
     def find_parent_page_by_name(self, parent_name: str) -> Optional[str]:
         """
-        Finds a parent page ID by searching for a page with the given name.
+        Finds a parent page ID by name. The parent index is looked up first, then
+        the database is queried for a page with that title, before falling back to
+        a Notion search. Pages found are added to the index.
 
         Args:
             parent_name (str): The name of the parent page to search for.
@@ -161,14 +542,79 @@ class NotionClient:
         Returns:
             Optional[str]: The parent page ID if found, None otherwise.
         """
-        url = f"https://api.notion.com/v1/search"
+        index_key = parent_name.lower()
+        page_id = self.parent_index_cache.get(index_key)
+        if page_id is not MISSING:
+            return page_id
+
+        if index_key not in self._missing_parent_names:
+            page_id = self._query_parent_page_by_name(
+                parent_name
+            ) or self._search_parent_page_by_name(parent_name)
+            if page_id:
+                self.parent_index_cache.set(index_key, page_id)
+                self.parent_index_cache.save()
+                return page_id
+            self._missing_parent_names.add(index_key)
+
+        print(f"[yellow]Parent page '{parent_name}' not found[/yellow]")
+        return None
+
+    def _query_parent_page_by_name(self, parent_name: str) -> Optional[str]:
+        """
+        Queries the database for a page with the given title, requesting only the
+        title property.
+
+        Args:
+            parent_name (str): The name of the parent page to search for.
+
+        Returns:
+            Optional[str]: The parent page ID if found, None otherwise.
+        """
+        url = f"{self.base_url}/databases/{self.database_id}/query"
+        payload = {
+            "filter": {"property": "Name", "title": {"equals": parent_name}},
+            "page_size": 1,
+        }
+
+        try:
+            response = self._request(
+                "POST", url, json=payload, params={"filter_properties": "title"}
+            )
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"[red]Error querying parent page '{parent_name}': {e}[/red]")
+            return None
+
+        for page in data.get("results", []):
+            title_property = (
+                page.get("properties", {}).get("Name", {}).get("title", None)
+            )
+            if title_property and len(title_property) > 0:
+                page_title = title_property[0].get("text", {}).get("content", "")
+                if page_title.lower() == parent_name.lower():
+                    return page.get("id", "").replace("-", "")
+        return None
+
+    def _search_parent_page_by_name(self, parent_name: str) -> Optional[str]:
+        """
+        Searches the workspace for a page with the given name.
+
+        Args:
+            parent_name (str): The name of the parent page to search for.
+
+        Returns:
+            Optional[str]: The parent page ID if found, None otherwise.
+        """
+        url = f"{self.base_url}/search"
         payload = {
             "query": parent_name,
             "filter": {"value": "page", "property": "object"},
         }
 
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = self._request("POST", url, json=payload)
             response.raise_for_status()
             data = response.json()
 
@@ -188,7 +634,6 @@ class NotionClient:
                         if page_title.lower() == parent_name.lower():
                             return result.get("id", "").replace("-", "")
 
-            print(f"[yellow]Parent page '{parent_name}' not found[/yellow]")
             return None
 
         except requests.exceptions.RequestException as e:
@@ -207,6 +652,37 @@ class NotionClient:
         """
         # Fetch the database to find the unique page ID corresponding to the task ID
         # In notion DB, there's 2 UID, one is the page ID (necessary for API call) and the other is the task ID
+        # The mapping never changes, so a cached page ID skips the database query.
+        # The page is read instead, to skip the update of pages already Done
+        cached_page_id = self.page_id_cache.get_page_id(task_id)
+        if cached_page_id is not None:
+            try:
+                response = self._request(
+                    "GET", f"{self.base_url}/pages/{cached_page_id}"
+                )
+            except requests.exceptions.RequestException as e:
+                print(f"[red]Error fetching page of task ID {task_id}: {e}[/red]")
+                response = None
+            page_data = (
+                response.json()
+                if response is not None and response.status_code == 200
+                else None
+            )
+            if page_data is not None and not (
+                page_data.get("archived") or page_data.get("in_trash")
+            ):
+                page = NotionPage.from_api(page_data, ("page_status",))
+                if page.page_status == "Done":
+                    print(
+                        f"[orange1]Task {task_id} is already marked as 'Done'[/orange1]"
+                    )
+                    return None
+                return self._mark_page_id_as_completed(task_id, cached_page_id)
+            if page_data is not None or (
+                response is not None and response.status_code == 404
+            ):
+                # The page is gone or in the trash, the cached mapping is stale
+                self.page_id_cache.invalidate(task_id)
 
         try:
             database_response = self.get_filtered_sorted_database(
@@ -220,26 +696,50 @@ class NotionClient:
             print(f"[red]Failed to fetch database response for task ID {task_id}[/red]")
             return None
 
-        parsed_data = self.parse_notion_response(database_response)
-        page_status = parsed_data[0].get("page_status", None)
+        page = next(
+            self.iter_parsed_pages(
+                [database_response],
+                fields=("page_status",),
+                resolve_parent_names=False,
+            ),
+            None,
+        )
+        page_status = page.page_status if page is not None else None
         if page_status == "Done":
             print(f"[orange1]Task {task_id} is already marked as 'Done'[/orange1]")
             return None
 
-        page_id = parsed_data[0].get("page_id", None)
+        page_id = page.page_id if page is not None else None
         if page_id is None:
             print(f"[red]Failed to find page ID for task ID {task_id}[/red]")
             raise Exception(f"Failed to find page ID for task ID {task_id}")
 
-        # Update the page status to 'Done'
-        url = f"https://api.notion.com/v1/pages/{page_id}"
+        return self._mark_page_id_as_completed(task_id, page_id)
+
+    def _mark_page_id_as_completed(self, task_id: int, page_id: str) -> Optional[Dict]:
+        """
+        Sets the 'Status' property of a Notion page to 'Done'.
+
+        Args:
+            task_id (int): The unique task ID of the page, used for logging.
+            page_id (str): The Notion page ID (without hyphens).
+
+        Returns:
+            Optional[Dict]: The JSON response from the Notion API if successful; None otherwise.
+        """
+        url = f"{self.base_url}/pages/{page_id}"
         payload = {"properties": {"Status": {"status": {"name": "Done"}}}}
 
         try:
-            response = requests.patch(url, headers=self.headers, json=payload)
+            response = self._request("PATCH", url, json=payload)
             if response.status_code == 200:
                 print(f"[green]Task {task_id} marked as 'Done' successfully![/green]")
                 return response.json()
+            elif response.status_code == 404:
+                # The page is gone, the cached mapping is stale
+                print(f"[red]Page of task {task_id} not found[/red]")
+                self.page_id_cache.invalidate(task_id)
+                return None
             else:
                 print(
                     f"[red]Failed to mark task {task_id} as 'Done'. Status Code: {response.status_code}. Error: {response.text}[/red]"
@@ -250,6 +750,70 @@ class NotionClient:
             print(f"[red]Error marking task {task_id} as 'Done': {e}[/red]")
             return None
 
+    def mark_pages_as_completed(
+        self, task_ids: Iterable[int]
+    ) -> Dict[int, Optional[Dict]]:
+        """
+        Marks the 'Status' property of several Notion pages as 'Done'.
+        The pages are resolved in chunked queries, pages already 'Done' are skipped
+        and the remaining ones are updated concurrently.
+
+        Args:
+            task_ids (Iterable[int]): The unique task IDs to update.
+
+        Returns:
+            Dict[int, Optional[Dict]]: The Notion API response for each task ID, or None
+                                       if the page was skipped or could not be updated.
+        """
+        task_ids = {int(task_id) for task_id in task_ids}
+        pages_by_id = self.query_pages_by_unique_ids(task_ids, fields=("page_status",))
+
+        results: Dict[int, Optional[Dict]] = {}
+        pages_to_update: Dict[int, str] = {}
+        for task_id in task_ids:
+            page = pages_by_id.get(task_id)
+            if page is None:
+                print(f"[red]Failed to find page ID for task ID {task_id}[/red]")
+                results[task_id] = None
+            elif page["page_status"] == "Done":
+                print(f"[orange1]Task {task_id} is already marked as 'Done'[/orange1]")
+                results[task_id] = None
+            else:
+                pages_to_update[task_id] = page["page_id"]
+
+        if not pages_to_update:
+            return results
+
+        max_workers = min(self.MAX_CONCURRENT_REQUESTS, len(pages_to_update))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._mark_page_id_as_completed, task_id, page_id
+                ): task_id
+                for task_id, page_id in pages_to_update.items()
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def resolve_page_id(self, unique_id: int) -> Optional[str]:
+        """
+        Resolves a unique task ID to its page ID, querying Notion only on a cache miss.
+
+        Args:
+            unique_id (int): The unique task ID.
+
+        Returns:
+            Optional[str]: The page ID (without hyphens), or None if not found.
+        """
+        page_id = self.page_id_cache.get_page_id(unique_id)
+        if page_id is not None:
+            return page_id
+        page = self.query_pages_by_unique_ids([unique_id], fields=()).get(
+            int(unique_id)
+        )
+        return page["page_id"] if page else None
+
     def create_new_page(
         self,
         title: str,
@@ -272,7 +836,7 @@ class NotionClient:
         Returns:
             Optional[str]: The unique page ID if successful; None otherwise.
         """
-        url = "https://api.notion.com/v1/pages"
+        url = f"{self.base_url}/pages"
         # Start with base payload
         payload = {
             "parent": {"database_id": self.database_id},
@@ -302,7 +866,7 @@ class NotionClient:
             }
 
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = self._request("POST", url, idempotent=False, json=payload)
             response.raise_for_status()
             print(
                 f"[green]Page with ID '{response.json().get('ID', 'N/A')}' created successfully with 'FromTask' set to {from_task}![/green]"
@@ -319,6 +883,56 @@ class NotionClient:
             print(f"[red]Error creating page '{title}': {e}[/red]")
             return None
 
+    def query_pages_by_unique_ids(
+        self, unique_ids: Iterable[int], fields: Optional[Iterable[str]] = None
+    ) -> Dict[int, NotionPage]:
+        """
+        Fetches pages by their unique IDs, splitting the IDs into chunks that fit in
+        a single compound filter and querying the chunks concurrently. Each response
+        is parsed as soon as it is received.
+
+        Args:
+            unique_ids (Iterable[int]): The unique IDs of the pages to fetch.
+            fields (Optional[Iterable[str]]): Fields to parse, as in iter_parsed_pages.
+
+        Returns:
+            Dict[int, NotionPage]: Parsed pages keyed by unique ID. Pages of failed chunks are missing.
+        """
+        unique_ids = sorted({int(unique_id) for unique_id in unique_ids})
+        chunks = [
+            unique_ids[start : start + self.QUERY_ID_CHUNK_SIZE]
+            for start in range(0, len(unique_ids), self.QUERY_ID_CHUNK_SIZE)
+        ]
+        if not chunks:
+            return {}
+
+        def fetch_chunk(chunk: List[int]) -> List[NotionPage]:
+            return list(
+                self.iter_parsed_pages(
+                    self.iter_database_query(query_page_ids=chunk),
+                    fields=fields,
+                    resolve_parent_names=False,
+                )
+            )
+
+        pages_by_id: Dict[int, NotionPage] = {}
+        max_workers = min(self.MAX_CONCURRENT_REQUESTS, len(chunks))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    pages = future.result()
+                except requests.exceptions.RequestException as e:
+                    print(
+                        f"[red]Error fetching pages {chunk[0]} to {chunk[-1]}: {e}[/red]"
+                    )
+                    continue
+                for page in pages:
+                    if page.unique_id is not None:
+                        pages_by_id[int(page.unique_id)] = page
+        return pages_by_id
+
     def retrieve_pages_status(self, tasks_id: List[int]) -> List[Dict]:
         """
         Retrieve the status of multiple pages based on their task IDs.
@@ -329,150 +943,107 @@ class NotionClient:
         Returns:
             List[Dict]: A list of dictionaries containing the task ID and status of each page.
         """
-        database_response = self.get_filtered_sorted_database(query_page_ids=tasks_id)
-        if not database_response:
+        pages_by_id = self.query_pages_by_unique_ids(
+            tasks_id, fields=("title", "page_status")
+        )
+        if tasks_id and not pages_by_id:
             print("[red]Failed to fetch database to retrieve pages status.[/red]")
             return []
 
-        parsed_data = self.parse_notion_response(database_response)
-        tasks_status = []
-        for page in parsed_data:
-            if int(page["unique_id"]) in tasks_id:
-                tasks_status.append(
-                    {
-                        "task_id": page["unique_id"],
-                        "title": page["title"],
-                        "page_status": page["page_status"],
-                    }
-                )
-        return tasks_status
+        return [
+            {
+                "task_id": page.unique_id,
+                "title": page.title,
+                "page_status": page.page_status,
+            }
+            for page in pages_by_id.values()
+        ]
+
+    def iter_parsed_pages(
+        self,
+        responses: Iterable[Dict],
+        fields: Optional[Iterable[str]] = None,
+        resolve_parent_names: bool = True,
+    ) -> Iterator[NotionPage]:
+        """
+        Parses Notion query responses one at a time, yielding their pages as they are
+        parsed. Only the requested fields are extracted, so callers needing a few
+        fields of many pages neither pay for nor keep the others.
 
-    def parse_notion_response(self, response: Dict) -> List[Dict]:
+        Args:
+            responses (Iterable[Dict]): JSON responses of the Notion API, e.g. the
+                                        pages of iter_database_query, consumed lazily.
+            fields (Optional[Iterable[str]]): Fields to parse, among PAGE_FIELDS, all of
+                                              them if None. `unique_id` and `page_id` are
+                                              always parsed to fill the page ID cache.
+            resolve_parent_names (bool): Whether to fetch the parent page names when
+                                         `parent_page_name` is requested. If False,
+                                         `parent_page_name` is None for every page.
+
+        Yields:
+            NotionPage: The parsed pages. Responses that fail to parse are skipped.
+
+        Raises:
+            ValueError: If a field is unknown.
         """
-        Parse the Notion response to extract relevant fields, including parent page names.
+        fields = set(resolve_fields(fields)) | {"unique_id", "page_id"}
+        resolve_parent_names = resolve_parent_names and "parent_page_name" in fields
+        if resolve_parent_names:
+            fields.add("parent_page_id")
+        fields = resolve_fields(fields)
+
+        for response in responses:
+            yield from self._parse_response(response, fields, resolve_parent_names)
+
+    def _parse_response(
+        self, response: Dict, fields: Tuple[str, ...], resolve_parent_names: bool
+    ) -> List[NotionPage]:
+        """
+        Parses the pages of a Notion response, caches their page IDs and resolves the
+        names of their parent pages in a single batch.
 
         Args:
             response (Dict): The JSON response from Notion API.
+            fields (Tuple[str, ...]): Fields to parse, including `unique_id`, `page_id`
+                                      and, to resolve parent names, `parent_page_id`.
+            resolve_parent_names (bool): Whether to fetch the parent page names.
 
         Returns:
-            List[Dict]: A list of dictionaries containing extracted fields with None instead of [] or {}.
+            List[NotionPage]: The parsed pages, or [] if the response fails to parse.
         """
         try:
-            results = response.get("results", [])
-            parsed_data: List[Dict] = []
-
-            for page in results:
-                properties = page.get("properties", {})
-                page_id = page.get("id", None).replace("-", "")
-
-                tag = properties.get("Tags", {}).get("multi_select", None)
-                if tag and len(tag) > 0:
-                    tag = tag[0].get("name", None)
-                else:
-                    tag = None
-
-                importance_property = properties.get("Importance", {}).get(
-                    "select", None
-                )
-                importance = (
-                    importance_property.get("name", None)
-                    if importance_property
-                    else None
-                )
-
-                unique_id = (
-                    properties.get("ID", {}).get("unique_id", {}).get("number", None)
-                )
-
-                due_date_property = properties.get("Due Date", {}).get("date", None)
-                due_date = (
-                    due_date_property.get("start", None) if due_date_property else None
-                )
-
-                page_url = page.get("url", None)
-
-                estimates_property = properties.get("Estimates", {}).get("select", None)
-                estimates = (
-                    estimates_property.get("name", None) if estimates_property else None
-                )
-
-                title = properties.get("Name", {}).get("title", None)
-                title_text = (
-                    title[0]["text"]["content"] if title and len(title) > 0 else None
-                )
-
-                text_property = properties.get("Text", {}).get("rich_text", None)
-                text_property = (
-                    text_property[0].get("text", {}).get("content", None)
-                    if text_property and len(text_property) > 0
-                    else None
-                )
-
-                url_property = properties.get("URL", {}).get("rich_text", None)
-                links = (
-                    [
-                        text.get("text", {}).get("link", {}).get("url", None)
-                        for text in (url_property or [])
-                        if text.get("text", {}).get("link")
-                    ]
-                    if url_property
-                    else None
-                )
-                links = links if links and len(links) > 0 else None
-
-                laste_edited_time = page.get("last_edited_time", None)
-                created_time = page.get("created_time", None)
-
-                parent_page_id = properties.get("Parent item", {}).get("relation", None)
-                if parent_page_id and len(parent_page_id) > 0:
-                    parent_page_id = parent_page_id[0].get("id", "").replace("-", "")
-                else:
-                    parent_page_id = None
-
-                status_property = properties.get("Status", {}).get("status", None)
-                status = status_property.get("name", None) if status_property else None
-
-                task_id = (
-                    properties.get("ID", {}).get("unique_id", {}).get("number", None)
-                )
-                # Extract "FromTask" checkbox from properties.
-                from_task = properties.get("FromTask", {}).get("checkbox", False)
-
-                parsed_data.append(
-                    {
-                        "unique_id": unique_id,
-                        "page_id": page_id,
-                        "task_id": task_id,
-                        "title": title_text,
-                        "page_status": status,
-                        "created_time": created_time,
-                        "last_edited_time": laste_edited_time,
-                        "estimates": estimates,
-                        "importance": importance,
-                        "tags": tag,
-                        "due_date": due_date,
-                        "page_url": page_url,
-                        "text": text_property,
-                        "url": links,
-                        "parent_page_id": parent_page_id,
-                        "FromTask": from_task,
-                    }
-                )
-
-            parent_page_ids: Set[str] = {
-                item["parent_page_id"] for item in parsed_data if item["parent_page_id"]
-            }
-            parent_page_names = self.fetch_parent_page_names(parent_page_ids)
+            pages = [
+                NotionPage.from_api(page, fields)
+                for page in response.get("results", [])
+            ]
+
+            self.page_id_cache.set_many(
+                {
+                    page.unique_id: page.page_id
+                    for page in pages
+                    if page.unique_id is not None
+                }
+            )
 
-            for item in parsed_data:
-                if item["parent_page_id"]:
-                    item["parent_page_name"] = parent_page_names.get(
-                        item["parent_page_id"], None
-                    )
-                else:
-                    item["parent_page_name"] = None
+            if resolve_parent_names:
+                parent_page_ids: Set[str] = {
+                    page.parent_page_id for page in pages if page.parent_page_id
+                }
+                parent_page_names = {}
+                if parent_page_ids:
+                    with self.tracer.span(
+                        "notion.resolve_parents", parent_pages=len(parent_page_ids)
+                    ):
+                        parent_page_names = self.fetch_parent_page_names(
+                            parent_page_ids
+                        )
+                for page in pages:
+                    if page.parent_page_id:
+                        page.parent_page_name = parent_page_names.get(
+                            page.parent_page_id, None
+                        )
 
-            return parsed_data
+            return pages
 
         except KeyError as e:
             print(f"Error parsing Notion response: Missing key {e}")
@@ -480,3 +1051,25 @@ class NotionClient:
         except Exception as e:
             print(f"Unexpected error while parsing Notion response: {e}")
             return []
+
+    def parse_notion_response(
+        self, response: Dict, resolve_parent_names: bool = True
+    ) -> List[Dict]:
+        """
+        Parse the Notion response to extract relevant fields, including parent page names.
+        iter_parsed_pages is lighter when only some fields are needed.
+
+        Args:
+            response (Dict): The JSON response from Notion API.
+            resolve_parent_names (bool): Whether to fetch the parent page names. If False,
+                                         `parent_page_name` is None for every page.
+
+        Returns:
+            List[Dict]: A list of dictionaries containing extracted fields with None instead of [] or {}.
+        """
+        return [
+            page.to_dict()
+            for page in self.iter_parsed_pages(
+                [response], resolve_parent_names=resolve_parent_names
+            )
+        ]
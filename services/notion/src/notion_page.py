@@ -0,0 +1,209 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Fields of a parsed page, in the order of the dictionaries parse_notion_response
+# returns. "FromTask" is stored in the from_task attribute.
+PAGE_FIELDS = (
+    "unique_id",
+    "page_id",
+    "task_id",
+    "title",
+    "page_status",
+    "created_time",
+    "last_edited_time",
+    "estimates",
+    "importance",
+    "tags",
+    "due_date",
+    "page_url",
+    "text",
+    "url",
+    "parent_page_id",
+    "FromTask",
+    "parent_page_name",
+)
+
+_ATTRIBUTES = {"FromTask": "from_task"}
+
+
+def _attribute(field: str) -> str:
+    return _ATTRIBUTES.get(field, field)
+
+
+def _unique_id(page: Dict, properties: Dict) -> Optional[int]:
+    return properties.get("ID", {}).get("unique_id", {}).get("number", None)
+
+
+def _page_id(page: Dict, properties: Dict) -> Optional[str]:
+    return page.get("id", None).replace("-", "")
+
+
+def _title(page: Dict, properties: Dict) -> Optional[str]:
+    title = properties.get("Name", {}).get("title", None)
+    return title[0]["text"]["content"] if title and len(title) > 0 else None
+
+
+def _page_status(page: Dict, properties: Dict) -> Optional[str]:
+    status_property = properties.get("Status", {}).get("status", None)
+    return status_property.get("name", None) if status_property else None
+
+
+def _select_name(property_name: str) -> Callable[[Dict, Dict], Optional[str]]:
+    def extract(page: Dict, properties: Dict) -> Optional[str]:
+        select = properties.get(property_name, {}).get("select", None)
+        return select.get("name", None) if select else None
+
+    return extract
+
+
+def _tags(page: Dict, properties: Dict) -> Optional[str]:
+    tag = properties.get("Tags", {}).get("multi_select", None)
+    return tag[0].get("name", None) if tag and len(tag) > 0 else None
+
+
+def _due_date(page: Dict, properties: Dict) -> Optional[str]:
+    due_date_property = properties.get("Due Date", {}).get("date", None)
+    return due_date_property.get("start", None) if due_date_property else None
+
+
+def _text(page: Dict, properties: Dict) -> Optional[str]:
+    text_property = properties.get("Text", {}).get("rich_text", None)
+    return (
+        text_property[0].get("text", {}).get("content", None)
+        if text_property and len(text_property) > 0
+        else None
+    )
+
+
+def _url(page: Dict, properties: Dict) -> Optional[List[str]]:
+    url_property = properties.get("URL", {}).get("rich_text", None)
+    links = [
+        text.get("text", {}).get("link", {}).get("url", None)
+        for text in (url_property or [])
+        if text.get("text", {}).get("link")
+    ]
+    return links if links else None
+
+
+def _parent_page_id(page: Dict, properties: Dict) -> Optional[str]:
+    parent_page_id = properties.get("Parent item", {}).get("relation", None)
+    if parent_page_id and len(parent_page_id) > 0:
+        return parent_page_id[0].get("id", "").replace("-", "")
+    return None
+
+
+def _from_task(page: Dict, properties: Dict) -> bool:
+    return properties.get("FromTask", {}).get("checkbox", False)
+
+
+# Extracts each field from a page of a Notion query response and its properties.
+# parent_page_name is not part of the page, the client resolves it.
+_EXTRACTORS: Dict[str, Callable[[Dict, Dict], Any]] = {
+    "unique_id": _unique_id,
+    "page_id": _page_id,
+    "task_id": _unique_id,
+    "title": _title,
+    "page_status": _page_status,
+    "created_time": lambda page, properties: page.get("created_time", None),
+    "last_edited_time": lambda page, properties: page.get("last_edited_time", None),
+    "estimates": _select_name("Estimates"),
+    "importance": _select_name("Importance"),
+    "tags": _tags,
+    "due_date": _due_date,
+    "page_url": lambda page, properties: page.get("url", None),
+    "text": _text,
+    "url": _url,
+    "parent_page_id": _parent_page_id,
+    "FromTask": _from_task,
+}
+
+
+def resolve_fields(fields: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+    """
+    Validates the fields requested from the parsed pages.
+
+    Args:
+        fields (Optional[Iterable[str]]): Names of the fields, all of them if None.
+
+    Returns:
+        Tuple[str, ...]: The fields, in the order of PAGE_FIELDS.
+
+    Raises:
+        ValueError: If a field is unknown.
+    """
+    if fields is None:
+        return PAGE_FIELDS
+    fields = set(fields)
+    unknown = fields.difference(PAGE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown Notion page fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in PAGE_FIELDS if field in fields)
+
+
+class NotionPage(Mapping):
+    """
+    A page of the Notion database, parsed from a query response.
+
+    Pages are parsed with only the fields a caller requests, and read-only
+    mapping access (`page["title"]`, `page.get("FromTask")`) works as on the
+    dictionaries returned by parse_notion_response. Fields that were not
+    requested are missing rather than None.
+    """
+
+    __slots__ = tuple(_attribute(field) for field in PAGE_FIELDS)
+
+    def __init__(self, **fields: Any):
+        """
+        Args:
+            **fields: Values of the fields, by name.
+        """
+        for field, value in fields.items():
+            if field not in _EXTRACTORS and field != "parent_page_name":
+                raise TypeError(f"Unknown Notion page field: {field}")
+            setattr(self, _attribute(field), value)
+
+    @classmethod
+    def from_api(
+        cls, page: Dict, fields: Tuple[str, ...] = PAGE_FIELDS
+    ) -> "NotionPage":
+        """
+        Parses a page of a Notion query response.
+
+        Args:
+            page (Dict): A page of the "results" of the response.
+            fields (Tuple[str, ...]): Fields to parse, as returned by resolve_fields.
+                                      parent_page_name is set to None if requested.
+
+        Returns:
+            NotionPage: The parsed page.
+        """
+        record = cls.__new__(cls)
+        properties = page.get("properties", {})
+        for field in fields:
+            extractor = _EXTRACTORS.get(field)
+            value = extractor(page, properties) if extractor is not None else None
+            setattr(record, _attribute(field), value)
+        return record
+
+    def __getitem__(self, field: str) -> Any:
+        try:
+            return getattr(self, _attribute(field))
+        except (AttributeError, TypeError):
+            raise KeyError(field) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in PAGE_FIELDS if hasattr(self, _attribute(field)))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: The parsed fields, as returned by parse_notion_response.
+        """
+        return {field: self[field] for field in self}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{field}={self[field]!r}" for field in self)
+        return f"NotionPage({fields})"
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+
+from rich import print
+
+
+class PageIdCache:
+    """
+    On-disk cache of the mapping between the Notion unique IDs (the `ID` property)
+    and the page UUIDs required by the API.
+
+    Unique IDs never change, so entries only need to be invalidated when a cached
+    page can no longer be found. The cache disables itself if its database cannot
+    be opened, so callers always fall back to querying Notion.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file, or ":memory:".
+        """
+        self.db_path = db_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Opens the database on first use, returning None if the cache is disabled."""
+        if self._disabled:
+            return None
+        if self._connection is None:
+            try:
+                cache_dir = os.path.dirname(self.db_path)
+                if cache_dir:
+                    os.makedirs(cache_dir, exist_ok=True)
+                connection = sqlite3.connect(self.db_path, check_same_thread=False)
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS page_ids ("
+                    "unique_id INTEGER PRIMARY KEY, page_id TEXT NOT NULL)"
+                )
+                connection.commit()
+                self._connection = connection
+            except (OSError, sqlite3.Error) as e:
+                print(f"[yellow]Page ID cache disabled: {e}[/yellow]")
+                self._disabled = True
+                return None
+        return self._connection
+
+    def get_page_id(self, unique_id: int) -> Optional[str]:
+        """
+        Args:
+            unique_id (int): The Notion unique ID.
+
+        Returns:
+            Optional[str]: The cached page UUID (without hyphens), or None on a miss.
+        """
+        return self.get_page_ids([unique_id]).get(int(unique_id))
+
+    def get_page_ids(self, unique_ids: Iterable[int]) -> Dict[int, str]:
+        """
+        Args:
+            unique_ids (Iterable[int]): The Notion unique IDs to look up.
+
+        Returns:
+            Dict[int, str]: The cached page UUIDs of the IDs found in the cache.
+        """
+        unique_ids = [int(unique_id) for unique_id in unique_ids]
+        with self._lock:
+            connection = self._connect()
+            if connection is None or not unique_ids:
+                return {}
+            page_ids: Dict[int, str] = {}
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(unique_ids), 500):
+                chunk = unique_ids[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = connection.execute(
+                    f"SELECT unique_id, page_id FROM page_ids "
+                    f"WHERE unique_id IN ({placeholders})",
+                    chunk,
+                )
+                page_ids.update(dict(rows))
+            return page_ids
+
+    def set_many(self, page_ids: Dict[int, str]) -> None:
+        """
+        Args:
+            page_ids (Dict[int, str]): Page UUIDs keyed by Notion unique ID.
+        """
+        with self._lock:
+            connection = self._connect()
+            if connection is None or not page_ids:
+                return
+            connection.executemany(
+                "INSERT OR REPLACE INTO page_ids (unique_id, page_id) VALUES (?, ?)",
+                [(int(unique_id), page_id) for unique_id, page_id in page_ids.items()],
+            )
+            connection.commit()
+
+    def invalidate(self, unique_id: int) -> None:
+        """
+        Args:
+            unique_id (int): The Notion unique ID whose entry is stale.
+        """
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return
+            connection.execute(
+                "DELETE FROM page_ids WHERE unique_id = ?", (int(unique_id),)
+            )
+            connection.commit()
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from rich import print
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket limiting the rate of requests sent to an API.
+
+    Tokens are refilled at `rate` per second up to `burst`, and every request
+    consumes one. When `lock_file` is set, the bucket state is stored in that file
+    under an exclusive lock, so that all processes using the same file share a
+    single budget.
+    """
+
+    def __init__(
+        self,
+        rate: float = 3.0,
+        burst: int = 3,
+        lock_file: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            rate (float): Average number of requests allowed per second.
+            burst (int): Maximum number of requests that can be sent back to back.
+            lock_file (Optional[str]): File used to share the bucket between processes.
+            clock (Callable[[], float]): Wall clock returning seconds.
+            sleep (Callable[[float], None]): Function used to wait for tokens.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.lock_file = lock_file
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._state: Dict[str, float] = {
+            "tokens": float(burst),
+            "updated": clock(),
+            "paused_until": 0.0,
+        }
+        if lock_file and fcntl is None:
+            print(
+                "[yellow]File locking is unavailable, the Notion rate limit "
+                "is only shared within this process.[/yellow]"
+            )
+            self.lock_file = None
+
+    def acquire(self) -> float:
+        """
+        Blocks until a request may be sent and consumes a token.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait = self._update(self._take_token)
+            if wait <= 0:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for the given duration, e.g. after a 429 response
+        with a `Retry-After` header.
+
+        Args:
+            seconds (float): Number of seconds to wait before the next request.
+        """
+
+        def extend_pause(state: Dict[str, float], now: float) -> float:
+            state["paused_until"] = max(state["paused_until"], now + seconds)
+            # A single request may go out once the pause is over
+            state["tokens"] = min(state["tokens"], 1.0)
+            return 0.0
+
+        self._update(extend_pause)
+
+    def _take_token(self, state: Dict[str, float], now: float) -> float:
+        """Consumes a token, returning 0 or the number of seconds to wait for one."""
+        if now < state["paused_until"]:
+            return state["paused_until"] - now
+        if state["tokens"] >= 1:
+            state["tokens"] -= 1
+            return 0.0
+        return (1 - state["tokens"]) / self.rate
+
+    def _update(self, operation: Callable[[Dict[str, float], float], float]) -> float:
+        """
+        Refills the bucket and applies an operation to its state atomically.
+
+        Args:
+            operation (Callable): Function mutating the state and returning a wait time.
+
+        Returns:
+            float: The value returned by the operation.
+        """
+        with self._lock:
+            if not self.lock_file:
+                return self._apply(self._state, operation)
+
+            lock_dir = os.path.dirname(self.lock_file)
+            if lock_dir:
+                os.makedirs(lock_dir, exist_ok=True)
+            with open(self.lock_file, "a+") as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                try:
+                    file.seek(0)
+                    try:
+                        state = json.loads(file.read() or "null") or self._state
+                    except ValueError:
+                        state = self._state
+                    result = self._apply(state, operation)
+                    file.seek(0)
+                    file.truncate()
+                    file.write(json.dumps(state))
+                    file.flush()
+                    return result
+                finally:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+    def _apply(
+        self,
+        state: Dict[str, float],
+        operation: Callable[[Dict[str, float], float], float],
+    ) -> float:
+        now = self._clock()
+        # No tokens are refilled while the bucket is paused
+        elapsed = max(0.0, now - max(state["updated"], state["paused_until"]))
+        state["tokens"] = min(float(self.burst), state["tokens"] + elapsed * self.rate)
+        state["updated"] = now
+        return operation(state, now)
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from rich import print
+
+# Returned by TTLCache.get on a miss when no default is given, so that cached
+# None values can be told apart from misses.
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+    The cache can be persisted to a JSON file to be shared between runs.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 24 * 60 * 60,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            maxsize (int): Maximum number of entries, the least recently used are evicted first.
+            ttl (float): Time-to-live of an entry in seconds.
+            path (Optional[str]): JSON file used by load and save. No persistence if None.
+            clock (Callable[[], float]): Wall clock returning seconds, used for expiry.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not MISSING
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        Args:
+            key (Hashable): The cache key.
+            default (Any): Value returned on a miss or an expired entry.
+
+        Returns:
+            Any: The cached value, or default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache, must be JSON serialisable to be persisted.
+        """
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Removes an entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def load(self) -> None:
+        """Loads the unexpired entries persisted in `path`, if any."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as file:
+                entries = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"[yellow]Ignoring unreadable cache file {self.path}: {e}[/yellow]")
+            return
+
+        now = self._clock()
+        with self._lock:
+            for key, expires_at, value in entries[-self.maxsize :]:
+                if expires_at > now:
+                    self._entries[key] = (expires_at, value)
+
+    def save(self) -> None:
+        """Persists the entries to `path`, keeping their LRU order."""
+        if not self.path:
+            return
+        with self._lock:
+            entries = [
+                [key, expires_at, value]
+                for key, (expires_at, value) in self._entries.items()
+            ]
+        try:
+            cache_dir = os.path.dirname(self.path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, "w") as file:
+                json.dump(entries, file)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            print(f"[yellow]Could not save cache file {self.path}: {e}[/yellow]")
@@ -0,0 +1,263 @@
+import asyncio
+import functools
+import inspect
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from rich import print
+from rich.console import Console
+from rich.live import Live
+from rich.progress import Progress
+
+from services.notion.src.notion_client import NotionClient
+from services.sync_notion_google_task.main import NotionToGoogleTaskSyncer
+
+
+class ConcurrencyLimitedClient:
+    """
+    Proxy calling the methods of a blocking API client while holding a semaphore,
+    so that at most a fixed number of calls to the service are in flight across
+    all worker threads. Generators returned by the client, e.g. the pages of a
+    paginated query, hold the semaphore while each of their items is produced.
+    """
+
+    def __init__(self, client: Any, semaphore: threading.BoundedSemaphore):
+        """
+        Args:
+            client (Any): The client whose method calls are limited.
+            semaphore (threading.BoundedSemaphore): Held for the duration of each call.
+        """
+        self._client = client
+        self._semaphore = semaphore
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def limited(*args, **kwargs):
+            with self._semaphore:
+                result = attribute(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return self._limited_iteration(result)
+            return result
+
+        return limited
+
+    def _limited_iteration(self, generator: Iterator) -> Iterator:
+        """
+        Yields the items of a generator, holding the semaphore while each one is
+        produced but not while the caller processes it.
+
+        Args:
+            generator (Iterator): A generator returned by the client.
+
+        Yields:
+            The items of the generator.
+        """
+        while True:
+            with self._semaphore:
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+            yield item
+
+
+class AsyncNotionToGoogleTaskSyncer(NotionToGoogleTaskSyncer):
+    """
+    Runs the same sync as NotionToGoogleTaskSyncer on an asyncio event loop.
+
+    The Notion query, the Google task index build and the per-tasklist processing
+    are overlapped, while each service is limited to a fixed number of concurrent
+    calls. The blocking clients run in worker threads, so their retry and rate
+    limiting behaviour is unchanged. Messages of different task lists may be
+    interleaved in the output.
+    """
+
+    # Maximum number of concurrent calls to the Google Tasks API
+    GOOGLE_CONCURRENCY = 4
+    # Default number of task lists processed at the same time
+    TASKLIST_WORKERS = 4
+
+    def __init__(
+        self,
+        *args,
+        notion_concurrency: int = NotionClient.MAX_CONCURRENT_REQUESTS,
+        google_concurrency: int = GOOGLE_CONCURRENCY,
+        **kwargs,
+    ):
+        """
+        Takes the arguments of NotionToGoogleTaskSyncer, with tasklist_workers
+        defaulting to TASKLIST_WORKERS, and:
+
+        Args:
+            notion_concurrency (int): Maximum number of concurrent Notion calls.
+            google_concurrency (int): Maximum number of concurrent Google Tasks calls.
+        """
+        kwargs.setdefault("tasklist_workers", self.TASKLIST_WORKERS)
+        super().__init__(*args, **kwargs)
+        self._notion_semaphore = threading.BoundedSemaphore(notion_concurrency)
+        self.notion_client = ConcurrencyLimitedClient(
+            self.notion_client, self._notion_semaphore
+        )
+        self.google_tasks_manager = ConcurrencyLimitedClient(
+            self.google_tasks_manager, threading.BoundedSemaphore(google_concurrency)
+        )
+
+    def _next_notion_response(self, notion_responses: Iterator[Dict]) -> Optional[Dict]:
+        """Fetches the next Notion query response, or None once exhausted."""
+        with self._notion_semaphore, self.tracer.span("notion.fetch"):
+            return next(notion_responses, None)
+
+    def sync_pages_to_google_tasks(
+        self,
+        last_successful_sync: Optional[datetime] = None,
+        single_page_id: Optional[str] = None,
+    ):
+        """Runs sync_pages_to_google_tasks_async on a new event loop."""
+        with self.tracer.span("sync_pages_to_google_tasks", engine="async"):
+            asyncio.run(
+                self.sync_pages_to_google_tasks_async(
+                    last_successful_sync, single_page_id
+                )
+            )
+
+    def sync_google_tasks_to_notion(self, last_successful_sync: datetime):
+        """Runs sync_google_tasks_to_notion_async on a new event loop."""
+        with self.tracer.span("sync_google_tasks_to_notion", engine="async"):
+            asyncio.run(self.sync_google_tasks_to_notion_async(last_successful_sync))
+
+    async def sync_pages_to_google_tasks_async(
+        self,
+        last_successful_sync: Optional[datetime] = None,
+        single_page_id: Optional[str] = None,
+    ):
+        """
+        Synchronizes Notion pages to Google Tasks. The Google task lists and task
+        index are loaded while Notion is queried, and each page of results is synced
+        while the next one is fetched.
+
+        Args:
+            last_successful_sync (Optional[datetime]): If provided, only sync pages
+                                                      modified since this timestamp.
+            single_page_id (Optional[str]): If provided, only sync the specified page.
+                                            Accepts a page ID or a unique task ID.
+        """
+        notion_responses = await asyncio.to_thread(
+            self._notion_responses, last_successful_sync, single_page_id
+        )
+        if notion_responses is None:
+            return
+        notion_responses = iter(notion_responses)
+        self.task_index = None
+
+        # Parsed result pages, bounded so that Notion is not queried far ahead
+        parsed_queue: "asyncio.Queue[Optional[List[Dict]]]" = asyncio.Queue(maxsize=2)
+
+        async def fetch_notion_pages():
+            try:
+                while True:
+                    notion_response = await asyncio.to_thread(
+                        self._next_notion_response, notion_responses
+                    )
+                    if notion_response is None:
+                        break
+                    parsed_pages = await asyncio.to_thread(
+                        self._parse_notion_response, notion_response
+                    )
+                    await parsed_queue.put(parsed_pages)
+            except (requests.exceptions.RequestException, FileNotFoundError) as e:
+                print(f"[red]Error fetching pages from Notion: {e}[/red]")
+            except Exception:
+                # Unblocks the consumer, which then re-raises the error
+                await parsed_queue.put(None)
+                raise
+            await parsed_queue.put(None)
+
+        async def load_google_tasks() -> Dict[str, str]:
+            google_task_lists = await asyncio.to_thread(
+                self.google_tasks_manager.list_task_lists
+            )
+            await asyncio.to_thread(self.build_task_index, google_task_lists)
+            return google_task_lists
+
+        notion_fetch = asyncio.create_task(fetch_notion_pages())
+        google_load = asyncio.create_task(load_google_tasks())
+
+        console = Console()
+        progress = Progress()
+        task = progress.add_task("[cyan]Processing Pages...", total=None)
+        pages_seen = 0
+
+        try:
+            with Live(progress, console=console, refresh_per_second=10):
+                while True:
+                    parsed_pages = await parsed_queue.get()
+                    if parsed_pages is None:
+                        break
+                    if not parsed_pages:
+                        continue
+                    google_task_lists = await google_load
+
+                    pages_seen += len(parsed_pages)
+                    progress.update(task, total=pages_seen)
+                    await asyncio.to_thread(
+                        self._sync_parsed_pages,
+                        parsed_pages,
+                        google_task_lists,
+                        console,
+                    )
+                    progress.advance(task, len(parsed_pages))
+            await notion_fetch
+        finally:
+            notion_fetch.cancel()
+            # The task lists are only needed if pages were retrieved
+            google_load.cancel()
+            await asyncio.gather(notion_fetch, google_load, return_exceptions=True)
+
+        if pages_seen == 0:
+            print("[red]No pages retrieved from Notion.[/red]")
+
+    async def sync_google_tasks_to_notion_async(self, last_successful_sync: datetime):
+        """
+        Synchronizes Google Tasks to Notion, processing up to tasklist_workers
+        task lists at the same time. Each task list goes through the same steps as
+        in sync_google_tasks_to_notion.
+
+        Args:
+            last_successful_sync (datetime): Only tasks updated since then are synced.
+
+        Raises:
+            Exception: Summarising the errors, once every task list is processed.
+        """
+        console = Console()
+        task_lists = await asyncio.to_thread(self.google_tasks_manager.list_task_lists)
+        tasklist_semaphore = asyncio.Semaphore(self.tasklist_workers)
+
+        async def sync_tasklist(tasklist_name: str, tasklist_id: str):
+            async with tasklist_semaphore:
+                await asyncio.to_thread(
+                    self._sync_tasklist,
+                    tasklist_name,
+                    tasklist_id,
+                    last_successful_sync,
+                    console,
+                )
+
+        results = await asyncio.gather(
+            *(
+                sync_tasklist(tasklist_name, tasklist_id)
+                for tasklist_name, tasklist_id in task_lists.items()
+            ),
+            return_exceptions=True,
+        )
+        errors = {
+            tasklist_name: result
+            for tasklist_name, result in zip(task_lists, results)
+            if isinstance(result, Exception)
+        }
+        self._raise_tasklist_errors(errors, len(task_lists), console)
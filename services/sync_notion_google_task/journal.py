@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List
+
+from rich import print
+
+from services.sync_notion_google_task.planner import OPERATIONS_BY_KIND, SyncOperation
+
+
+@dataclass
+class UnfinishedOperation:
+    """An operation of the journal that was planned but never completed."""
+
+    operation: SyncOperation
+    # Number of times the operation was planned
+    attempts: int = 0
+    # Progress recorded while the operation was executed, e.g. a created page ID
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+class SyncJournal:
+    """
+    Write-ahead journal of the operations of sync plans, as JSON lines.
+
+    Operations are recorded as planned before they are executed, then as done once
+    their result is known. Each append is flushed and fsync'd, so that a run
+    interrupted at any point leaves behind the operations that may not have been
+    applied, for the next run to verify and replay. Like SyncStateStore, the journal
+    disables itself if its file cannot be written, in which case runs are not
+    resumable but otherwise unaffected.
+    """
+
+    # Unfinished operations are abandoned once planned this many times
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path to the journal file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._disabled = False
+
+    @staticmethod
+    def _key(operation: SyncOperation) -> str:
+        """Returns the identity of an operation across runs."""
+        return json.dumps(list(operation.key), ensure_ascii=False)
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        """Appends records to the journal and waits for them to reach the disk."""
+        if not records:
+            return
+        with self._lock:
+            if self._disabled:
+                return
+            try:
+                journal_dir = os.path.dirname(self.path)
+                if journal_dir:
+                    os.makedirs(journal_dir, exist_ok=True)
+                with open(self.path, "a+b") as journal_file:
+                    # Terminate a record cut short by a crash, so that it does not
+                    # swallow the first record appended
+                    if journal_file.seek(0, os.SEEK_END) > 0:
+                        journal_file.seek(-1, os.SEEK_END)
+                        if journal_file.read(1) != b"\n":
+                            journal_file.write(b"\n")
+                    for record in records:
+                        journal_file.write(
+                            (json.dumps(record, ensure_ascii=False) + "\n").encode(
+                                "utf-8"
+                            )
+                        )
+                    journal_file.flush()
+                    os.fsync(journal_file.fileno())
+            except OSError as e:
+                print(f"[yellow]Sync journal disabled: {e}[/yellow]")
+                self._disabled = True
+
+    def record_planned(self, operations: Iterable[SyncOperation]) -> None:
+        """
+        Args:
+            operations (Iterable[SyncOperation]): Operations about to be executed.
+        """
+        self._append(
+            [
+                {
+                    "status": "planned",
+                    "key": self._key(operation),
+                    "operation": {"kind": operation.kind, **asdict(operation)},
+                }
+                for operation in operations
+            ]
+        )
+
+    def record_progress(self, operation: SyncOperation, **details: Any) -> None:
+        """
+        Records an intermediate result of an operation, used when it is replayed.
+
+        Args:
+            operation (SyncOperation): The operation being executed.
+            **details: JSON serialisable values describing the progress.
+        """
+        self._append(
+            [{"status": "progress", "key": self._key(operation), "details": details}]
+        )
+
+    def record_done(self, operations: Iterable[SyncOperation]) -> None:
+        """
+        Args:
+            operations (Iterable[SyncOperation]): Operations whose effect is applied.
+        """
+        self._append(
+            [
+                {"status": "done", "key": self._key(operation)}
+                for operation in operations
+            ]
+        )
+
+    def _read(self) -> List[Dict[str, Any]]:
+        """Reads the journal records, ignoring a line truncated by a crash."""
+        try:
+            with open(self.path, encoding="utf-8") as journal_file:
+                lines = journal_file.readlines()
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            print(f"[yellow]Sync journal could not be read: {e}[/yellow]")
+            return []
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return records
+
+    def unfinished(self) -> List[UnfinishedOperation]:
+        """
+        Returns:
+            List[UnfinishedOperation]: The operations planned but not done, in the
+            order they were first planned.
+        """
+        pending: Dict[str, UnfinishedOperation] = {}
+        for record in self._read():
+            key = record.get("key")
+            status = record.get("status")
+            if status == "planned":
+                if key not in pending:
+                    operation = dict(record["operation"])
+                    kind = operation.pop("kind")
+                    if kind not in OPERATIONS_BY_KIND:
+                        continue
+                    pending[key] = UnfinishedOperation(
+                        OPERATIONS_BY_KIND[kind](**operation)
+                    )
+                pending[key].attempts += 1
+            elif status == "progress" and key in pending:
+                pending[key].details.update(record.get("details", {}))
+            elif status == "done":
+                pending.pop(key, None)
+        return list(pending.values())
+
+    def compact(self) -> None:
+        """
+        Rewrites the journal with the unfinished operations only, removing it if
+        every operation is done.
+        """
+        unfinished = self.unfinished()
+        with self._lock:
+            if self._disabled:
+                return
+            try:
+                if not unfinished:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                    return
+                temporary_path = f"{self.path}.tmp"
+                with open(temporary_path, "w", encoding="utf-8") as journal_file:
+                    for entry in unfinished:
+                        key = self._key(entry.operation)
+                        operation = {
+                            "kind": entry.operation.kind,
+                            **asdict(entry.operation),
+                        }
+                        for _ in range(entry.attempts):
+                            record = {
+                                "status": "planned",
+                                "key": key,
+                                "operation": operation,
+                            }
+                            journal_file.write(
+                                json.dumps(record, ensure_ascii=False) + "\n"
+                            )
+                        if entry.details:
+                            record = {
+                                "status": "progress",
+                                "key": key,
+                                "details": entry.details,
+                            }
+                            journal_file.write(
+                                json.dumps(record, ensure_ascii=False) + "\n"
+                            )
+                    journal_file.flush()
+                    os.fsync(journal_file.fileno())
+                os.replace(temporary_path, self.path)
+            except OSError as e:
+                print(f"[yellow]Sync journal could not be compacted: {e}[/yellow]")
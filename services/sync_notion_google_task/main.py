@@ -1,19 +1,53 @@
 import datetime as dt
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
+import requests
 from pytest import console_main
 from rich import print
 from rich.console import Console
 from rich.live import Live
 from rich.progress import Progress
 
+from services.common.metrics import MetricsRegistry
+from services.common.retry import RetryPolicy
+from services.common.tracing import Tracer
 from services.free_sms_alert.main import SMSAPI
-from services.google_task.src.retrieve_tasks import GoogleTasksManager
+from services.google_task.src.retrieve_tasks import (
+    GoogleTasksManager,
+    is_missing_task_error,
+)
+from services.google_task.src.tasklist_snapshot import TasklistSnapshot
 from services.notion.src.notion_client import NotionClient
+from services.notion.src.notion_page import NotionPage
+from services.notion.src.rate_limiter import TokenBucketRateLimiter
+from services.sync_notion_google_task.sync_state import SyncStateStore
 
 
 class NotionToGoogleTaskSyncer:
+    # Fields of the Notion pages read by the sync, the others are not parsed
+    PAGE_FIELDS = (
+        "unique_id",
+        "page_id",
+        "title",
+        "page_status",
+        "last_edited_time",
+        "importance",
+        "tags",
+        "due_date",
+        "page_url",
+        "text",
+        "url",
+        "FromTask",
+        "parent_page_id",
+        "parent_page_name",
+    )
+
     def __init__(
         self,
         notion_api_key: str,
@@ -23,11 +57,61 @@ class NotionToGoogleTaskSyncer:
         sms_user: str,
         sms_password: str,
         verbose: bool = True,
+        notion_rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        tasklist_workers: int = 1,
+        sync_state: Optional[SyncStateStore] = None,
+        notion_base_url: str = NotionClient.API_BASE_URL,
+        google_api_endpoint: Optional[str] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Tracer] = None,
     ):
-        self.notion_client = NotionClient(notion_api_key, database_id, project_root)
-        self.google_tasks_manager = GoogleTasksManager(token_path)
-        self.sms_client = SMSAPI(sms_user, sms_password)
+        # A single retry policy and metrics registry, so that they cover every service
+        self.retry_policy = RetryPolicy()
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        # Spans of the sync phases, only recorded when a tracer is given
+        self.tracer = tracer if tracer is not None else Tracer(enabled=False)
+        self.notion_client = NotionClient(
+            notion_api_key,
+            database_id,
+            project_root,
+            rate_limiter=notion_rate_limiter,
+            retry_policy=self.retry_policy,
+            base_url=notion_base_url,
+            metrics=self.metrics,
+            tracer=self.tracer,
+        )
+        self.google_tasks_manager = GoogleTasksManager(
+            token_path,
+            retry_policy=self.retry_policy,
+            api_endpoint=google_api_endpoint,
+            metrics=self.metrics,
+        )
+        self.sms_client = SMSAPI(sms_user, sms_password, metrics=self.metrics)
+        # Links between Notion pages and Google Tasks, kept between runs
+        if sync_state is None:
+            sync_state = SyncStateStore(
+                os.path.join(project_root, ".cache", "sync_state.sqlite3")
+            )
+        self.sync_state = sync_state
+        # Notion statuses recorded since then were observed during this run
+        self._run_started_at = time.time()
         self.verbose = verbose
+        # Number of task lists synced in parallel by sync_google_tasks_to_notion
+        self.tasklist_workers = max(1, tasklist_workers)
+        # Maps the Notion ID suffix of task titles to their tasklist and task IDs.
+        # Built lazily once per sync run, see build_task_index.
+        self.task_index: Optional[Dict[int, Dict[str, str]]] = None
+        # Queued task creations awaiting a batch flush:
+        # request key -> (page ID, tasklist ID, content hash)
+        self._pending_task_creations: Dict[str, Tuple[int, str, str]] = {}
+        # Queued task updates awaiting a batch flush:
+        # request key -> (page ID, content hash, creation arguments if the task is gone)
+        self._pending_task_updates: Dict[str, Tuple[int, str, Dict]] = {}
+
+    def close(self) -> None:
+        """Releases the pooled HTTP connections and the sync state database."""
+        self.notion_client.close()
+        self.sync_state.close()
 
     def _verbose_print(
         self, message: str, console: Console, style: str = "", *args, **kwargs
@@ -72,107 +156,524 @@ class NotionToGoogleTaskSyncer:
     # Method to sync Notion pages to Google Tasks
 
     def sync_pages_to_google_tasks(
-        self, last_successful_sync: Optional[datetime] = None, single_page_id: Optional[str] = None
+        self,
+        last_successful_sync: Optional[datetime] = None,
+        single_page_id: Optional[str] = None,
     ):
         """
         Synchronizes Notion pages to Google Tasks with a progress bar that remains at the top.
+        Notion query results are consumed page by page, so tasks are created while the
+        remaining results are still being fetched.
 
         Args:
             last_successful_sync (Optional[datetime]): If provided, only sync pages
                                                       modified since this timestamp.
-            single_page_id (Optional[int]): If provided, only sync the specified page ID.
+            single_page_id (Optional[str]): If provided, only sync the specified page.
+                                            Accepts a page ID or a unique task ID.
         """
+        notion_responses = self._notion_responses(last_successful_sync, single_page_id)
+        if notion_responses is None:
+            return
+
+        google_task_lists = None
+        self.task_index = None
+
+        console = Console()
+        progress = Progress()
+        task = progress.add_task("[cyan]Processing Pages...", total=None)
+        pages_seen = 0
+
+        with Live(progress, console=console, refresh_per_second=10), self.tracer.span(
+            "sync_pages_to_google_tasks"
+        ) as sync_span:
+            try:
+                for notion_response in self.tracer.iter_spans(
+                    "notion.fetch", notion_responses
+                ):
+                    parsed_pages = self._parse_notion_response(notion_response)
+                    if not parsed_pages:
+                        continue
+                    if google_task_lists is None:
+                        google_task_lists = self.google_tasks_manager.list_task_lists()
+
+                    pages_seen += len(parsed_pages)
+                    progress.update(task, total=pages_seen)
+                    self._sync_parsed_pages(parsed_pages, google_task_lists, console)
+                    progress.advance(task, len(parsed_pages))
+            except (requests.exceptions.RequestException, FileNotFoundError) as e:
+                print(f"[red]Error fetching pages from Notion: {e}[/red]")
+            sync_span.set_attribute("pages", pages_seen)
+
+        if pages_seen == 0:
+            print("[red]No pages retrieved from Notion.[/red]")
+
+    def _parse_notion_response(self, notion_response: Dict) -> List[NotionPage]:
+        """Parses the fields the sync reads from a Notion query response, within a span."""
+        with self.tracer.span("notion.parse") as span:
+            parsed_pages = list(
+                self.notion_client.iter_parsed_pages(
+                    [notion_response], fields=self.PAGE_FIELDS
+                )
+            )
+            span.set_attribute("pages", len(parsed_pages))
+        return parsed_pages
+
+    def _notion_responses(
+        self,
+        last_successful_sync: Optional[datetime] = None,
+        single_page_id: Optional[str] = None,
+    ) -> Optional[Iterable[Dict]]:
+        """
+        Returns the Notion query responses holding the pages to sync.
+
+        Args:
+            last_successful_sync (Optional[datetime]): If provided, only pages
+                                                      modified since this timestamp.
+            single_page_id (Optional[str]): If provided, only the specified page.
+                                            Accepts a page ID or a unique task ID.
+
+        Returns:
+            Optional[Iterable[Dict]]: The query responses, fetched lazily, or None if
+            the unique task ID could not be resolved.
+        """
+        if single_page_id and str(single_page_id).isdigit():
+            # Unique task IDs are resolved through the page ID cache
+            resolved_page_id = self.notion_client.resolve_page_id(int(single_page_id))
+            if resolved_page_id is None:
+                print(f"[red]No Notion page found for task ID {single_page_id}.[/red]")
+                return None
+            single_page_id = resolved_page_id
+
         if not single_page_id:
-            notion_pages = self.notion_client.get_filtered_sorted_database(
+            return self.notion_client.iter_database_query(
                 last_successful_sync=last_successful_sync
             )
-        else:
-            single_page = self.notion_client.get_page_by_id(single_page_id)
-            if single_page:
-                notion_pages = {"results": [single_page]}
-            else:
-                notion_pages = None
-        if not notion_pages:
-            print("[red]No pages retrieved from Notion.[/red]")
+        single_page = self.notion_client.get_page_by_id(single_page_id)
+        return [{"results": [single_page]}] if single_page else []
+
+    def _sync_parsed_pages(
+        self,
+        parsed_pages: List[Dict],
+        google_task_lists: Dict[str, str],
+        console: Console,
+    ):
+        """
+        Queues the Google Tasks of a batch of parsed Notion pages and creates them.
+
+        Args:
+            parsed_pages (List[Dict]): Parsed Notion pages.
+            google_task_lists (Dict[str, str]): A dictionary of Google task lists with their IDs.
+            console (Console): The console used for progress output.
+        """
+        checked_at = time.time()
+        self.sync_state.upsert_many(
+            {
+                page["unique_id"]: {
+                    "page_id": page.get("page_id"),
+                    "notion_status": page.get("page_status"),
+                    "notion_last_edited": page.get("last_edited_time"),
+                    "notion_checked_at": checked_at,
+                }
+                for page in parsed_pages
+                if page["unique_id"] is not None
+            }
+        )
+        for page in parsed_pages:
+            self._sync_page_to_google_task(page, google_task_lists, console)
+        self._flush_task_creations(console)
+
+    def _sync_page_to_google_task(
+        self, page: Dict, google_task_lists: Dict[str, str], console: Console
+    ):
+        """
+        Creates the Google Task of a single parsed Notion page if it does not exist yet,
+        or updates it if its title, notes or due date changed since the last sync.
+
+        Args:
+            page (Dict): A parsed Notion page.
+            google_task_lists (Dict[str, str]): A dictionary of Google task lists with their IDs.
+            console (Console): The console used for progress output.
+        """
+        page_id = page["unique_id"]
+        tag = page["tags"] or "NoTag"
+
+        self._verbose_print("Processing Page ID: {}", console, "bold", page_id)
+        self._verbose_print("Page Title: {}", console, "blue", page["title"])
+
+        # Pages created from a Google Task are owned by the task, skip them
+        if page.get("FromTask", False):
+            self._verbose_print(
+                "FromTask enabled for page ID '{}'. Skipping...",
+                console,
+                "yellow",
+                page_id,
+            )
             return
 
-        parsed_pages = self.notion_client.parse_notion_response(notion_pages)
-        google_task_lists = self.google_tasks_manager.list_task_lists()
+        content = self._task_content(page, console)
+        task_title_full = content["title"]
+        task_description = content["notes"]
+        recomputed_due_date = content["due_date"]
+        content_hash = content["content_hash"]
 
-        console = Console()
-        progress = Progress()
+        existing_task = self.find_task(google_task_lists, page_id)
+        if existing_task is not None:
+            record = self.sync_state.get(page_id)
+            if not record or record["content_hash"] is None:
+                # Tasks synced before content hashes were recorded are assumed up to
+                # date, rather than patching all of them on the first run
+                self.sync_state.upsert(
+                    page_id,
+                    tasklist_id=existing_task["tasklist_id"],
+                    task_id=existing_task["task_id"],
+                    content_hash=content_hash,
+                )
+                self._verbose_print(
+                    "Recorded the content of the task for page ID '{}'. Skipping...",
+                    console,
+                    "yellow",
+                    page_id,
+                )
+                return
+            if record["content_hash"] == content_hash:
+                self._verbose_print(
+                    "Task for page ID '{}' already exists and is up to date. Skipping...",
+                    console,
+                    "yellow",
+                    page_id,
+                )
+                return
+            if self._parent_unresolved(page):
+                self._verbose_print(
+                    "Parent page of page ID '{}' could not be resolved. Skipping update...",
+                    console,
+                    "yellow",
+                    page_id,
+                )
+                return
+            task_content = {
+                "tasklist_id": existing_task["tasklist_id"],
+                "task_title": task_title_full,
+                "task_notes": task_description,
+                "due_date": recomputed_due_date,
+            }
+            request_id = self.google_tasks_manager.queue_update_task(
+                task_id=existing_task["task_id"], **task_content
+            )
+            self._pending_task_updates[request_id] = (
+                page_id,
+                content_hash,
+                task_content,
+            )
+            return
 
-        task = progress.add_task("[cyan]Processing Pages...", total=len(parsed_pages))
+        try:
+            tasklist_id = self.ensure_tasklist_exists(tag, google_task_lists)
+        except Exception as e:
+            self._verbose_print(
+                "Error ensuring task list for tag '{}': {}", console, "red", tag, e
+            )
+            self.sms_client.send_sms(f"Error ensuring task list for tag '{tag}': {e}")
+            raise e
 
-        with Live(progress, console=console, refresh_per_second=10):
-            for page in parsed_pages:
-                page_id = page["unique_id"]
-                page_title = page["title"]
-                tag = page["tags"] or "NoTag"
-                due_date = page["due_date"]
+        try:
+            request_id = self.google_tasks_manager.queue_create_task(
+                tasklist_id=tasklist_id,
+                task_title=task_title_full,
+                task_notes=task_description,
+                due_date=recomputed_due_date,
+            )
+            self._pending_task_creations[request_id] = (
+                page_id,
+                tasklist_id,
+                content_hash,
+            )
+        except Exception as e:
+            self._verbose_print(
+                "Error creating task for page ID '{}': {}", console, "red", page_id, e
+            )
+            self.sms_client.send_sms(
+                f"Error creating task for page ID '{page_id}': {e}"
+            )
+            raise e
 
-                # Adjust the due date to today if it's too far in the future.
-                # This is a personal preference to ensure tasks are dealt with promptly.
-                recomputed_due_date = self.compute_due_date(page["due_date"])
+    def _task_content(self, page: Dict, console: Console, notify: bool = True) -> Dict:
+        """
+        Builds the content of the Google Task of a parsed Notion page.
 
-                importance = page["importance"]
-                text = page["text"]
-                urls = page["url"]
-                page_url = page["page_url"]
-                parent_page_name = page["parent_page_name"] or None
+        Args:
+            page (Dict): A parsed Notion page.
+            console (Console): The console used for progress output.
+            notify (bool): Whether errors are alerted by SMS.
 
-                self._verbose_print("Processing Page ID: {}", console, "bold", page_id)
-                self._verbose_print("Page Title: {}", console, "blue", page_title)
+        Returns:
+            Dict: The task "title", "notes", "due_date" and the "content_hash" of them.
+        """
+        page_id = page["unique_id"]
+        parent_page_name = page["parent_page_name"] or None
 
-                # Modify check: also skip if the Notion page has the FromTask checkbox enabled
-                if self.task_exists(google_task_lists, page_id) or page.get(
-                    "FromTask", False
-                ):
-                    self._verbose_print("Task for page ID '{}' already exists or FromTask enabled. Skipping...", console, "yellow", page_id)
-                    progress.advance(task)
-                    continue
+        # Adjust the due date to today if it's too far in the future.
+        # This is a personal preference to ensure tasks are dealt with promptly.
+        recomputed_due_date = self.compute_due_date(page["due_date"])
 
-                try:
-                    tasklist_id = self.ensure_tasklist_exists(tag, google_task_lists)
-                except Exception as e:
-                    self._verbose_print("Error ensuring task list for tag '{}': {}", console, "red", tag, e)
-                    progress.advance(task)
-                    self.sms_client.send_sms(
-                        f"Error ensuring task list for tag '{tag}': {e}"
-                    )
-                    raise e
+        try:
+            task_description = self.build_task_description(
+                page["importance"],
+                page["text"],
+                page["url"],
+                page["page_url"],
+                page["due_date"],
+            )
+        except Exception as e:
+            console.print(f"[red]Error building task description: {e}[/red]")
+            if notify:
+                self.sms_client.send_sms(f"Error building task description: {e}")
+            raise e
 
-                try:
-                    task_description = self.build_task_description(
-                        importance, text, urls, page_url, due_date
-                    )
-                except Exception as e:
-                    console.print(f"[red]Error building task description: {e}[/red]")
-                    progress.advance(task)
-                    self.sms_client.send_sms(f"Error building task description: {e}")
-                    raise e
+        task_title_full = (
+            f"{page['title']} - {parent_page_name} | ({page_id})"
+            if parent_page_name
+            else f"{page['title']} | ({page_id})"
+        )
+        return {
+            "title": task_title_full,
+            "notes": task_description,
+            "due_date": recomputed_due_date,
+            # The date stored in Notion is hashed rather than the recomputed one,
+            # which moves with the current day for dates too far in the future.
+            # The parent page is hashed by ID, its name is None when it could not
+            # be fetched.
+            "content_hash": self.compute_content_hash(
+                f"{page['title']} | ({page_id})",
+                task_description,
+                datetime.fromisoformat(page["due_date"]) if page["due_date"] else None,
+                parent_page_id=page["parent_page_id"],
+            ),
+        }
 
-                try:
-                    task_title_full = (
-                        f"{page_title} - {parent_page_name} | ({page_id})"
-                        if parent_page_name
-                        else f"{page_title} | ({page_id})"
-                    )
-                    self.google_tasks_manager.create_task(
-                        tasklist_id=tasklist_id,
-                        task_title=task_title_full,
-                        task_notes=task_description,
-                        due_date=recomputed_due_date,
-                    )
-                    self._verbose_print("Task for page ID '{}' created successfully!", console, "green", page_id)
-                except Exception as e:
-                    self._verbose_print("Error creating task for page ID '{}': {}", console, "red", page_id, e)
-                    self.sms_client.send_sms(
-                        f"Error creating task for page ID '{page_id}': {e}"
-                    )
-                    raise e
+    @staticmethod
+    def _parent_unresolved(page: Dict) -> bool:
+        """
+        Checks whether the parent page of a parsed Notion page could not be named.
+
+        Args:
+            page (Dict): A parsed Notion page.
+
+        Returns:
+            bool: True if the page has a parent page without a name, in which case
+                  updating its task would strip the parent from the title.
+        """
+        return bool(page["parent_page_id"]) and not page["parent_page_name"]
+
+    def compute_content_hash(
+        self,
+        task_title: str,
+        task_notes: Optional[str],
+        due_date: Optional[datetime],
+        parent_page_id: Optional[str] = None,
+    ) -> str:
+        """
+        Computes a stable hash of the content written to a Google Task.
+
+        Args:
+            task_title (str): The title of the task, without its parent page name.
+            task_notes (Optional[str]): The task description.
+            due_date (Optional[datetime]): The due date, None if the page has none.
+            parent_page_id (Optional[str]): The ID of the parent page, if any.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest of the content.
+        """
+        # Tasks only keep the date part of their due date
+        due = due_date.date().isoformat() if due_date else None
+        content = json.dumps(
+            [task_title, task_notes, due, parent_page_id], ensure_ascii=False
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _flush_task_creations(self, console: Console):
+        """
+        Executes the queued task creations and updates in batches, then indexes the
+        created tasks and records the content written.
+
+        Args:
+            console (Console): The console used for progress output.
+
+        Raises:
+            Exception: If any of the queued creations failed, after all of them ran.
+        """
+        if not self._pending_task_creations and not self._pending_task_updates:
+            return
+        pending_task_creations = self._pending_task_creations
+        pending_task_updates = self._pending_task_updates
+        self._pending_task_creations = {}
+        self._pending_task_updates = {}
+
+        with self.tracer.span(
+            "google.write_tasks",
+            creations=len(pending_task_creations),
+            updates=len(pending_task_updates),
+        ):
+            results = self.google_tasks_manager.execute_queued_requests()
+        self._record_task_writes(
+            results, pending_task_creations, pending_task_updates, console
+        )
+
+    def _record_task_writes(
+        self,
+        results: Dict[str, Dict],
+        pending_task_creations: Dict[str, Tuple[int, str, str]],
+        pending_task_updates: Dict[str, Tuple[int, str, Dict]],
+        console: Console,
+        on_task_recreated: Optional[Callable[[int, Dict, str], None]] = None,
+    ):
+        """
+        Indexes the created tasks and records the content written by executed task
+        creations and updates. Tasks found deleted by their update are created again,
+        with the arguments of queue_create_task kept with the update.
+
+        Args:
+            results (Dict[str, Dict]): The results of execute_queued_requests.
+            pending_task_creations (Dict): request key -> (page ID, tasklist ID, content hash)
+            pending_task_updates (Dict): request key -> (page ID, content hash, creation arguments)
+            console (Console): The console used for progress output.
+            on_task_recreated (Optional[Callable[[int, Dict, str], None]]): Called
+                with the page ID, the creation arguments and the content hash of a
+                deleted task before its creation is queued.
+
+        Raises:
+            Exception: If any of the creations failed, after all of them are recorded.
+        """
+        content_hashes: Dict[int, Dict[str, str]] = {}
+        recreations: Dict[str, Tuple[int, str, str]] = {}
+        for request_id, (
+            page_id,
+            content_hash,
+            task_content,
+        ) in pending_task_updates.items():
+            error = results[request_id]["error"]
+            if is_missing_task_error(error):
+                # The stale link is dropped, so that the task is linked once created
+                self._verbose_print(
+                    "Task for page ID '{}' was deleted, creating it again",
+                    console,
+                    "yellow",
+                    page_id,
+                )
+                self.sync_state.delete(page_id)
+                if self.task_index is not None:
+                    self.task_index.pop(int(page_id), None)
+                if on_task_recreated is not None:
+                    on_task_recreated(page_id, task_content, content_hash)
+                recreation_id = self.google_tasks_manager.queue_create_task(
+                    **task_content
+                )
+                recreations[recreation_id] = (
+                    page_id,
+                    task_content["tasklist_id"],
+                    content_hash,
+                )
+                continue
+            if error is not None:
+                # The stored hash is left unchanged, so the update is retried next run
+                self._verbose_print(
+                    "Error updating task for page ID '{}': {}",
+                    console,
+                    "red",
+                    page_id,
+                    error,
+                )
+                continue
+            content_hashes[page_id] = {"content_hash": content_hash}
+            self._verbose_print(
+                "Task for page ID '{}' updated successfully!", console, "green", page_id
+            )
+        if recreations:
+            results = {**results, **self.google_tasks_manager.execute_queued_requests()}
+            pending_task_creations = {**pending_task_creations, **recreations}
+
+        first_error = None
+        for request_id, (
+            page_id,
+            tasklist_id,
+            content_hash,
+        ) in pending_task_creations.items():
+            result = results[request_id]
+            if result["error"] is not None:
+                self._verbose_print(
+                    "Error creating task for page ID '{}': {}",
+                    console,
+                    "red",
+                    page_id,
+                    result["error"],
+                )
+                if first_error is None:
+                    first_error = (page_id, result["error"])
+                continue
+            self._index_task(page_id, tasklist_id, result["response"]["id"])
+            content_hashes[page_id] = {"content_hash": content_hash}
+            self._verbose_print(
+                "Task for page ID '{}' created successfully!", console, "green", page_id
+            )
+        self.sync_state.upsert_many(content_hashes)
+
+        if first_error is not None:
+            page_id, error = first_error
+            self.sms_client.send_sms(
+                f"Error creating task for page ID '{page_id}': {error}"
+            )
+            raise Exception(f"Error creating task for page ID '{page_id}': {error}")
 
-                progress.advance(task)
+    def build_task_index(
+        self, google_task_lists: Dict[str, str]
+    ) -> Dict[int, Dict[str, str]]:
+        """
+        Builds an index of existing Google Tasks keyed by the Notion ID found in
+        their title, listing every task list only once.
+
+        Args:
+            google_task_lists (Dict[str, str]): A dictionary of Google task lists with their IDs.
+
+        Returns:
+            Dict[int, Dict[str, str]]: A mapping of Notion IDs to their tasklist and task IDs.
+        """
+        task_index: Dict[int, Dict[str, str]] = {}
+        google_states: Dict[int, Dict[str, str]] = {}
+        with self.tracer.span(
+            "google.build_task_index", tasklists=len(google_task_lists)
+        ) as span:
+            for tasklist_id in google_task_lists.values():
+                tasks = self.google_tasks_manager.list_tasks_in_tasklist(tasklist_id)
+                for task_title, task_details in tasks.items():
+                    notion_id = self.extract_page_id_from_task_title(task_title)
+                    if notion_id is not None:
+                        task_index[notion_id] = {
+                            "tasklist_id": tasklist_id,
+                            "task_id": task_details["id"],
+                        }
+                        google_states[notion_id] = {
+                            **task_index[notion_id],
+                            "google_status": task_details.get("status"),
+                        }
+            span.set_attribute("tasks", len(task_index))
+        self.task_index = task_index
+        self.sync_state.upsert_many(google_states)
+        return task_index
+
+    def _index_task(self, page_id, tasklist_id: str, task_id: str) -> None:
+        """
+        Records a created or renamed task in the sync state, and in the index if it
+        has been built.
+        """
+        if page_id is None:
+            return
+        self.sync_state.upsert(int(page_id), tasklist_id=tasklist_id, task_id=task_id)
+        if self.task_index is None:
+            return
+        self.task_index[int(page_id)] = {
+            "tasklist_id": tasklist_id,
+            "task_id": task_id,
+        }
 
     def task_exists(self, google_task_lists: Dict[str, str], page_id: str) -> bool:
         """
@@ -185,11 +686,56 @@ class NotionToGoogleTaskSyncer:
         Returns:
             bool: True if the task exists, False otherwise.
         """
-        for tasklist_name, tasklist_id in google_task_lists.items():
-            tasks = self.google_tasks_manager.list_tasks_in_tasklist(tasklist_id)
-            if any(task_title.endswith(f"({page_id})") for task_title in tasks):
-                return True
-        return False
+        return self.find_task(google_task_lists, page_id) is not None
+
+    def find_task(
+        self, google_task_lists: Dict[str, str], page_id: str
+    ) -> Optional[Dict[str, str]]:
+        """
+        Finds the Google Task of the given Notion page ID. Pages linked to a task in
+        the sync state are resolved locally, the task index is built on the first
+        call of a sync run needing it. Links to deleted tasks are removed when an
+        update of the task fails, or when the task is missing from its task list
+        snapshot, see _forget_deleted_tasks.
+
+        Args:
+            google_task_lists (Dict[str, str]): A dictionary of Google task lists with their IDs.
+            page_id (str): The unique ID of the Notion page.
+
+        Returns:
+            Optional[Dict[str, str]]: The tasklist and task IDs, or None if not found.
+        """
+        try:
+            page_id = int(page_id)
+        except (TypeError, ValueError):
+            return None
+        if self.task_index is None:
+            record = self.sync_state.get(page_id)
+            if record and record["task_id"]:
+                return {
+                    "tasklist_id": record["tasklist_id"],
+                    "task_id": record["task_id"],
+                }
+            self.build_task_index(google_task_lists)
+        return self.task_index.get(page_id)
+
+    def _forget_deleted_tasks(self, snapshot: TasklistSnapshot) -> None:
+        """
+        Removes the sync state links to tasks of a task list that are missing from
+        its snapshot, i.e. deleted or moved, so that the next sync of their pages
+        finds them in the task index or creates them again.
+
+        Args:
+            snapshot (TasklistSnapshot): All the tasks of the task list.
+        """
+        task_ids = {task["id"] for task in snapshot.tasks}
+        for unique_id, record in self.sync_state.get_by_tasklist_id(
+            snapshot.tasklist_id
+        ).items():
+            if record["task_id"] and record["task_id"] not in task_ids:
+                self.sync_state.delete(unique_id)
+                if self.task_index is not None:
+                    self.task_index.pop(unique_id, None)
 
     def ensure_tasklist_exists(
         self, tag: Optional[str], google_task_lists: Dict[str, str]
@@ -322,151 +868,222 @@ class NotionToGoogleTaskSyncer:
 
     # Method to sync completed Google Tasks to Notion #
 
+    def _print_progress(
+        self, current_step: int, total_steps: int, step_description: str
+    ):
+        """
+        Prints a simple progress message in the form:
+            Step X/Y: step_description
+        """
+        print(f"\n[blue]Step {current_step}/{total_steps}: {step_description}[/blue]")
+
     def sync_google_tasks_to_notion(self, last_successful_sync: datetime):
         """
         Synchronizes Google Tasks to Notion with proper order and status handling.
         Processing order: 1. New Tasks → 2. Completed Tasks → 3. Status Alignment
+
+        With more than one tasklist worker, task lists are synced in parallel and
+        the errors of all of them are reported once every task list is processed.
         """
+        with self.tracer.span(
+            "sync_google_tasks_to_notion", tasklist_workers=self.tasklist_workers
+        ):
+            console = Console()
+            task_lists = self.google_tasks_manager.list_task_lists()
 
-        def print_progress(current_step: int, total_steps: int, step_description: str):
-            """
-            Prints a simple progress message in the form:
-                Step X/Y: step_description
-            """
-            print(
-                f"\n[blue]Step {current_step}/{total_steps}: {step_description}[/blue]"
+            if self.tasklist_workers == 1:
+                for tasklist_name, tasklist_id in task_lists.items():
+                    self._sync_tasklist(
+                        tasklist_name, tasklist_id, last_successful_sync, console
+                    )
+                return
+
+            errors: Dict[str, Exception] = {}
+            progress = Progress()
+            progress_task = progress.add_task(
+                "[cyan]Syncing Task Lists...", total=len(task_lists)
             )
+            with Live(
+                progress, console=console, refresh_per_second=10
+            ), ThreadPoolExecutor(max_workers=self.tasklist_workers) as executor:
+                futures = {
+                    executor.submit(
+                        self._sync_tasklist,
+                        tasklist_name,
+                        tasklist_id,
+                        last_successful_sync,
+                        console,
+                    ): tasklist_name
+                    for tasklist_name, tasklist_id in task_lists.items()
+                }
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors[futures[future]] = e
+                    progress.advance(progress_task)
 
-        TOTAL_STEPS = 3
-        console = Console()
-        task_lists = self.google_tasks_manager.list_task_lists()
-
-        for tasklist_name, tasklist_id in task_lists.items():
-            # Print out the task list name
-            self._verbose_print("Processing Task List: {}", console, "bold", tasklist_name)
-
-            # -----------------------------
-            # Part 1: Sync NEW tasks
-            # -----------------------------
-            print_progress(
-                current_step=1,
-                total_steps=TOTAL_STEPS,
-                step_description="Sync NEW tasks from Google Tasks to Notion",
+            self._raise_tasklist_errors(errors, len(task_lists), console)
+
+    def _raise_tasklist_errors(
+        self, errors: Dict[str, Exception], tasklist_count: int, console: Console
+    ):
+        """
+        Reports the task lists whose sync failed.
+
+        Args:
+            errors (Dict[str, Exception]): The error of each failed task list.
+            tasklist_count (int): The number of task lists processed.
+            console (Console): The console used for progress output.
+
+        Raises:
+            Exception: Summarising every error, if any task list failed.
+        """
+        if not errors:
+            return
+        for tasklist_name, error in errors.items():
+            self._verbose_print(
+                "Error syncing task list '{}': {}", console, "red", tasklist_name, error
             )
-            created_tasks = self.google_tasks_manager.get_created_tasks_since(
-                tasklist_id, last_successful_sync
+        raise Exception(
+            f"Error syncing {len(errors)} of {tasklist_count} task lists: "
+            + "; ".join(str(error) for error in errors.values())
+        )
+
+    def _sync_tasklist(
+        self,
+        tasklist_name: str,
+        tasklist_id: str,
+        last_successful_sync: datetime,
+        console: Console,
+    ):
+        """
+        Runs the three sync steps of sync_google_tasks_to_notion for one task list.
+
+        Args:
+            tasklist_name (str): The name of the task list, used as the Notion tag.
+            tasklist_id (str): The ID of the task list.
+            last_successful_sync (datetime): Only tasks updated since then are synced.
+            console (Console): The console used for progress output.
+        """
+        TOTAL_STEPS = 3
+        # Task list names are only written to traces in verbose mode, as in the logs
+        span_attributes = {"tasklist": tasklist_name} if self.verbose else {}
+
+        self._verbose_print("Processing Task List: {}", console, "bold", tasklist_name)
+
+        # -----------------------------
+        # Part 1: Sync NEW tasks
+        # -----------------------------
+        self._print_progress(
+            current_step=1,
+            total_steps=TOTAL_STEPS,
+            step_description="Sync NEW tasks from Google Tasks to Notion",
+        )
+        with self.tracer.span("tasklist.new_tasks", **span_attributes):
+            # The created, completed and active views all come from a single listing
+            snapshot = self.google_tasks_manager.get_tasklist_snapshot(tasklist_id)
+            self._forget_deleted_tasks(snapshot)
+            # Tasks linked to a page in the sync state need no title parsing
+            linked_tasks = self.sync_state.get_by_task_ids(
+                task["id"] for task in snapshot.tasks
             )
+            created_tasks = snapshot.created_since(last_successful_sync)
+            # Notion ID -> `updated` timestamp of the completed task
+            completed_notion_ids: Dict[int, Optional[str]] = {}
             if created_tasks:
                 for task_title, task_details in created_tasks.items():
-                    try:
-                        task_id = task_details["id"]
-                        task_due = task_details["due"]
-                        is_completed = task_details.get("status") == "completed"
-                        potential_notion_id = self.extract_page_id_from_task_title(
-                            task_title
-                        )
-
-                        if potential_notion_id:
-                            if is_completed:
-                                self.notion_client.mark_page_as_completed(
-                                    potential_notion_id
-                                )
-                            continue
-
-                        # Check if task title contains parent page reference
-                        cleaned_title, parent_page_name = (
-                            self.extract_parent_page_from_task_title(task_title)
-                        )
-                        parent_page_id = None
+                    task_id = task_details["id"]
+                    potential_notion_id = (
+                        linked_tasks[task_id]["unique_id"]
+                        if task_id in linked_tasks
+                        else self.extract_page_id_from_task_title(task_title)
+                    )
 
-                        if parent_page_name:
-                            # Find the parent page ID by name
-                            parent_page_id = (
-                                self.notion_client.find_parent_page_by_name(
-                                    parent_page_name
-                                )
+                    if potential_notion_id:
+                        if task_details.get("status") == "completed":
+                            completed_notion_ids[potential_notion_id] = (
+                                task_details.get("updated")
                             )
-                            if parent_page_id:
-                                self._verbose_print("Found parent page '{}' with ID: {}", console, "green", parent_page_name, parent_page_id)
-                            else:
-                                self._verbose_print("Parent page '{}' not found, creating task without parent", console, "yellow", parent_page_name)
-
-                        # Create new Notion page with FromTask checkbox = True
-                        notion_page_id = self.notion_client.create_new_page(
-                            cleaned_title,
-                            tasklist_name,
-                            task_due,
-                            from_task=True,
-                            parent_page_id=parent_page_id,
-                        )
-                        updated_title = f"{cleaned_title} | ({notion_page_id})"
-                        self.google_tasks_manager.modify_task_title(
-                            tasklist_id=tasklist_id,
-                            task_id=task_id,
-                            new_title=updated_title,
-                        )
-                    except Exception as e:
-                        self._verbose_print("Error creating page for task '{}': {}", console, "red", task_title, e)
-                        self.sms_client.send_sms(f"Task creation error: {str(e)[:50]}")
                         continue
 
-            # -----------------------------
-            # Part 2: Sync COMPLETED tasks
-            # -----------------------------
-            print_progress(
-                current_step=2,
-                total_steps=TOTAL_STEPS,
-                step_description="Sync COMPLETED tasks to Notion",
-            )
-            completed_tasks = self.google_tasks_manager.get_completed_tasks_since(
-                tasklist_id, last_successful_sync
-            )
+                    self._create_page_for_task(
+                        tasklist_name,
+                        tasklist_id,
+                        task_id,
+                        task_title,
+                        task_details["due"],
+                        console,
+                    )
+
+            self._propagate_completions(completed_notion_ids)
+
+        # -----------------------------
+        # Part 2: Sync COMPLETED tasks
+        # -----------------------------
+        self._print_progress(
+            current_step=2,
+            total_steps=TOTAL_STEPS,
+            step_description="Sync COMPLETED tasks to Notion",
+        )
+        with self.tracer.span("tasklist.completed_tasks", **span_attributes):
+            completed_tasks = snapshot.completed_since(last_successful_sync)
             if completed_tasks:
                 created_task_ids = (
                     {details["id"] for details in created_tasks.values()}
                     if created_tasks
                     else set()
                 )
+                completed_notion_ids = {}
                 for task_title, task_details in completed_tasks.items():
                     if task_details["id"] in created_task_ids:
                         continue
-                    try:
-                        notion_page_id = self.extract_page_id_from_task_title(
-                            task_title
-                        )
-                        if not notion_page_id:
-                            print(
-                                "[yellow]No Notion ID found in task title, skipping...[/yellow]"
-                            )
-                            continue
-                        self.notion_client.mark_page_as_completed(notion_page_id)
-                    except Exception as e:
-                        print(f"[red]Error updating completed task: {e}[/red]")
-                        self.sms_client.send_sms(
-                            f"Error updating completed task: {str(e)[:50]}"
+                    notion_page_id = (
+                        linked_tasks[task_details["id"]]["unique_id"]
+                        if task_details["id"] in linked_tasks
+                        else self.extract_page_id_from_task_title(task_title)
+                    )
+                    if not notion_page_id:
+                        print(
+                            "[yellow]No Notion ID found in task title, skipping...[/yellow]"
                         )
                         continue
+                    completed_notion_ids[notion_page_id] = task_details.get("updated")
 
-            # -----------------------------
-            # Part 3: Align statuses (Notion → Google Tasks)
-            # -----------------------------
-            print_progress(
-                current_step=3,
-                total_steps=TOTAL_STEPS,
-                step_description="Align statuses for ACTIVE tasks (Notion → Google)",
-            )
-            active_tasks = self.google_tasks_manager.list_tasks_in_tasklist(
-                tasklist_id, include_completed=False
-            )
+                self._propagate_completions(completed_notion_ids)
+
+        # -----------------------------
+        # Part 3: Align statuses (Notion → Google Tasks)
+        # -----------------------------
+        self._print_progress(
+            current_step=3,
+            total_steps=TOTAL_STEPS,
+            step_description="Align statuses for ACTIVE tasks (Notion → Google)",
+        )
+        with self.tracer.span("tasklist.align_statuses", **span_attributes):
+            active_tasks = snapshot.active()
 
             notion_to_google = {}
             for title, task_data in active_tasks.items():
-                notion_id = self.google_tasks_manager.extract_task_id_from_task_title(
-                    title
-                )
+                if task_data["id"] in linked_tasks:
+                    notion_id = linked_tasks[task_data["id"]]["unique_id"]
+                else:
+                    notion_id = (
+                        self.google_tasks_manager.extract_task_id_from_task_title(title)
+                    )
                 if notion_id is not None:
                     notion_to_google[str(notion_id)] = task_data["id"]
 
+            # Pages whose status was read during this run and is not Done need no query
+            states = self.sync_state.get_many(
+                int(notion_id) for notion_id in notion_to_google
+            )
+            for notion_id, state in states.items():
+                if (state["notion_checked_at"] or 0) >= self._run_started_at and state[
+                    "notion_status"
+                ] != "Done":
+                    notion_to_google.pop(str(notion_id), None)
+
             if notion_to_google:
                 try:
                     notion_ids = [
@@ -475,17 +1092,211 @@ class NotionToGoogleTaskSyncer:
                     status_mapping = self.notion_client.retrieve_pages_status(
                         notion_ids
                     )
+                    checked_at = time.time()
+                    self.sync_state.upsert_many(
+                        {
+                            status_item["task_id"]: {
+                                "notion_status": status_item["page_status"],
+                                "notion_checked_at": checked_at,
+                            }
+                            for status_item in status_mapping
+                        }
+                    )
+                    completion_requests = {}
                     for status_item in status_mapping:
                         notion_id = str(status_item["task_id"])
                         status = status_item["page_status"]
                         if status == "Done":
                             google_task_id = notion_to_google.get(notion_id)
                             if google_task_id:
-                                self.google_tasks_manager.mark_task_completed(
-                                    tasklist_id, google_task_id
+                                request_id = (
+                                    self.google_tasks_manager.queue_mark_task_completed(
+                                        tasklist_id, google_task_id
+                                    )
                                 )
-                                self._verbose_print("Marked Google Task ID '{}' as completed", console, "green", google_task_id)
+                                completion_requests[request_id] = (
+                                    int(notion_id),
+                                    google_task_id,
+                                )
+
+                    if completion_requests:
+                        results = self.google_tasks_manager.execute_queued_requests()
+                        for request_id, (
+                            notion_id,
+                            google_task_id,
+                        ) in completion_requests.items():
+                            error = results[request_id]["error"]
+                            if error is not None:
+                                console.print(
+                                    f"[red]Error marking Google Task as completed: {error}[/red]"
+                                )
+                                continue
+                            self.sync_state.upsert(notion_id, google_status="completed")
+                            self._verbose_print(
+                                "Marked Google Task ID '{}' as completed",
+                                console,
+                                "green",
+                                google_task_id,
+                            )
                 except Exception as e:
                     console.print(f"[red]Error syncing statuses: {e}[/red]")
 
-            console.print("[green]Done processing all steps for this task list![/green]")
+        console.print("[green]Done processing all steps for this task list![/green]")
+
+    def _propagate_completions(
+        self, completed_notion_ids: Dict[int, Optional[str]]
+    ) -> Set[int]:
+        """
+        Marks the Notion pages of completed Google Tasks as Done. Completions already
+        propagated, i.e. of tasks not updated since, are skipped.
+
+        Args:
+            completed_notion_ids (Dict[int, Optional[str]]): The `updated` timestamp of
+                the completed task of each Notion ID.
+
+        Returns:
+            Set[int]: The Notion IDs whose page is now Done.
+        """
+        pending = self._completions_to_propagate(completed_notion_ids)
+        propagated = set(completed_notion_ids) - set(pending)
+        if not pending:
+            return propagated
+        try:
+            results = self.notion_client.mark_pages_as_completed(set(pending))
+        except Exception as e:
+            print(f"[red]Error updating completed task: {e}[/red]")
+            self.sms_client.send_sms(f"Error updating completed task: {str(e)[:50]}")
+            return propagated
+
+        marked = {
+            notion_id
+            for notion_id, result in results.items()
+            if result is not None and notion_id in pending
+        }
+        self.sync_state.upsert_many(
+            {
+                notion_id: {
+                    "notion_status": "Done",
+                    "google_status": "completed",
+                    "google_updated": pending[notion_id],
+                }
+                for notion_id in marked
+            }
+        )
+        return propagated | marked
+
+    def _completions_to_propagate(
+        self, completed_notion_ids: Dict[int, Optional[str]]
+    ) -> Dict[int, Optional[str]]:
+        """
+        Filters out the completions already propagated to Notion, i.e. of tasks not
+        updated since.
+
+        Args:
+            completed_notion_ids (Dict[int, Optional[str]]): The `updated` timestamp of
+                the completed task of each Notion ID.
+
+        Returns:
+            Dict[int, Optional[str]]: The completions still to propagate.
+        """
+        states = self.sync_state.get_many(completed_notion_ids)
+        return {
+            notion_id: updated
+            for notion_id, updated in completed_notion_ids.items()
+            if not (
+                updated
+                and notion_id in states
+                and states[notion_id]["notion_status"] == "Done"
+                and states[notion_id]["google_updated"] == updated
+            )
+        }
+
+    def _create_page_for_task(
+        self,
+        tasklist_name: str,
+        tasklist_id: str,
+        task_id: str,
+        task_title: str,
+        task_due: Optional[str],
+        console: Console,
+        notion_page_id: Optional[int] = None,
+        on_page_created: Optional[Callable[[int], None]] = None,
+    ) -> Optional[int]:
+        """
+        Creates the Notion page of a task created in Google Tasks, then appends the
+        Notion ID of the page to the task title.
+
+        Args:
+            tasklist_name (str): The name of the task list, used as the Notion tag.
+            tasklist_id (str): The ID of the task list.
+            task_id (str): The ID of the task.
+            task_title (str): The task title, possibly ending with " - parent page name".
+            task_due (Optional[str]): The due date of the task.
+            console (Console): The console used for progress output.
+            notion_page_id (Optional[int]): The Notion ID of the page if it was
+                already created, in which case only the task is renamed.
+            on_page_created (Optional[Callable[[int], None]]): Called with the Notion
+                ID of the page once created, before the task is renamed.
+
+        Returns:
+            Optional[int]: The Notion ID of the created page, or None on error.
+        """
+        with self.tracer.span("notion.create_page", resumed=notion_page_id is not None):
+            try:
+                # Check if task title contains parent page reference
+                cleaned_title, parent_page_name = (
+                    self.extract_parent_page_from_task_title(task_title)
+                )
+                parent_page_id = None
+
+                if parent_page_name and notion_page_id is None:
+                    # Find the parent page ID by name
+                    with self.tracer.span("notion.find_parent"):
+                        parent_page_id = self.notion_client.find_parent_page_by_name(
+                            parent_page_name
+                        )
+                    if parent_page_id:
+                        self._verbose_print(
+                            "Found parent page '{}' with ID: {}",
+                            console,
+                            "green",
+                            parent_page_name,
+                            parent_page_id,
+                        )
+                    else:
+                        self._verbose_print(
+                            "Parent page '{}' not found, creating task without parent",
+                            console,
+                            "yellow",
+                            parent_page_name,
+                        )
+
+                if notion_page_id is None:
+                    # Create new Notion page with FromTask checkbox = True
+                    notion_page_id = self.notion_client.create_new_page(
+                        cleaned_title,
+                        tasklist_name,
+                        task_due,
+                        from_task=True,
+                        parent_page_id=parent_page_id,
+                    )
+                    if on_page_created is not None:
+                        on_page_created(notion_page_id)
+                updated_title = f"{cleaned_title} | ({notion_page_id})"
+                self.google_tasks_manager.modify_task_title(
+                    tasklist_id=tasklist_id,
+                    task_id=task_id,
+                    new_title=updated_title,
+                )
+                self._index_task(notion_page_id, tasklist_id, task_id)
+                return notion_page_id
+            except Exception as e:
+                self._verbose_print(
+                    "Error creating page for task '{}': {}",
+                    console,
+                    "red",
+                    task_title,
+                    e,
+                )
+                self.sms_client.send_sms(f"Task creation error: {str(e)[:50]}")
+                return None
@@ -0,0 +1,804 @@
+import dataclasses
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+import requests
+from rich import print
+from rich.console import Console
+from rich.table import Table
+
+from services.google_task.src.retrieve_tasks import (
+    GoogleTasksManager,
+    is_missing_task_error,
+)
+from services.notion.src.notion_page import NotionPage
+from services.sync_notion_google_task.sync_state import BufferedSyncState
+
+if TYPE_CHECKING:
+    from services.sync_notion_google_task.journal import SyncJournal
+    from services.sync_notion_google_task.main import NotionToGoogleTaskSyncer
+
+
+@dataclass(frozen=True)
+class CreateTasklist:
+    """Creates the Google task list of a Notion tag."""
+
+    kind: ClassVar[str] = "create_tasklist"
+    name: str
+
+    @property
+    def key(self) -> Tuple:
+        return (self.kind, self.name)
+
+
+@dataclass(frozen=True)
+class CreateTask:
+    """Creates the Google Task of a Notion page."""
+
+    kind: ClassVar[str] = "create_task"
+    page_id: int
+    tasklist_name: str
+    title: str
+    notes: str
+    due: Optional[str]
+    content_hash: str
+    # None when the task list is created by the same plan
+    tasklist_id: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple:
+        return (self.kind, self.page_id)
+
+
+@dataclass(frozen=True)
+class UpdateTask:
+    """Updates the Google Task of a Notion page whose content changed."""
+
+    kind: ClassVar[str] = "update_task"
+    page_id: int
+    tasklist_id: str
+    task_id: str
+    title: str
+    notes: str
+    due: Optional[str]
+    content_hash: str
+
+    @property
+    def key(self) -> Tuple:
+        return (self.kind, self.page_id)
+
+
+@dataclass(frozen=True)
+class MarkTaskDone:
+    """Completes the Google Task of a Notion page marked as Done."""
+
+    kind: ClassVar[str] = "mark_task_done"
+    page_id: int
+    tasklist_id: str
+    task_id: str
+
+    @property
+    def key(self) -> Tuple:
+        return (self.kind, self.task_id)
+
+
+@dataclass(frozen=True)
+class MarkPageDone:
+    """Marks the Notion page of a completed Google Task as Done."""
+
+    kind: ClassVar[str] = "mark_page_done"
+    page_id: int
+    google_updated: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple:
+        return (self.kind, self.page_id)
+
+
+@dataclass(frozen=True)
+class CreatePage:
+    """Creates the Notion page of a task created in Google Tasks, then renames the task."""
+
+    kind: ClassVar[str] = "create_page"
+    tasklist_name: str
+    tasklist_id: str
+    task_id: str
+    task_title: str
+    due: Optional[str] = None
+    # Set when the page was created by an interrupted run, only the task is renamed
+    notion_page_id: Optional[int] = None
+
+    @property
+    def key(self) -> Tuple:
+        return (self.kind, self.task_id)
+
+
+SyncOperation = Union[
+    CreateTasklist, CreateTask, UpdateTask, MarkTaskDone, MarkPageDone, CreatePage
+]
+
+# Operation types in execution order: task lists must exist before their tasks
+OPERATION_TYPES: Tuple[Type, ...] = (
+    CreateTasklist,
+    CreateTask,
+    UpdateTask,
+    MarkTaskDone,
+    MarkPageDone,
+    CreatePage,
+)
+OPERATIONS_BY_KIND: Dict[str, Type] = {
+    operation_type.kind: operation_type for operation_type in OPERATION_TYPES
+}
+
+
+class SyncPlan:
+    """
+    Ordered set of sync operations. Operations are deduplicated by key, e.g. a page
+    completed in two task lists is only marked as Done once.
+    """
+
+    def __init__(self):
+        self._operations: Dict[Tuple, SyncOperation] = {}
+        # Sync state observed while planning, written when the plan is executed
+        self.sync_state_changes: Optional[BufferedSyncState] = None
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def __iter__(self) -> Iterator[SyncOperation]:
+        """Iterates over the operations in execution order."""
+        for operation_type in OPERATION_TYPES:
+            yield from self.of_type(operation_type)
+
+    def add(self, operation: SyncOperation) -> bool:
+        """
+        Args:
+            operation (SyncOperation): The operation to plan.
+
+        Returns:
+            bool: False if an operation with the same key was already planned.
+        """
+        if operation.key in self._operations:
+            return False
+        self._operations[operation.key] = operation
+        return True
+
+    def of_type(self, operation_type: Type) -> List:
+        """Returns the planned operations of a type, in planning order."""
+        return [
+            operation
+            for operation in self._operations.values()
+            if isinstance(operation, operation_type)
+        ]
+
+    def summary(self) -> Dict[str, int]:
+        """Returns the number of planned operations of each kind."""
+        return {
+            operation_type.kind: len(self.of_type(operation_type))
+            for operation_type in OPERATION_TYPES
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "summary": self.summary(),
+            "operations": [
+                {"kind": operation.kind, **asdict(operation)} for operation in self
+            ],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SyncPlan":
+        """
+        Args:
+            data (Dict): A plan serialised by to_dict.
+
+        Returns:
+            SyncPlan: The deserialised plan.
+
+        Raises:
+            ValueError: If an operation kind is unknown.
+        """
+        plan = cls()
+        for operation in data.get("operations", []):
+            operation = dict(operation)
+            kind = operation.pop("kind")
+            if kind not in OPERATIONS_BY_KIND:
+                raise ValueError(f"Unknown sync operation: {kind}")
+            plan.add(OPERATIONS_BY_KIND[kind](**operation))
+        return plan
+
+    def print(self, console: Console, verbose: bool = True):
+        """
+        Prints the plan as a table.
+
+        Args:
+            console (Console): The console to print to.
+            verbose (bool): If False, titles and names are replaced with ***.
+        """
+        table = Table(title=f"Sync plan: {len(self)} operations")
+        table.add_column("Operation", style="cyan")
+        table.add_column("Target")
+        table.add_column("Details")
+        for operation in self:
+            target, details = self._describe(operation)
+            if not verbose:
+                details = "***"
+            table.add_row(operation.kind, target, details)
+        console.print(table)
+
+    @staticmethod
+    def _describe(operation: SyncOperation) -> Tuple[str, str]:
+        """Returns the target and details columns of an operation."""
+        if isinstance(operation, CreateTasklist):
+            return "Google task list", operation.name
+        if isinstance(operation, (CreateTask, UpdateTask)):
+            return f"Google Task of page {operation.page_id}", operation.title
+        if isinstance(operation, MarkTaskDone):
+            return f"Google Task of page {operation.page_id}", operation.task_id
+        if isinstance(operation, MarkPageDone):
+            return f"Notion page {operation.page_id}", "Done"
+        return "Notion page", operation.task_title
+
+
+class SyncPlanner:
+    """
+    Plans a sync run from Notion and Google Tasks snapshots, then executes the plan.
+
+    Planning only reads from the APIs, so the plan can be reviewed in a dry run:
+    the sync state observed while planning is written when the plan is executed,
+    and a dry run planner sends no SMS alert.
+    Execution groups the operations by type: the Google Tasks writes are sent in
+    batches, and the Notion pages of completed tasks are updated in one bulk call.
+    With a journal, the operations left unfinished by an interrupted run are
+    replayed by resume.
+    """
+
+    def __init__(
+        self,
+        syncer: "NotionToGoogleTaskSyncer",
+        journal: Optional["SyncJournal"] = None,
+        dry_run: bool = False,
+    ):
+        """
+        Args:
+            syncer (NotionToGoogleTaskSyncer): Provides the clients, sync state and
+                helpers shared with the step by step sync.
+            journal (Optional[SyncJournal]): Records the executed operations.
+            dry_run (bool): Whether plans are only reviewed, so that planning
+                            errors are not alerted by SMS.
+        """
+        self.syncer = syncer
+        self.journal = journal
+        self.dry_run = dry_run
+
+    def plan(
+        self,
+        last_successful_sync: Optional[datetime] = None,
+        single_page_id: Optional[str] = None,
+        google_to_notion: bool = True,
+    ) -> SyncPlan:
+        """
+        Computes the operations of a sync run.
+
+        Args:
+            last_successful_sync (Optional[datetime]): If provided, only pages and
+                tasks modified since this timestamp are synced.
+            single_page_id (Optional[str]): If provided, only plan the sync of the
+                specified Notion page. Accepts a page ID or a unique task ID.
+            google_to_notion (bool): Whether to plan the Google Tasks to Notion sync,
+                which requires last_successful_sync and is skipped for single pages.
+
+        Returns:
+            SyncPlan: The planned operations.
+        """
+        syncer = self.syncer
+        sync_state = BufferedSyncState(syncer.sync_state)
+        syncer.sync_state = sync_state
+        try:
+            plan = self._plan(last_successful_sync, single_page_id, google_to_notion)
+        finally:
+            syncer.sync_state = sync_state.store
+        plan.sync_state_changes = sync_state
+        return plan
+
+    def _plan(
+        self,
+        last_successful_sync: Optional[datetime],
+        single_page_id: Optional[str],
+        google_to_notion: bool,
+    ) -> SyncPlan:
+        """Computes the operations of a sync run, see plan."""
+        syncer = self.syncer
+        console = Console()
+        plan = SyncPlan()
+        google_task_lists = syncer.google_tasks_manager.list_task_lists()
+        pages = self._fetch_pages(last_successful_sync, single_page_id)
+
+        syncer.task_index = None
+        for page in pages:
+            self._plan_page(plan, page, google_task_lists, console)
+
+        if google_to_notion and not single_page_id and last_successful_sync:
+            # Statuses read with the pages are current, pages Done are not queried
+            notion_statuses = {
+                page["unique_id"]: page.get("page_status") for page in pages
+            }
+            self._plan_tasklists(
+                plan, google_task_lists, last_successful_sync, notion_statuses
+            )
+        return plan
+
+    def _fetch_pages(
+        self, last_successful_sync: Optional[datetime], single_page_id: Optional[str]
+    ) -> List[NotionPage]:
+        """Fetches and parses the Notion pages to sync."""
+        notion_responses = self.syncer._notion_responses(
+            last_successful_sync, single_page_id
+        )
+        pages: List[NotionPage] = []
+        try:
+            for notion_response in self.syncer.tracer.iter_spans(
+                "notion.fetch", notion_responses or []
+            ):
+                pages.extend(self.syncer._parse_notion_response(notion_response) or [])
+        except (requests.exceptions.RequestException, FileNotFoundError) as e:
+            print(f"[red]Error fetching pages from Notion: {e}[/red]")
+        return pages
+
+    def _plan_page(
+        self,
+        plan: SyncPlan,
+        page: Dict,
+        google_task_lists: Dict[str, str],
+        console: Console,
+    ):
+        """Plans the creation or update of the Google Task of a Notion page."""
+        syncer = self.syncer
+        page_id = page["unique_id"]
+        if page_id is None or page.get("FromTask", False):
+            return
+
+        content = syncer._task_content(page, console, notify=not self.dry_run)
+        due = GoogleTasksManager._build_task_body(
+            content["title"], due_date=content["due_date"]
+        ).get("due")
+        existing_task = syncer.find_task(google_task_lists, page_id)
+        if existing_task is not None:
+            record = syncer.sync_state.get(page_id)
+            if not record or record["content_hash"] is None:
+                # Assumed up to date, see _sync_page_to_google_task
+                syncer.sync_state.upsert(
+                    page_id,
+                    tasklist_id=existing_task["tasklist_id"],
+                    task_id=existing_task["task_id"],
+                    content_hash=content["content_hash"],
+                )
+            elif record["content_hash"] != content[
+                "content_hash"
+            ] and not syncer._parent_unresolved(page):
+                plan.add(
+                    UpdateTask(
+                        page_id=page_id,
+                        tasklist_id=existing_task["tasklist_id"],
+                        task_id=existing_task["task_id"],
+                        title=content["title"],
+                        notes=content["notes"],
+                        due=due,
+                        content_hash=content["content_hash"],
+                    )
+                )
+            return
+
+        tag = page["tags"] or "NoTag"
+        if tag not in google_task_lists:
+            plan.add(CreateTasklist(name=tag))
+        plan.add(
+            CreateTask(
+                page_id=page_id,
+                tasklist_name=tag,
+                tasklist_id=google_task_lists.get(tag),
+                title=content["title"],
+                notes=content["notes"],
+                due=due,
+                content_hash=content["content_hash"],
+            )
+        )
+
+    def _plan_tasklists(
+        self,
+        plan: SyncPlan,
+        google_task_lists: Dict[str, str],
+        last_successful_sync: datetime,
+        notion_statuses: Dict[int, str],
+    ):
+        """Plans the Google Tasks to Notion sync of every task list."""
+        syncer = self.syncer
+        tasklists = list(google_task_lists.items())
+        with ThreadPoolExecutor(max_workers=syncer.tasklist_workers) as executor:
+            snapshots = list(
+                executor.map(
+                    lambda tasklist: syncer.google_tasks_manager.get_tasklist_snapshot(
+                        tasklist[1]
+                    ),
+                    tasklists,
+                )
+            )
+
+        completed_notion_ids: Dict[int, Optional[str]] = {}
+        # Notion ID -> (tasklist ID, task ID) of active tasks whose page may be Done
+        active_tasks: Dict[int, Tuple[str, str]] = {}
+        for (tasklist_name, tasklist_id), snapshot in zip(tasklists, snapshots):
+            syncer._forget_deleted_tasks(snapshot)
+            linked_tasks = syncer.sync_state.get_by_task_ids(
+                task["id"] for task in snapshot.tasks
+            )
+
+            def notion_id_of(task_title: str, task_id: str) -> Optional[int]:
+                if task_id in linked_tasks:
+                    return linked_tasks[task_id]["unique_id"]
+                return syncer.extract_page_id_from_task_title(task_title)
+
+            for task_title, task_details in snapshot.created_since(
+                last_successful_sync
+            ).items():
+                notion_id = notion_id_of(task_title, task_details["id"])
+                if notion_id is None:
+                    plan.add(
+                        CreatePage(
+                            tasklist_name=tasklist_name,
+                            tasklist_id=tasklist_id,
+                            task_id=task_details["id"],
+                            task_title=task_title,
+                            due=task_details["due"],
+                        )
+                    )
+                elif task_details.get("status") == "completed":
+                    completed_notion_ids[notion_id] = task_details.get("updated")
+
+            for task_title, task_details in snapshot.completed_since(
+                last_successful_sync
+            ).items():
+                notion_id = notion_id_of(task_title, task_details["id"])
+                if notion_id is not None:
+                    completed_notion_ids[notion_id] = task_details.get("updated")
+
+            for task_title, task_details in snapshot.active().items():
+                notion_id = notion_id_of(task_title, task_details["id"])
+                if notion_id is None:
+                    continue
+                status = notion_statuses.get(notion_id)
+                if status is not None and status != "Done":
+                    continue
+                active_tasks[notion_id] = (tasklist_id, task_details["id"])
+
+        for notion_id, updated in syncer._completions_to_propagate(
+            completed_notion_ids
+        ).items():
+            plan.add(MarkPageDone(page_id=notion_id, google_updated=updated))
+
+        if active_tasks:
+            for status_item in syncer.notion_client.retrieve_pages_status(
+                list(active_tasks)
+            ):
+                notion_id = int(status_item["task_id"])
+                if status_item["page_status"] == "Done" and notion_id in active_tasks:
+                    tasklist_id, task_id = active_tasks[notion_id]
+                    plan.add(
+                        MarkTaskDone(
+                            page_id=notion_id, tasklist_id=tasklist_id, task_id=task_id
+                        )
+                    )
+
+    def execute(self, plan: SyncPlan):
+        """
+        Executes a plan: task lists first, then the Google Tasks writes in batches,
+        the Notion pages of completed tasks in bulk, and the pages of new tasks.
+        Operations are journaled as planned before anything is written, and as done
+        once applied.
+
+        Args:
+            plan (SyncPlan): The plan to execute.
+
+        Raises:
+            Exception: If a task list or task creation failed, once the rest of the
+                       plan is executed.
+        """
+        syncer = self.syncer
+        console = Console()
+        if plan.sync_state_changes is not None:
+            plan.sync_state_changes.commit()
+        if self.journal is not None:
+            self.journal.record_planned(plan)
+
+        tasklist_ids: Dict[str, str] = {}
+        for operation in plan.of_type(CreateTasklist):
+            try:
+                created_tasklist = syncer.google_tasks_manager.create_task_list(
+                    operation.name
+                )
+            except Exception as e:
+                syncer._verbose_print(
+                    "Error ensuring task list for tag '{}': {}",
+                    console,
+                    "red",
+                    operation.name,
+                    e,
+                )
+                syncer.sms_client.send_sms(
+                    f"Error ensuring task list for tag '{operation.name}': {e}"
+                )
+                raise e
+            tasklist_ids[operation.name] = created_tasklist["id"]
+            self._record_done([operation])
+
+        # Batched Google Tasks writes: request key -> operation
+        batched_operations: Dict[str, SyncOperation] = {}
+        pending_task_creations: Dict[str, Tuple[int, str, str]] = {}
+        for operation in plan.of_type(CreateTask):
+            tasklist_id = operation.tasklist_id or tasklist_ids[operation.tasklist_name]
+            request_id = syncer.google_tasks_manager.queue_create_task(
+                tasklist_id=tasklist_id,
+                task_title=operation.title,
+                task_notes=operation.notes,
+                due_date=operation.due,
+            )
+            pending_task_creations[request_id] = (
+                operation.page_id,
+                tasklist_id,
+                operation.content_hash,
+            )
+            batched_operations[request_id] = operation
+        pending_task_updates: Dict[str, Tuple[int, str, Dict]] = {}
+        for operation in plan.of_type(UpdateTask):
+            task_content = {
+                "tasklist_id": operation.tasklist_id,
+                "task_title": operation.title,
+                "task_notes": operation.notes,
+                "due_date": operation.due,
+            }
+            request_id = syncer.google_tasks_manager.queue_update_task(
+                task_id=operation.task_id, **task_content
+            )
+            pending_task_updates[request_id] = (
+                operation.page_id,
+                operation.content_hash,
+                task_content,
+            )
+            batched_operations[request_id] = operation
+        completion_requests: Dict[str, MarkTaskDone] = {}
+        for operation in plan.of_type(MarkTaskDone):
+            request_id = syncer.google_tasks_manager.queue_mark_task_completed(
+                operation.tasklist_id, operation.task_id
+            )
+            completion_requests[request_id] = operation
+            batched_operations[request_id] = operation
+
+        creation_error = None
+        if batched_operations:
+            results = syncer.google_tasks_manager.execute_queued_requests()
+            # Updates of deleted tasks are replaced by a creation, not retried
+            self._record_done(
+                operation
+                for request_id, operation in batched_operations.items()
+                if results[request_id]["error"] is None
+                or (
+                    isinstance(operation, UpdateTask)
+                    and is_missing_task_error(results[request_id]["error"])
+                )
+            )
+            for request_id, operation in completion_requests.items():
+                error = results[request_id]["error"]
+                if error is not None:
+                    console.print(
+                        f"[red]Error marking Google Task as completed: {error}[/red]"
+                    )
+                    continue
+                syncer.sync_state.upsert(operation.page_id, google_status="completed")
+                syncer._verbose_print(
+                    "Marked Google Task ID '{}' as completed",
+                    console,
+                    "green",
+                    operation.task_id,
+                )
+            recreations: Dict[int, CreateTask] = {}
+            try:
+                syncer._record_task_writes(
+                    results,
+                    pending_task_creations,
+                    pending_task_updates,
+                    console,
+                    on_task_recreated=functools.partial(
+                        self._record_recreation, recreations
+                    ),
+                )
+            except Exception as e:
+                creation_error = e
+            # Tasks created again are linked in the sync state once created
+            self._record_done(
+                operation
+                for page_id, operation in recreations.items()
+                if (syncer.sync_state.get(page_id) or {}).get("task_id")
+            )
+
+        completions = {
+            operation.page_id: operation for operation in plan.of_type(MarkPageDone)
+        }
+        if completions:
+            marked = syncer._propagate_completions(
+                {
+                    page_id: operation.google_updated
+                    for page_id, operation in completions.items()
+                }
+            )
+            self._record_done(completions[page_id] for page_id in marked)
+
+        for operation in plan.of_type(CreatePage):
+            notion_page_id = syncer._create_page_for_task(
+                operation.tasklist_name,
+                operation.tasklist_id,
+                operation.task_id,
+                operation.task_title,
+                operation.due,
+                console,
+                notion_page_id=operation.notion_page_id,
+                on_page_created=functools.partial(self._record_page_created, operation),
+            )
+            if notion_page_id is not None:
+                self._record_done([operation])
+
+        if self.journal is not None:
+            self.journal.compact()
+        if creation_error is not None:
+            raise creation_error
+
+    def _record_done(self, operations: Iterable[SyncOperation]):
+        """Journals operations as done."""
+        if self.journal is not None:
+            self.journal.record_done(list(operations))
+
+    def _record_recreation(
+        self,
+        recreations: Dict[int, CreateTask],
+        page_id: int,
+        task_content: Dict,
+        content_hash: str,
+    ):
+        """
+        Journals the creation of a task found deleted by its update before it is
+        queued, so that an interrupted run does not create it twice.
+        """
+        if self.journal is None:
+            return
+        tasklist_id = task_content["tasklist_id"]
+        tasklist_names = {
+            listed_id: name
+            for name, listed_id in (
+                self.syncer.google_tasks_manager.list_task_lists().items()
+            )
+        }
+        operation = CreateTask(
+            page_id=page_id,
+            tasklist_name=tasklist_names.get(tasklist_id, tasklist_id),
+            title=task_content["task_title"],
+            notes=task_content["task_notes"],
+            due=task_content["due_date"],
+            content_hash=content_hash,
+            tasklist_id=tasklist_id,
+        )
+        self.journal.record_planned([operation])
+        recreations[page_id] = operation
+
+    def _record_page_created(self, operation: CreatePage, notion_page_id: int):
+        """Journals the page created for a task, so that a replay only renames it."""
+        if self.journal is not None:
+            self.journal.record_progress(operation, notion_page_id=notion_page_id)
+
+    def resume(self) -> SyncPlan:
+        """
+        Plans the replay of the operations left unfinished in the journal by an
+        interrupted run. Creations that may have been applied are verified first:
+        task lists and tasks that exist are not created again, and tasks already
+        renamed after their Notion page are not given a new page.
+
+        Returns:
+            SyncPlan: The operations to execute again, empty without a journal.
+        """
+        plan = SyncPlan()
+        if self.journal is None:
+            return plan
+        unfinished = self.journal.unfinished()
+        if not unfinished:
+            return plan
+
+        syncer = self.syncer
+        console = Console()
+        applied: List[SyncOperation] = []
+        google_task_lists = syncer.google_tasks_manager.list_task_lists()
+        syncer.task_index = None
+        for entry in unfinished:
+            operation = entry.operation
+            if entry.attempts >= self.journal.MAX_ATTEMPTS:
+                syncer._verbose_print(
+                    "Abandoning sync operation {} after {} attempts",
+                    console,
+                    "yellow",
+                    operation.key,
+                    entry.attempts,
+                )
+                applied.append(operation)
+                continue
+
+            if isinstance(operation, CreateTasklist):
+                if operation.name in google_task_lists:
+                    applied.append(operation)
+                    continue
+            elif isinstance(operation, CreateTask):
+                existing_task = syncer.find_task(google_task_lists, operation.page_id)
+                if existing_task is not None:
+                    # The task was created, but the run stopped before recording it
+                    syncer._index_task(
+                        operation.page_id,
+                        existing_task["tasklist_id"],
+                        existing_task["task_id"],
+                    )
+                    syncer.sync_state.upsert(
+                        operation.page_id, content_hash=operation.content_hash
+                    )
+                    applied.append(operation)
+                    continue
+                if operation.tasklist_id is None:
+                    operation = dataclasses.replace(
+                        operation,
+                        tasklist_id=google_task_lists.get(operation.tasklist_name),
+                    )
+                    if operation.tasklist_id is None:
+                        plan.add(CreateTasklist(name=operation.tasklist_name))
+            elif isinstance(operation, CreatePage):
+                if "notion_page_id" in entry.details:
+                    operation = dataclasses.replace(
+                        operation, notion_page_id=entry.details["notion_page_id"]
+                    )
+                else:
+                    try:
+                        task = syncer.google_tasks_manager.get_task_details(
+                            operation.tasklist_id, operation.task_id
+                        )
+                    except Exception as e:
+                        # The task was deleted since, there is no page to create
+                        syncer._verbose_print(
+                            "Skipping page creation for task '{}': {}",
+                            console,
+                            "yellow",
+                            operation.task_title,
+                            e,
+                        )
+                        applied.append(operation)
+                        continue
+                    if (
+                        syncer.extract_page_id_from_task_title(task["title"])
+                        is not None
+                    ):
+                        applied.append(operation)
+                        continue
+            plan.add(operation)
+
+        self._record_done(applied)
+        return plan
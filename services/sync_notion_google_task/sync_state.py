@@ -0,0 +1,297 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Optional, Set
+
+from rich import print
+
+# Columns of a sync state record, besides the Notion unique ID
+SYNC_STATE_FIELDS = (
+    "page_id",
+    "tasklist_id",
+    "task_id",
+    "notion_status",
+    "notion_last_edited",
+    "notion_checked_at",
+    "google_status",
+    "google_updated",
+    "content_hash",
+)
+
+
+class SyncStateStore:
+    """
+    On-disk record of the link between each Notion page and its Google Task, with
+    the state of both sides when they were last seen by the syncer.
+
+    Records are keyed by the Notion unique ID (the `ID` property) and are updated
+    field by field, so that each sync step only writes what it observed. Like
+    PageIdCache, the store disables itself if its database cannot be opened, in
+    which case every lookup misses and the syncer falls back to the APIs.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file, or ":memory:".
+        """
+        self.db_path = db_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Opens the database on first use, returning None if the store is disabled."""
+        if self._disabled:
+            return None
+        if self._connection is None:
+            try:
+                state_dir = os.path.dirname(self.db_path)
+                if state_dir:
+                    os.makedirs(state_dir, exist_ok=True)
+                connection = sqlite3.connect(self.db_path, check_same_thread=False)
+                connection.row_factory = sqlite3.Row
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS sync_state ("
+                    "unique_id INTEGER PRIMARY KEY, "
+                    "page_id TEXT, tasklist_id TEXT, task_id TEXT, "
+                    "notion_status TEXT, notion_last_edited TEXT, "
+                    "notion_checked_at REAL, google_status TEXT, "
+                    "google_updated TEXT, content_hash TEXT)"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS sync_state_task_id "
+                    "ON sync_state (task_id)"
+                )
+                connection.commit()
+                self._connection = connection
+            except (OSError, sqlite3.Error) as e:
+                print(f"[yellow]Sync state store disabled: {e}[/yellow]")
+                self._disabled = True
+                return None
+        return self._connection
+
+    def get(self, unique_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            unique_id (int): The Notion unique ID.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the page is unknown.
+        """
+        return self.get_many([unique_id]).get(int(unique_id))
+
+    def get_many(self, unique_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Args:
+            unique_ids (Iterable[int]): The Notion unique IDs to look up.
+
+        Returns:
+            Dict[int, Dict[str, Any]]: The records found, keyed by Notion unique ID.
+        """
+        return self._select("unique_id", [int(unique_id) for unique_id in unique_ids])
+
+    def get_by_task_ids(self, task_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Args:
+            task_ids (Iterable[str]): The Google Task IDs to look up.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The records found, keyed by Google Task ID.
+        """
+        records = self._select("task_id", list(task_ids))
+        return {record["task_id"]: record for record in records.values()}
+
+    def get_by_tasklist_id(self, tasklist_id: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Args:
+            tasklist_id (str): The Google task list ID.
+
+        Returns:
+            Dict[int, Dict[str, Any]]: The records of the pages linked to a task of
+            the task list, keyed by Notion unique ID.
+        """
+        return self._select("tasklist_id", [tasklist_id])
+
+    def _select(self, column: str, values: list) -> Dict[int, Dict[str, Any]]:
+        """Returns the records whose column is one of values, keyed by unique ID."""
+        with self._lock:
+            connection = self._connect()
+            if connection is None or not values:
+                return {}
+            records: Dict[int, Dict[str, Any]] = {}
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(values), 500):
+                chunk = values[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = connection.execute(
+                    f"SELECT * FROM sync_state WHERE {column} IN ({placeholders})",
+                    chunk,
+                )
+                for row in rows:
+                    records[row["unique_id"]] = dict(row)
+            return records
+
+    def upsert(self, unique_id: int, **fields: Any) -> None:
+        """
+        Creates or updates the record of a page, leaving the other fields unchanged.
+
+        Args:
+            unique_id (int): The Notion unique ID.
+            **fields: Values of SYNC_STATE_FIELDS to store.
+        """
+        self.upsert_many({unique_id: fields})
+
+    def upsert_many(self, records: Dict[int, Dict[str, Any]]) -> None:
+        """
+        Args:
+            records (Dict[int, Dict[str, Any]]): Fields to store, keyed by Notion unique ID.
+
+        Raises:
+            ValueError: If a field is not one of SYNC_STATE_FIELDS.
+        """
+        for fields in records.values():
+            unknown_fields = set(fields) - set(SYNC_STATE_FIELDS)
+            if unknown_fields:
+                raise ValueError(f"Unknown sync state fields: {sorted(unknown_fields)}")
+
+        with self._lock:
+            connection = self._connect()
+            if connection is None or not records:
+                return
+            for unique_id, fields in records.items():
+                columns = ["unique_id", *fields]
+                updates = ", ".join(f"{field} = excluded.{field}" for field in fields)
+                connection.execute(
+                    f"INSERT INTO sync_state ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * len(columns))}) "
+                    f"ON CONFLICT (unique_id) DO "
+                    + (f"UPDATE SET {updates}" if fields else "NOTHING"),
+                    [int(unique_id), *fields.values()],
+                )
+            connection.commit()
+
+    def delete(self, unique_id: int) -> None:
+        """
+        Args:
+            unique_id (int): The Notion unique ID whose record is stale.
+        """
+        with self._lock:
+            connection = self._connect()
+            if connection is None:
+                return
+            connection.execute(
+                "DELETE FROM sync_state WHERE unique_id = ?", (int(unique_id),)
+            )
+            connection.commit()
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class BufferedSyncState:
+    """
+    View of a SyncStateStore whose writes are kept in memory until committed.
+    Reads see the buffered writes, so that code run against the view behaves as
+    against the store, e.g. while a sync run is planned but not executed yet.
+    """
+
+    def __init__(self, store: SyncStateStore):
+        """
+        Args:
+            store (SyncStateStore): The store read from, and written to on commit.
+        """
+        self.store = store
+        # Fields written since the last deletion of each record, if any
+        self._fields: Dict[int, Dict[str, Any]] = {}
+        self._deleted: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def get(self, unique_id: int) -> Optional[Dict[str, Any]]:
+        """See SyncStateStore.get."""
+        return self.get_many([unique_id]).get(int(unique_id))
+
+    def get_many(self, unique_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """See SyncStateStore.get_many."""
+        unique_ids = [int(unique_id) for unique_id in unique_ids]
+        with self._lock:
+            stored = self.store.get_many(
+                unique_id for unique_id in unique_ids if unique_id not in self._deleted
+            )
+            records: Dict[int, Dict[str, Any]] = {}
+            for unique_id in unique_ids:
+                record = stored.get(unique_id)
+                if unique_id in self._fields:
+                    record = {
+                        "unique_id": unique_id,
+                        **{field: None for field in SYNC_STATE_FIELDS},
+                        **(record or {}),
+                        **self._fields[unique_id],
+                    }
+                if record is not None:
+                    records[unique_id] = record
+            return records
+
+    def get_by_task_ids(self, task_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """See SyncStateStore.get_by_task_ids."""
+        task_ids = set(task_ids)
+        candidates = {
+            record["unique_id"]
+            for record in self.store.get_by_task_ids(task_ids).values()
+        }
+        with self._lock:
+            candidates.update(self._fields)
+        return {
+            record["task_id"]: record
+            for record in self.get_many(candidates).values()
+            if record["task_id"] in task_ids
+        }
+
+    def get_by_tasklist_id(self, tasklist_id: str) -> Dict[int, Dict[str, Any]]:
+        """See SyncStateStore.get_by_tasklist_id."""
+        candidates = set(self.store.get_by_tasklist_id(tasklist_id))
+        with self._lock:
+            candidates.update(self._fields)
+        return {
+            unique_id: record
+            for unique_id, record in self.get_many(candidates).items()
+            if record["tasklist_id"] == tasklist_id
+        }
+
+    def upsert(self, unique_id: int, **fields: Any) -> None:
+        """See SyncStateStore.upsert."""
+        self.upsert_many({unique_id: fields})
+
+    def upsert_many(self, records: Dict[int, Dict[str, Any]]) -> None:
+        """
+        See SyncStateStore.upsert_many.
+
+        Raises:
+            ValueError: If a field is not one of SYNC_STATE_FIELDS.
+        """
+        for fields in records.values():
+            unknown_fields = set(fields) - set(SYNC_STATE_FIELDS)
+            if unknown_fields:
+                raise ValueError(f"Unknown sync state fields: {sorted(unknown_fields)}")
+        with self._lock:
+            for unique_id, fields in records.items():
+                self._fields.setdefault(int(unique_id), {}).update(fields)
+
+    def delete(self, unique_id: int) -> None:
+        """See SyncStateStore.delete."""
+        with self._lock:
+            self._fields.pop(int(unique_id), None)
+            self._deleted.add(int(unique_id))
+
+    def commit(self) -> None:
+        """Applies the buffered writes to the store, in order, and clears them."""
+        with self._lock:
+            fields, self._fields = self._fields, {}
+            deleted, self._deleted = self._deleted, set()
+        for unique_id in deleted:
+            self.store.delete(unique_id)
+        self.store.upsert_many(fields)
@@ -0,0 +1,5 @@
+from tests.stubs.google_tasks_stub import GoogleTasksStubServer
+from tests.stubs.notion_stub import NotionStubServer
+from tests.stubs.stub_server import StubServer
+
+__all__ = ["GoogleTasksStubServer", "NotionStubServer", "StubServer"]
@@ -0,0 +1,60 @@
+import os
+import shutil
+from typing import Type
+
+from services.notion.src.rate_limiter import TokenBucketRateLimiter
+from services.sync_notion_google_task.main import NotionToGoogleTaskSyncer
+from tests.stubs.google_tasks_stub import GoogleTasksStubServer
+from tests.stubs.notion_stub import NotionStubServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+QUERY_PAYLOAD_PATH = os.path.join("services", "notion", "config", "query_payload.json")
+
+
+def build_stub_syncer(
+    notion_stub: NotionStubServer,
+    google_stub: GoogleTasksStubServer,
+    project_root: str,
+    syncer_class: Type[NotionToGoogleTaskSyncer] = NotionToGoogleTaskSyncer,
+    **syncer_options,
+) -> NotionToGoogleTaskSyncer:
+    """
+    Builds a syncer talking to running stub servers, with its caches, sync state and
+    token under project_root, which should be an empty temporary directory.
+
+    The Notion rate limit is lifted and retries back off for milliseconds only, so
+    that runs measure the syncer rather than the waits. Pass notion_rate_limiter to
+    keep a limit.
+
+    Args:
+        notion_stub (NotionStubServer): The Notion API stub.
+        google_stub (GoogleTasksStubServer): The Google Tasks API stub.
+        project_root (str): Directory used as the project root.
+        syncer_class (Type[NotionToGoogleTaskSyncer]): The syncer class to build.
+        **syncer_options: Extra arguments of the syncer.
+
+    Returns:
+        NotionToGoogleTaskSyncer: The syncer.
+    """
+    payload_path = os.path.join(project_root, QUERY_PAYLOAD_PATH)
+    os.makedirs(os.path.dirname(payload_path), exist_ok=True)
+    shutil.copyfile(os.path.join(REPO_ROOT, QUERY_PAYLOAD_PATH), payload_path)
+    token_path = os.path.join(project_root, "token.json")
+    google_stub.write_token(token_path)
+
+    syncer_options.setdefault(
+        "notion_rate_limiter", TokenBucketRateLimiter(rate=1e6, burst=1000)
+    )
+    syncer = syncer_class(
+        notion_api_key="stub_notion_api_key",
+        database_id=notion_stub.database_id,
+        project_root=project_root,
+        token_path=token_path,
+        sms_user="stub_sms_user",
+        sms_password="stub_sms_password",
+        notion_base_url=notion_stub.base_url,
+        google_api_endpoint=google_stub.api_endpoint,
+        **syncer_options,
+    )
+    syncer.retry_policy.base_delay = 0.001
+    return syncer
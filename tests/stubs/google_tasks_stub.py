@@ -0,0 +1,274 @@
+import itertools
+import json
+import time
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from http.client import responses
+from typing import Any, Dict, List, Optional, Tuple
+
+from tests.stubs.stub_server import StubServer
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _parse_timestamp(timestamp: str) -> datetime:
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
+class GoogleTasksStubServer(StubServer):
+    """
+    Fake of the Tasks v1 endpoints used by GoogleTasksManager: task lists, tasks
+    with `updatedMin`/`showCompleted`/`showHidden` filters and page tokens, and the
+    batch endpoint. The calls carried by a batch are counted like single calls, the
+    latency and 429 injection only apply to the batch request itself.
+    """
+
+    # Default and maximum page size of tasks.list
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    def __init__(self, **kwargs):
+        """
+        Args:
+            **kwargs: Latency and rate limiting options, see StubServer.
+        """
+        super().__init__(**kwargs)
+        self.tasklists: Dict[str, Dict] = {}
+        # Tasks of each task list, in insertion order
+        self.tasks: Dict[str, Dict[str, Dict]] = {}
+        self.batch_requests = 0
+        self._ids = itertools.count(1)
+
+        self.route("GET", "/tasks/v1/users/@me/lists", self._list_tasklists)
+        self.route("POST", "/tasks/v1/users/@me/lists", self._insert_tasklist)
+        self.route("GET", "/tasks/v1/lists/{tasklist}/tasks", self._list_tasks)
+        self.route("POST", "/tasks/v1/lists/{tasklist}/tasks", self._insert_task)
+        self.route("GET", "/tasks/v1/lists/{tasklist}/tasks/{task}", self._get_task)
+        self.route("PATCH", "/tasks/v1/lists/{tasklist}/tasks/{task}", self._patch_task)
+        self.route(
+            "DELETE", "/tasks/v1/lists/{tasklist}/tasks/{task}", self._delete_task
+        )
+        self.route(
+            "POST", "/tasks/v1/lists/{tasklist}/tasks/{task}/move", self._move_task
+        )
+
+    @property
+    def api_endpoint(self) -> str:
+        """Value of GoogleTasksManager's api_endpoint for this server."""
+        return f"{self.url}/"
+
+    @staticmethod
+    def write_token(token_path: str) -> None:
+        """
+        Writes an authorized user token that GoogleTasksManager accepts without
+        refreshing it, since it only expires in a far future.
+        """
+        with open(token_path, "w") as token_file:
+            json.dump(
+                {
+                    "token": "stub-token",
+                    "refresh_token": "stub-refresh-token",
+                    "client_id": "stub-client-id",
+                    "client_secret": "stub-client-secret",
+                    "expiry": "2999-12-31T00:00:00Z",
+                },
+                token_file,
+            )
+
+    def add_tasklist(self, title: str) -> Dict:
+        """Adds a task list, returning its resource."""
+        with self.lock:
+            return self._insert_tasklist({}, {}, {"title": title})[1]
+
+    def add_task(
+        self,
+        tasklist_id: str,
+        title: str,
+        status: str = "needsAction",
+        notes: Optional[str] = None,
+        due: Optional[str] = None,
+        updated: Optional[str] = None,
+    ) -> Dict:
+        """Adds a task to a task list, returning its resource."""
+        with self.lock:
+            body = {"title": title, "status": status, "notes": notes, "due": due}
+            task = self._insert_task({"tasklist": tasklist_id}, {}, body)[1]
+            if updated:
+                task["updated"] = updated
+            return task
+
+    def _list_tasklists(self, path_params, params, payload) -> Tuple[int, Any]:
+        items, next_page_token = self._paginate(
+            list(self.tasklists.values()), params, self.MAX_PAGE_SIZE
+        )
+        response = {"kind": "tasks#taskLists", "items": items}
+        if next_page_token:
+            response["nextPageToken"] = next_page_token
+        return 200, response
+
+    def _insert_tasklist(self, path_params, params, payload) -> Tuple[int, Any]:
+        tasklist_id = f"tasklist-{next(self._ids)}"
+        tasklist = {
+            "kind": "tasks#taskList",
+            "id": tasklist_id,
+            "title": (payload or {}).get("title", ""),
+            "updated": _now(),
+        }
+        self.tasklists[tasklist_id] = tasklist
+        self.tasks[tasklist_id] = {}
+        return 200, tasklist
+
+    def _tasklist_tasks(self, tasklist_id: str) -> Optional[Dict[str, Dict]]:
+        return self.tasks.get(tasklist_id)
+
+    @staticmethod
+    def _paginate(
+        items: List[Dict], params: Dict[str, str], default_page_size: int
+    ) -> Tuple[List[Dict], Optional[str]]:
+        start = int(params.get("pageToken") or 0)
+        page_size = min(
+            int(params.get("maxResults", default_page_size)),
+            GoogleTasksStubServer.MAX_PAGE_SIZE,
+        )
+        end = start + page_size
+        return items[start:end], (str(end) if end < len(items) else None)
+
+    def _list_tasks(self, path_params, params, payload) -> Tuple[int, Any]:
+        tasks = self._tasklist_tasks(path_params["tasklist"])
+        if tasks is None:
+            return 404, {"error": {"code": 404, "message": "Task list not found."}}
+        show_completed = params.get("showCompleted", "true") == "true"
+        show_hidden = params.get("showHidden", "false") == "true"
+        updated_min = params.get("updatedMin")
+        updated_min = _parse_timestamp(updated_min) if updated_min else None
+
+        matches = [
+            task
+            for task in tasks.values()
+            if (show_completed or task["status"] != "completed")
+            and (show_hidden or not task.get("hidden"))
+            and (
+                updated_min is None or _parse_timestamp(task["updated"]) >= updated_min
+            )
+        ]
+        items, next_page_token = self._paginate(matches, params, self.DEFAULT_PAGE_SIZE)
+        response = {"kind": "tasks#tasks", "items": [dict(task) for task in items]}
+        if next_page_token:
+            response["nextPageToken"] = next_page_token
+        return 200, response
+
+    def _insert_task(self, path_params, params, payload) -> Tuple[int, Any]:
+        tasks = self._tasklist_tasks(path_params["tasklist"])
+        if tasks is None:
+            return 404, {"error": {"code": 404, "message": "Task list not found."}}
+        task = {
+            "kind": "tasks#task",
+            "id": f"task-{next(self._ids)}",
+            "title": "",
+            "status": "needsAction",
+            "updated": _now(),
+        }
+        task.update(
+            {key: value for key, value in (payload or {}).items() if value is not None}
+        )
+        if params.get("parent"):
+            task["parent"] = params["parent"]
+        if task["status"] == "completed":
+            task.setdefault("completed", task["updated"])
+        tasks[task["id"]] = task
+        return 200, task
+
+    def _find_task(self, path_params) -> Optional[Dict]:
+        return (self._tasklist_tasks(path_params["tasklist"]) or {}).get(
+            path_params["task"]
+        )
+
+    def _get_task(self, path_params, params, payload) -> Tuple[int, Any]:
+        task = self._find_task(path_params)
+        if task is None:
+            return 404, {"error": {"code": 404, "message": "Task not found."}}
+        return 200, dict(task)
+
+    def _patch_task(self, path_params, params, payload) -> Tuple[int, Any]:
+        task = self._find_task(path_params)
+        if task is None:
+            return 404, {"error": {"code": 404, "message": "Task not found."}}
+        task.update(payload or {})
+        task["updated"] = _now()
+        if task["status"] == "completed":
+            task.setdefault("completed", task["updated"])
+        else:
+            task.pop("completed", None)
+        return 200, dict(task)
+
+    def _delete_task(self, path_params, params, payload) -> Tuple[int, Any]:
+        if self._find_task(path_params) is None:
+            return 404, {"error": {"code": 404, "message": "Task not found."}}
+        del self.tasks[path_params["tasklist"]][path_params["task"]]
+        return 204, None
+
+    def _move_task(self, path_params, params, payload) -> Tuple[int, Any]:
+        task = self._find_task(path_params)
+        if task is None:
+            return 404, {"error": {"code": 404, "message": "Task not found."}}
+        if params.get("parent"):
+            task["parent"] = params["parent"]
+        return 200, dict(task)
+
+    def handle(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        if method != "POST" or target.split("?", 1)[0] != "/batch":
+            return super().handle(method, target, headers, body)
+        if self.latency:
+            time.sleep(self.latency)
+        if self._should_rate_limit():
+            with self.lock:
+                self.rate_limited_count += 1
+            return self.json_response(
+                429,
+                {"error": {"code": 429, "message": "Rate Limit Exceeded"}},
+                {"Retry-After": str(self.retry_after)},
+            )
+        with self.lock:
+            self.batch_requests += 1
+        return self._handle_batch(headers, body)
+
+    def _handle_batch(
+        self, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Runs the calls of a multipart/mixed batch request."""
+        content_type = next(
+            value for name, value in headers.items() if name.lower() == "content-type"
+        )
+        message = BytesParser().parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+        )
+        boundary = "stub_batch_boundary"
+        parts = []
+        for part in message.get_payload():
+            request_line, _, rest = (
+                part.get_payload().replace("\r\n", "\n").partition("\n")
+            )
+            call_method, call_target, _ = request_line.split(" ", 2)
+            _, _, call_body = rest.partition("\n\n")
+            status, payload = self.dispatch(
+                call_method, call_target, call_body.encode("utf-8")
+            )
+            content_id = part["Content-ID"].strip()[1:-1]
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {responses.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload) if payload is not None else ''}\r\n"
+            )
+        response_body = ("".join(parts) + f"--{boundary}--\r\n").encode("utf-8")
+        return (
+            200,
+            {"Content-Type": f"multipart/mixed; boundary={boundary}"},
+            response_body,
+        )
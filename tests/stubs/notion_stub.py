@@ -0,0 +1,250 @@
+import copy
+import random
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tests.stubs.stub_server import StubServer
+
+# Predicate of a compiled database query filter
+PageFilter = Callable[[Dict], bool]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _parse_timestamp(timestamp: str) -> datetime:
+    """Parses an ISO timestamp, naive ones being taken as UTC."""
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class NotionStubServer(StubServer):
+    """
+    Fake of the Notion API endpoints used by NotionClient: database queries with
+    filters and cursor pagination, page retrieval, creation and update, and search.
+
+    Pages are stored as Notion page objects. Query results are returned in
+    insertion order, the `sorts` of queries are ignored.
+    """
+
+    # Maximum page size of database queries
+    MAX_PAGE_SIZE = 100
+
+    def __init__(self, database_id: str = "stub_database", **kwargs):
+        """
+        Args:
+            database_id (str): ID of the fake database.
+            **kwargs: Latency and rate limiting options, see StubServer.
+        """
+        super().__init__(**kwargs)
+        self.database_id = database_id
+        self.pages: Dict[str, Dict] = {}
+        self.pages_by_unique_id: Dict[int, Dict] = {}
+        self._next_unique_id = 1
+        self._uuid_random = random.Random(kwargs.get("seed", 0))
+
+        self.route("POST", "/v1/databases/{database_id}/query", self._query_database)
+        self.route("GET", "/v1/pages/{page_id}", self._get_page)
+        self.route("PATCH", "/v1/pages/{page_id}", self._update_page)
+        self.route("POST", "/v1/pages", self._create_page)
+        self.route("POST", "/v1/search", self._search)
+
+    @property
+    def base_url(self) -> str:
+        """Value of NotionClient's base_url for this server."""
+        return f"{self.url}/v1"
+
+    def add_page(
+        self,
+        title: str,
+        tag: Optional[str] = None,
+        status: str = "Not started",
+        due_date: Optional[str] = None,
+        today: bool = True,
+        from_task: bool = False,
+        importance: Optional[str] = None,
+        text: Optional[str] = None,
+        parent_page_id: Optional[str] = None,
+        last_edited_time: Optional[str] = None,
+    ) -> Dict:
+        """
+        Adds a page to the database.
+
+        Returns:
+            Dict: The Notion page object.
+        """
+        properties = {
+            "Name": {"title": [{"text": {"content": title}}]},
+            "Tags": {"multi_select": [{"name": tag}] if tag else []},
+            "Status": {"status": {"name": status}},
+            "Today": {"checkbox": today},
+            "FromTask": {"checkbox": from_task},
+            "Due Date": {"date": {"start": due_date} if due_date else None},
+            "Importance": {"select": {"name": importance} if importance else None},
+            "Text": {"rich_text": [{"text": {"content": text}}] if text else []},
+            "URL": {"rich_text": []},
+            "Parent item": {
+                "relation": [{"id": parent_page_id}] if parent_page_id else []
+            },
+        }
+        with self.lock:
+            return self._insert_page(properties, last_edited_time)
+
+    def _insert_page(self, properties: Dict, last_edited_time: Optional[str]) -> Dict:
+        page_id = str(uuid.UUID(int=self._uuid_random.getrandbits(128)))
+        unique_id = self._next_unique_id
+        self._next_unique_id += 1
+        timestamp = last_edited_time or _now()
+        page = {
+            "object": "page",
+            "id": page_id,
+            "created_time": timestamp,
+            "last_edited_time": timestamp,
+            "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+            "properties": {
+                **properties,
+                "ID": {"unique_id": {"prefix": None, "number": unique_id}},
+            },
+        }
+        self.pages[page_id.replace("-", "")] = page
+        self.pages_by_unique_id[unique_id] = page
+        return page
+
+    def page_status(self, unique_id: int) -> Optional[str]:
+        """Returns the Status of a page."""
+        status = self.pages_by_unique_id[unique_id]["properties"]["Status"]["status"]
+        return status["name"] if status else None
+
+    def _query_database(self, path_params, params, payload) -> Tuple[int, Any]:
+        if path_params["database_id"] != self.database_id:
+            return 404, {"object": "error", "status": 404, "code": "object_not_found"}
+        payload = payload or {}
+        page_filter, unique_ids = self._compile_filter(payload.get("filter"))
+        if unique_ids is not None:
+            candidates = [
+                self.pages_by_unique_id[unique_id]
+                for unique_id in sorted(unique_ids)
+                if unique_id in self.pages_by_unique_id
+            ]
+        else:
+            candidates = list(self.pages.values())
+        matches = [page for page in candidates if page_filter(page)]
+
+        start = int(payload.get("start_cursor") or 0)
+        page_size = min(
+            int(payload.get("page_size", self.MAX_PAGE_SIZE)), self.MAX_PAGE_SIZE
+        )
+        end = start + page_size
+        has_more = end < len(matches)
+        return 200, {
+            "object": "list",
+            "results": copy.deepcopy(matches[start:end]),
+            "has_more": has_more,
+            "next_cursor": str(end) if has_more else None,
+        }
+
+    def _compile_filter(
+        self, query_filter: Optional[Dict]
+    ) -> Tuple[PageFilter, Optional[set]]:
+        """
+        Compiles a query filter into a predicate. A compound filter matching unique
+        IDs only is also returned as the set of IDs, to look the pages up directly.
+        """
+        if not query_filter:
+            return (lambda page: True), None
+        if "or" in query_filter:
+            conditions = query_filter["or"]
+            if conditions and all(
+                "unique_id" in condition and "equals" in condition["unique_id"]
+                for condition in conditions
+            ):
+                unique_ids = {
+                    condition["unique_id"]["equals"] for condition in conditions
+                }
+                return (
+                    lambda page: page["properties"]["ID"]["unique_id"]["number"]
+                    in unique_ids
+                ), unique_ids
+            predicates = [
+                self._compile_filter(condition)[0] for condition in conditions
+            ]
+            return (lambda page: any(predicate(page) for predicate in predicates)), None
+        if "and" in query_filter:
+            predicates = [
+                self._compile_filter(condition)[0] for condition in query_filter["and"]
+            ]
+            return (lambda page: all(predicate(page) for predicate in predicates)), None
+        if query_filter.get("timestamp") == "last_edited_time":
+            condition = query_filter["last_edited_time"]
+            after = _parse_timestamp(condition["on_or_after"])
+            return (
+                lambda page: _parse_timestamp(page["last_edited_time"]) >= after
+            ), None
+        return self._compile_property_filter(query_filter), None
+
+    @staticmethod
+    def _compile_property_filter(query_filter: Dict) -> PageFilter:
+        property_name = query_filter["property"]
+        property_type, condition = next(
+            (key, value) for key, value in query_filter.items() if key != "property"
+        )
+
+        def values(page: Dict) -> List[Any]:
+            value = page["properties"].get(property_name, {}).get(property_type)
+            if property_type == "unique_id":
+                return [value["number"]] if value else []
+            if property_type in ("status", "select"):
+                return [value["name"]] if value else []
+            if property_type == "multi_select":
+                return [option["name"] for option in value or []]
+            if property_type in ("title", "rich_text"):
+                return ["".join(text["text"]["content"] for text in value or [])]
+            return [value]
+
+        if "equals" in condition:
+            return lambda page: condition["equals"] in values(page)
+        if "does_not_equal" in condition:
+            return lambda page: condition["does_not_equal"] not in values(page)
+        if "contains" in condition:
+            return lambda page: condition["contains"] in values(page)
+        return lambda page: True
+
+    def _find_page(self, page_id: str) -> Optional[Dict]:
+        return self.pages.get(page_id.replace("-", ""))
+
+    def _get_page(self, path_params, params, payload) -> Tuple[int, Any]:
+        page = self._find_page(path_params["page_id"])
+        if page is None:
+            return 404, {"object": "error", "status": 404, "code": "object_not_found"}
+        return 200, copy.deepcopy(page)
+
+    def _update_page(self, path_params, params, payload) -> Tuple[int, Any]:
+        page = self._find_page(path_params["page_id"])
+        if page is None:
+            return 404, {"object": "error", "status": 404, "code": "object_not_found"}
+        page["properties"].update((payload or {}).get("properties", {}))
+        page["last_edited_time"] = _now()
+        return 200, copy.deepcopy(page)
+
+    def _create_page(self, path_params, params, payload) -> Tuple[int, Any]:
+        properties = {
+            "Status": {"status": {"name": "Not started"}},
+            "Tags": {"multi_select": []},
+            "Due Date": {"date": None},
+            **(payload or {}).get("properties", {}),
+        }
+        return 200, copy.deepcopy(self._insert_page(properties, None))
+
+    def _search(self, path_params, params, payload) -> Tuple[int, Any]:
+        query = (payload or {}).get("query", "").lower()
+        results = [
+            copy.deepcopy(page)
+            for page in self.pages.values()
+            if query
+            in page["properties"]["Name"]["title"][0]["text"]["content"].lower()
+        ]
+        return 200, {"object": "list", "results": results[: self.MAX_PAGE_SIZE]}
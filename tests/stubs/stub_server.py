@@ -0,0 +1,170 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# A route handler receives the path parameters, the query string parameters and
+# the JSON body, and returns the status code and the JSON response
+RouteHandler = Callable[[Dict[str, str], Dict[str, str], Any], Tuple[int, Any]]
+
+
+class StubServer:
+    """
+    In-process HTTP server faking an API for tests and benchmarks.
+
+    Subclasses register their endpoints with `route`. Every request is counted per
+    route in `request_counts`, can be delayed by `latency` seconds, and can be
+    rejected with a 429 to exercise the clients' retries: either every
+    `rate_limit_every` requests, or at random with `rate_limit_probability`.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        rate_limit_probability: float = 0.0,
+        retry_after: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            latency (float): Delay added to every request, in seconds.
+            rate_limit_every (int): Reject every Nth request with a 429, 0 to disable.
+            rate_limit_probability (float): Probability of rejecting a request with a 429.
+            retry_after (float): Value of the `Retry-After` header of 429 responses.
+            seed (int): Seed of the random 429 injection.
+        """
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._routes: List[Tuple[str, Pattern, str, RouteHandler]] = []
+        # Serialises the handlers, which share the fake API state
+        self.lock = threading.RLock()
+        # Calls per route, the calls carried by batch requests included
+        self.request_counts: Counter = Counter()
+        # HTTP requests received, rate limited ones included
+        self.http_requests = 0
+        self.rate_limited_count = 0
+        self._request_number = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def route(self, method: str, path: str, handler: RouteHandler) -> None:
+        """
+        Registers an endpoint. Path segments written `{name}` are passed to the
+        handler as path parameters.
+        """
+        pattern = re.compile(
+            "^" + re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(path)) + "$"
+        )
+        self._routes.append((method, pattern, f"{method} {path}", handler))
+
+    @property
+    def url(self) -> str:
+        """Root URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        """Starts serving on a free local port in a background thread."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, payload = stub.handle(
+                    self.command, self.path, dict(self.headers), body
+                )
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def _should_rate_limit(self) -> bool:
+        with self.lock:
+            self.http_requests += 1
+            self._request_number += 1
+            if (
+                self.rate_limit_every
+                and self._request_number % self.rate_limit_every == 0
+            ):
+                return True
+            return self._random.random() < self.rate_limit_probability
+
+    def handle(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Handles a request, returning its status code, headers and body.
+        Subclasses override it for endpoints that are not JSON, e.g. batches.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        if self._should_rate_limit():
+            with self.lock:
+                self.rate_limited_count += 1
+            return self.json_response(
+                429,
+                {"object": "error", "status": 429, "code": "rate_limited"},
+                {"Retry-After": str(self.retry_after)},
+            )
+        status, payload = self.dispatch(method, target, body)
+        return self.json_response(status, payload)
+
+    def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        """Calls the handler of the route matching the request."""
+        parts = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        for route_method, pattern, name, handler in self._routes:
+            match = pattern.match(unquote(parts.path))
+            if route_method == method and match:
+                with self.lock:
+                    self.request_counts[name] += 1
+                    payload = json.loads(body) if body else None
+                    return handler(match.groupdict(), params, payload)
+        with self.lock:
+            self.request_counts[f"{method} (unknown)"] += 1
+        return 404, {"error": f"No route for {method} {unquote(parts.path)}"}
+
+    @staticmethod
+    def json_response(
+        status: int, payload: Any, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        return status, {"Content-Type": "application/json", **(headers or {})}, body
@@ -0,0 +1,214 @@
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.google_task.src.tasklist_snapshot import TasklistSnapshot
+from services.sync_notion_google_task.async_syncer import (
+    AsyncNotionToGoogleTaskSyncer,
+    ConcurrencyLimitedClient,
+)
+from services.sync_notion_google_task.sync_state import SyncStateStore
+
+
+@pytest.fixture
+def mock_async_syncer():
+    with patch(
+        "services.sync_notion_google_task.main.NotionClient"
+    ) as MockNotionClient, patch(
+        "services.sync_notion_google_task.main.GoogleTasksManager"
+    ) as MockGoogleTasksManager:
+        mock_notion_client = MockNotionClient.return_value
+        mock_google_tasks_manager = MockGoogleTasksManager.return_value
+
+        syncer = AsyncNotionToGoogleTaskSyncer(
+            "mock_notion_api_key",
+            "mock_database_id",
+            "mock_project_root",
+            "mock_token_path",
+            "mock_sms_user",
+            "mock_sms_password",
+            sync_state=SyncStateStore(":memory:"),
+        )
+        return syncer, mock_notion_client, mock_google_tasks_manager
+
+
+def parsed_page(unique_id):
+    return {
+        "unique_id": unique_id,
+        "title": f"Task {unique_id}",
+        "tags": "Work",
+        "due_date": None,
+        "importance": None,
+        "text": None,
+        "url": None,
+        "page_url": None,
+        "parent_page_id": None,
+        "parent_page_name": None,
+        "FromTask": False,
+    }
+
+
+def test_concurrency_limited_client_bounds_calls_in_flight():
+    """
+    Test no more calls than the semaphore allows run at the same time.
+    """
+    lock = threading.Lock()
+    in_flight = {"current": 0, "max": 0}
+
+    def slow_call():
+        with lock:
+            in_flight["current"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["current"])
+        time.sleep(0.05)
+        with lock:
+            in_flight["current"] -= 1
+
+    client = MagicMock()
+    client.slow_call.side_effect = slow_call
+    client.name = "client"
+    limited = ConcurrencyLimitedClient(client, threading.BoundedSemaphore(2))
+
+    threads = [threading.Thread(target=limited.slow_call) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.slow_call.call_count == 5
+    assert in_flight["max"] == 2
+    # Attributes are passed through
+    assert limited.name == "client"
+
+    # Generators hold the semaphore while each of their items is produced
+    in_flight["max"] = 0
+
+    def slow_pages():
+        for page in range(3):
+            slow_call()
+            yield page
+
+    client.iter_pages.side_effect = slow_pages
+    pages = []
+    threads = [
+        threading.Thread(target=lambda: pages.extend(limited.iter_pages()))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(pages) == [0] * 5 + [1] * 5 + [2] * 5
+    assert in_flight["max"] == 2
+
+
+def test_sync_pages_to_google_tasks_async(mock_async_syncer):
+    """
+    Test pages are synced as with the sequential syncer, with the task index
+    built while Notion is queried.
+    """
+    syncer, notion_client, google_tasks_manager = mock_async_syncer
+    notion_client.iter_database_query.return_value = iter(
+        [{"results": ["first"]}, {"results": []}, {"results": ["second"]}]
+    )
+    notion_client.iter_parsed_pages.side_effect = lambda responses, fields: [
+        parsed_page(1 if result == "first" else 2)
+        for response in responses
+        for result in response["results"]
+    ]
+    google_tasks_manager.list_task_lists.return_value = {"Work": "list_1"}
+    google_tasks_manager.list_tasks_in_tasklist.return_value = {
+        "Existing | (3)": {"id": "task_3"}
+    }
+    queued_titles = []
+
+    def queue_create_task(**kwargs):
+        queued_titles.append(kwargs["task_title"])
+        return kwargs["task_title"]
+
+    def execute_queued_requests():
+        results = {
+            title: {"response": {"id": f"task_{title[-2]}"}, "error": None}
+            for title in queued_titles
+        }
+        queued_titles.clear()
+        return results
+
+    google_tasks_manager.queue_create_task.side_effect = queue_create_task
+    google_tasks_manager.execute_queued_requests.side_effect = execute_queued_requests
+
+    syncer.sync_pages_to_google_tasks(last_successful_sync=datetime(2024, 1, 1))
+
+    google_tasks_manager.list_task_lists.assert_called_once()
+    assert google_tasks_manager.execute_queued_requests.call_count == 2
+    assert syncer.task_index == {
+        1: {"tasklist_id": "list_1", "task_id": "task_1"},
+        2: {"tasklist_id": "list_1", "task_id": "task_2"},
+        3: {"tasklist_id": "list_1", "task_id": "task_3"},
+    }
+
+
+def test_sync_pages_to_google_tasks_async_raises_creation_errors(mock_async_syncer):
+    """
+    Test a failed task creation stops the sync with an error, as in the sequential syncer.
+    """
+    syncer, notion_client, google_tasks_manager = mock_async_syncer
+    notion_client.iter_database_query.return_value = iter(
+        [{"results": ["first"]}, {"results": ["second"]}]
+    )
+    notion_client.iter_parsed_pages.side_effect = lambda responses, fields: [
+        parsed_page(1)
+    ]
+    google_tasks_manager.list_task_lists.return_value = {"Work": "list_1"}
+    google_tasks_manager.list_tasks_in_tasklist.return_value = {}
+    google_tasks_manager.queue_create_task.return_value = "0"
+    google_tasks_manager.execute_queued_requests.return_value = {
+        "0": {"response": None, "error": Exception("Quota exceeded")}
+    }
+
+    syncer.sms_client = MagicMock()
+
+    with pytest.raises(Exception, match="Quota exceeded"):
+        syncer.sync_pages_to_google_tasks()
+    syncer.sms_client.send_sms.assert_called_once()
+
+
+def test_sync_google_tasks_to_notion_async_overlaps_tasklists(mock_async_syncer):
+    """
+    Test task lists are processed concurrently, each through every sync step.
+    """
+    syncer, notion_client, google_tasks_manager = mock_async_syncer
+    google_tasks_manager.list_task_lists.return_value = {
+        "Work": "list_1",
+        "Home": "list_2",
+    }
+    # Both task lists must be in their first step at the same time to get through
+    barrier = threading.Barrier(2, timeout=5)
+
+    def get_tasklist_snapshot(tasklist_id):
+        barrier.wait()
+        return TasklistSnapshot(
+            tasklist_id,
+            [
+                {
+                    "title": f"Done | ({tasklist_id[-1]})",
+                    "id": f"task_{tasklist_id}",
+                    "status": "completed",
+                    "updated": "2024-01-02T00:00:00.000Z",
+                }
+            ],
+        )
+
+    google_tasks_manager.get_tasklist_snapshot.side_effect = get_tasklist_snapshot
+
+    syncer.sync_google_tasks_to_notion(datetime(2024, 1, 1))
+
+    # Completed tasks are first seen as created, then as completed
+    completed_ids = [
+        call.args[0] for call in notion_client.mark_pages_as_completed.call_args_list
+    ]
+    assert sorted(completed_ids, key=sorted) == [{1}, {2}]
+    assert google_tasks_manager.get_tasklist_snapshot.call_count == 2
@@ -191,3 +191,207 @@ def test_get_created_tasks_since(mock_manager):
             "due": None,
         },
     }
+
+
+def test_list_tasks_in_tasklist_follows_page_token(mock_manager):
+    """
+    Test that tasks are listed across pages with a partial response.
+    """
+    mock_list = mock_manager.service.tasks().list
+    mock_list.reset_mock()
+    mock_list.return_value.execute.side_effect = [
+        {"items": [{"title": "Task 1", "id": "1"}], "nextPageToken": "page_2"},
+        {"items": [{"title": "Task 2", "id": "2"}]},
+    ]
+
+    result = mock_manager.list_tasks_in_tasklist(tasklist_id="1")
+
+    assert set(result) == {"Task 1", "Task 2"}
+    first_call, second_call = mock_list.call_args_list
+    assert first_call.kwargs["maxResults"] == 100
+    assert first_call.kwargs["fields"] == (
+        "nextPageToken,items(id,title,status,completed,updated,due)"
+    )
+    assert "pageToken" not in first_call.kwargs
+    assert second_call.kwargs["pageToken"] == "page_2"
+
+
+def test_execute_queued_requests(mock_manager):
+    """
+    Test that queued requests are sent in batches with per-item results.
+    """
+    mock_manager.BATCH_SIZE = 2
+    batches = []
+
+    def new_batch_http_request(callback):
+        batch = MagicMock()
+        added = []
+        batch.add.side_effect = lambda request, request_id: added.append(request_id)
+
+        def execute(http=None):
+            for request_id in added:
+                if request_id == "1":
+                    callback(request_id, None, Exception("Not Found"))
+                else:
+                    callback(request_id, {"id": f"task_{request_id}"}, None)
+
+        batch.execute.side_effect = execute
+        batches.append(added)
+        return batch
+
+    mock_manager.service.new_batch_http_request.side_effect = new_batch_http_request
+
+    first = mock_manager.queue_create_task("list_1", "New Task")
+    second = mock_manager.queue_mark_task_completed("list_1", "task_a")
+    third = mock_manager.queue_modify_task_title("list_1", "task_b", "Renamed")
+
+    results = mock_manager.execute_queued_requests()
+
+    assert batches == [[first, second], [third]]
+    assert results[first] == {"response": {"id": "task_0"}, "error": None}
+    assert str(results[second]["error"]) == "Not Found"
+    assert results[third]["response"] == {"id": "task_2"}
+    # The queue is emptied once executed
+    assert mock_manager.execute_queued_requests() == {}
+
+
+def make_http_error(status, headers=None):
+    """
+    Builds an HttpError with the given status code.
+    """
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    response = httplib2.Response({"status": status, **(headers or {})})
+    return HttpError(response, b"{}")
+
+
+def test_execute_retries_transient_errors(mock_manager):
+    """
+    Test idempotent requests are retried, while inserts are only retried on 429.
+    """
+    from services.common.retry import RetryPolicy
+
+    mock_manager.retry_policy = RetryPolicy(sleep=lambda delay: None)
+    request = MagicMock()
+    request.execute.side_effect = [make_http_error(503), {"id": "1"}]
+    assert mock_manager._execute(request, "tasks.tasks.patch") == {"id": "1"}
+
+    request = MagicMock()
+    request.execute.side_effect = [make_http_error(503)]
+    with pytest.raises(Exception):
+        mock_manager._execute(request, "tasks.tasks.insert", idempotent=False)
+    assert request.execute.call_count == 1
+
+    request = MagicMock()
+    request.execute.side_effect = [
+        make_http_error(429, {"retry-after": "2"}),
+        {"id": "2"},
+    ]
+    assert mock_manager._execute(request, "tasks.tasks.insert", idempotent=False) == {
+        "id": "2"
+    }
+
+
+def test_execute_queued_requests_retries_transient_items(mock_manager):
+    """
+    Test only the batch items failing with a transient error are sent again.
+    """
+    from services.common.retry import RetryPolicy
+
+    mock_manager.retry_policy = RetryPolicy(sleep=lambda delay: None)
+    batches = []
+
+    def new_batch_http_request(callback):
+        batch = MagicMock()
+        added = []
+        batch.add.side_effect = lambda request, request_id: added.append(request_id)
+
+        def execute(http=None):
+            for request_id in added:
+                if len(batches) == 1:
+                    callback(request_id, None, make_http_error(503))
+                else:
+                    callback(request_id, {"id": request_id}, None)
+
+        batch.execute.side_effect = execute
+        batches.append(added)
+        return batch
+
+    mock_manager.service.new_batch_http_request.side_effect = new_batch_http_request
+
+    insert = mock_manager.queue_create_task("list_1", "New Task")
+    patch_request = mock_manager.queue_mark_task_completed("list_1", "task_a")
+
+    results = mock_manager.execute_queued_requests()
+
+    # The insert is not idempotent, so only the patch is retried
+    assert batches == [[insert, patch_request], [patch_request]]
+    assert results[insert]["error"].resp.status == 503
+    assert results[patch_request] == {"response": {"id": patch_request}, "error": None}
+
+
+def test_queued_requests_are_per_thread(mock_manager):
+    """
+    Test requests queued by a worker thread are neither seen nor executed by others.
+    """
+    import threading
+
+    mock_manager.queue_mark_task_completed("list_1", "task_a")
+    worker_queue = []
+    worker = threading.Thread(
+        target=lambda: worker_queue.extend(mock_manager._queued_requests)
+    )
+    worker.start()
+    worker.join()
+
+    assert worker_queue == []
+    assert len(mock_manager._queued_requests) == 1
+
+
+def test_get_tasklist_snapshot(mock_manager):
+    """
+    Test the snapshot lists completed and hidden tasks in a single listing.
+    """
+    tasks = mock_manager.service.tasks()
+    tasks.list.reset_mock()
+    tasks.list().execute.return_value = {
+        "items": [{"title": "Task 1", "id": "1", "status": "needsAction"}]
+    }
+    tasks.list.reset_mock()
+
+    snapshot = mock_manager.get_tasklist_snapshot("list_1")
+
+    assert snapshot.active() == {
+        "Task 1": {"id": "1", "status": "needsAction", "completed": None}
+    }
+    tasks.list.assert_called_once()
+    params = tasks.list.call_args.kwargs
+    assert params["showCompleted"] is True
+    assert params["showHidden"] is True
+    assert "updatedMin" not in params
+
+
+def test_queue_update_task(mock_manager):
+    """
+    Test task updates patch the title, notes and due date.
+    """
+    from datetime import datetime
+
+    tasks = mock_manager.service.tasks()
+    tasks.patch.reset_mock()
+
+    mock_manager.queue_update_task(
+        "list_1", "task_1", "Task | (1)", "Notes", datetime(2024, 1, 10)
+    )
+
+    tasks.patch.assert_called_once_with(
+        tasklist="list_1",
+        task="task_1",
+        body={
+            "title": "Task | (1)",
+            "notes": "Notes",
+            "due": "2024-01-10T00:00:00.000Z",
+        },
+    )
+    assert len(mock_manager._queued_requests) == 1
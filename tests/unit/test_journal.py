@@ -0,0 +1,67 @@
+from services.sync_notion_google_task.journal import SyncJournal
+from services.sync_notion_google_task.planner import (
+    CreatePage,
+    CreateTask,
+    MarkPageDone,
+)
+
+
+def test_journal_tracks_unfinished_operations(tmp_path):
+    """
+    Test operations stay unfinished until done, across journal instances.
+    """
+    path = str(tmp_path / "journal" / "sync_journal.jsonl")
+    create_task = CreateTask(
+        page_id=1,
+        tasklist_name="Work",
+        title="Task | (1)",
+        notes="Notes",
+        due=None,
+        content_hash="hash",
+        tasklist_id="list_work",
+    )
+    create_page = CreatePage(
+        tasklist_name="Work",
+        tasklist_id="list_work",
+        task_id="task_7",
+        task_title="Created in Google",
+    )
+    mark_page_done = MarkPageDone(page_id=6)
+
+    journal = SyncJournal(path)
+    journal.record_planned([create_task, create_page, mark_page_done])
+    journal.record_progress(create_page, notion_page_id=7)
+    journal.record_done([mark_page_done])
+    # A record cut short by a crash is ignored
+    with open(path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"status": "done", "key": ')
+
+    unfinished = SyncJournal(path).unfinished()
+    assert [entry.operation for entry in unfinished] == [create_task, create_page]
+    assert unfinished[0].attempts == 1
+    assert unfinished[1].details == {"notion_page_id": 7}
+
+    journal.record_planned([create_task])
+    journal.compact()
+    unfinished = journal.unfinished()
+    assert [entry.attempts for entry in unfinished] == [2, 1]
+    assert unfinished[1].details == {"notion_page_id": 7}
+
+    journal.record_done([create_task, create_page])
+    journal.compact()
+    assert journal.unfinished() == []
+    assert not (tmp_path / "journal" / "sync_journal.jsonl").exists()
+
+
+def test_journal_disables_itself_on_error(tmp_path):
+    """
+    Test a journal that cannot be written does not break the sync.
+    """
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    journal = SyncJournal(str(blocker / "sync_journal.jsonl"))
+
+    journal.record_planned([MarkPageDone(page_id=6)])
+
+    assert journal._disabled
+    assert journal.unfinished() == []
@@ -0,0 +1,105 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.common.metrics import Histogram, MetricsRegistry
+from tests.stubs import GoogleTasksStubServer, NotionStubServer
+from tests.stubs.environment import build_stub_syncer
+
+
+def test_metrics_registry_records_and_exports(tmp_path):
+    """
+    Test requests are aggregated per endpoint and exported as JSON and Prometheus text.
+    """
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics.observe(
+        "notion", "GET /v1/pages/{id}", 200, seconds=0.05, bytes_received=100
+    )
+    metrics.observe("notion", "GET /v1/pages/{id}", 429, seconds=0.5)
+    metrics.observe("notion", "GET /v1/pages/{id}", 200, seconds=2.0, retry=True)
+    with pytest.raises(TimeoutError):
+        with metrics.time("google_tasks", "tasks.tasks.insert") as observation:
+            observation.bytes_sent = 10
+            raise TimeoutError()
+
+    exported = {
+        endpoint["endpoint"]: endpoint
+        for endpoint in json.loads(json.dumps(metrics.to_dict()))["endpoints"]
+    }
+    pages = exported["GET /v1/pages/{id}"]
+    assert pages["requests"] == 3
+    assert pages["retries"] == 1
+    assert pages["errors"] == 1
+    assert pages["statuses"] == {"200": 2, "429": 1}
+    assert pages["bytes_received"] == 100
+    assert pages["latency"]["buckets"] == {"0.1": 1, "1": 2, "+Inf": 3}
+    insert = exported["tasks.tasks.insert"]
+    assert insert["statuses"] == {"error": 1}
+    assert insert["bytes_sent"] == 10
+    assert insert["latency"]["count"] == 1
+
+    prometheus = metrics.to_prometheus(prefix="sync")
+    assert (
+        'sync_requests_total{service="notion",endpoint="GET /v1/pages/{id}",status="429"} 1'
+        in prometheus
+    )
+    assert (
+        'sync_request_duration_seconds_bucket{service="notion",'
+        'endpoint="GET /v1/pages/{id}",le="+Inf"} 3' in prometheus
+    )
+    metrics.write_prometheus(str(tmp_path / "metrics" / "sync.prom"))
+    assert (tmp_path / "metrics" / "sync.prom").read_text() == metrics.to_prometheus()
+
+    histogram = Histogram(buckets=(1.0, 2.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == pytest.approx(3.0)
+
+
+def test_syncer_records_requests_of_every_service(tmp_path):
+    """
+    Test the syncer records every HTTP request sent to the stub servers, retries included.
+    """
+    with NotionStubServer(
+        rate_limit_every=3
+    ) as notion_stub, GoogleTasksStubServer() as google_stub:
+        for index in range(5):
+            notion_stub.add_page(f"Page {index}", tag="Work")
+        syncer = build_stub_syncer(
+            notion_stub, google_stub, str(tmp_path), verbose=False
+        )
+        try:
+            syncer.sync_pages_to_google_tasks(
+                last_successful_sync=datetime.utcnow() - timedelta(hours=1)
+            )
+        finally:
+            syncer.close()
+
+    endpoints = syncer.metrics.endpoints
+    notion = {
+        endpoint: metrics
+        for (service, endpoint), metrics in endpoints.items()
+        if service == "notion"
+    }
+    assert (
+        sum(metrics.requests for metrics in notion.values())
+        == notion_stub.http_requests
+    )
+    assert (
+        sum(metrics.retries for metrics in notion.values())
+        == notion_stub.rate_limited_count
+    )
+    assert notion["POST /v1/databases/{id}/query"].bytes_received > 0
+
+    batch = endpoints[("google_tasks", "tasks.batch")]
+    assert batch.requests == google_stub.batch_requests
+    assert batch.statuses == {"200": google_stub.batch_requests}
+    assert batch.bytes_sent > 0 and batch.bytes_received > 0
+    # Calls carried by the batch are counted, without a latency of their own
+    inserts = endpoints[("google_tasks", "tasks.tasks.insert")]
+    assert inserts.requests == 5
+    assert inserts.latency.count == 0
+    assert endpoints[("google_tasks", "tasks.tasklists.list")].latency.count == 1
@@ -1,7 +1,14 @@
 import json
 from unittest.mock import MagicMock, mock_open, patch
 
+import pytest
+import requests
+
+from services.common.retry import RetryPolicy
 from services.notion.src.notion_client import NotionClient
+from services.notion.src.notion_page import NotionPage
+from services.notion.src.page_id_cache import PageIdCache
+from services.notion.src.ttl_cache import TTLCache
 
 # Sample data for mocking responses
 MOCK_NOTION_RESPONSE = {
@@ -16,9 +23,7 @@ MOCK_NOTION_RESPONSE = {
                 "Name": {"title": [{"text": {"content": "Task 1"}}]},
                 "Text": {"rich_text": [{"text": {"content": "Some text"}}]},
                 "URL": {
-                    "rich_text": [
-                        {"text": {"link": {"url": "http://example.com"}}}
-                    ]
+                    "rich_text": [{"text": {"link": {"url": "http://example.com"}}}]
                 },
                 "Parent item": {"relation": [{"id": "parent_1"}]},
             },
@@ -37,15 +42,23 @@ MOCK_PARENT_PAGE_RESPONSE = {
 class TestNotionClient:
     def setup_method(self):
         """Initialize the NotionClient instance before each test."""
+        self.session = MagicMock()
         self.notion_client = NotionClient(
-            "fake_api_key", "fake_database_id", "/fake/project/root"
+            "fake_api_key",
+            "fake_database_id",
+            "/fake/project/root",
+            session=self.session,
+            page_id_cache=PageIdCache(":memory:"),
+            parent_name_cache=TTLCache(),
+            parent_index_cache=TTLCache(),
+            retry_policy=RetryPolicy(sleep=lambda delay: None),
         )
 
-    @patch("requests.post")
-    def test_get_filtered_sorted_database(self, mock_post):
+    def test_get_filtered_sorted_database(self):
         """Test get_filtered_sorted_database method."""
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = MOCK_NOTION_RESPONSE
+        mock_request = self.session.request
+        mock_request.return_value.status_code = 200
+        mock_request.return_value.json.return_value = MOCK_NOTION_RESPONSE
 
         with patch(
             "builtins.open",
@@ -56,27 +69,99 @@ class TestNotionClient:
         assert response is not None
         assert response["results"][0]["id"] == "page_1"
 
-    @patch("requests.get")
-    def test_fetch_parent_page_names(self, mock_get):
+    def test_iter_database_query_follows_cursor(self):
+        """Test iter_database_query pages through results with start_cursor."""
+        first_page = MagicMock()
+        first_page.json.return_value = {
+            "results": [{"id": "page_1"}],
+            "has_more": True,
+            "next_cursor": "cursor_2",
+        }
+        second_page = MagicMock()
+        second_page.json.return_value = {
+            "results": [{"id": "page_2"}],
+            "has_more": False,
+            "next_cursor": None,
+        }
+        responses = iter([first_page, second_page])
+        sent_payloads = []
+
+        def fake_request(method, url, headers, json, params):
+            # The payload is reused between requests, so keep a copy of each one
+            sent_payloads.append(dict(json))
+            return next(responses)
+
+        self.session.request.side_effect = fake_request
+
+        pages = list(
+            self.notion_client.iter_database_query(query_page_ids=[1], page_size=1)
+        )
+
+        assert [page["results"][0]["id"] for page in pages] == ["page_1", "page_2"]
+        assert sent_payloads[0]["page_size"] == 1
+        assert "start_cursor" not in sent_payloads[0]
+        assert sent_payloads[1]["start_cursor"] == "cursor_2"
+
+    def test_fetch_parent_page_names(self):
         """Test fetch_parent_page_names method."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = MOCK_PARENT_PAGE_RESPONSE
+        mock_request = self.session.request
+        mock_request.return_value.status_code = 200
+        mock_request.return_value.json.return_value = MOCK_PARENT_PAGE_RESPONSE
+
+        parent_names = self.notion_client.fetch_parent_page_names({"parent_1"})
+        assert parent_names["parent_1"] == "Parent Page"
 
+        # A second lookup is served from the parent name cache
         parent_names = self.notion_client.fetch_parent_page_names({"parent_1"})
         assert parent_names["parent_1"] == "Parent Page"
+        mock_request.assert_called_once()
+
+    def test_fetch_parent_page_names_collects_errors(self):
+        """Test concurrent parent lookups keep going when one of them fails."""
+
+        def fake_request(method, url, headers):
+            response = MagicMock()
+            if url.endswith("broken"):
+                response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+                    "500 Server Error"
+                )
+            response.json.return_value = MOCK_PARENT_PAGE_RESPONSE
+            return response
+
+        self.session.request.side_effect = fake_request
+
+        parent_names = self.notion_client.fetch_parent_page_names(
+            {"parent_1", "parent_2", "broken"}
+        )
+
+        assert parent_names == {
+            "parent_1": "Parent Page",
+            "parent_2": "Parent Page",
+            "broken": None,
+        }
+        # Failed lookups are not cached, so they are retried on the next call
+        assert "broken" not in self.notion_client.parent_name_cache
+
+    def test_parse_notion_response_without_parent_names(self):
+        """Test parse_notion_response skips parent lookups when opted out."""
+        parsed_data = self.notion_client.parse_notion_response(
+            MOCK_NOTION_RESPONSE, resolve_parent_names=False
+        )
+
+        assert parsed_data[0]["parent_page_id"] == "parent_1"
+        assert parsed_data[0]["parent_page_name"] is None
+        self.session.request.assert_not_called()
 
-    @patch("requests.patch")
     @patch.object(
         NotionClient,
         "get_filtered_sorted_database",
         return_value=MOCK_NOTION_RESPONSE,
     )
-    def test_mark_page_as_completed(
-        self, mock_get_filtered_sorted_database, mock_patch
-    ):
+    def test_mark_page_as_completed(self, mock_get_filtered_sorted_database):
         """Test mark_page_as_completed method."""
-        mock_patch.return_value.status_code = 200
-        mock_patch.return_value.json.return_value = {"status": "success"}
+        mock_request = self.session.request
+        mock_request.return_value.status_code = 200
+        mock_request.return_value.json.return_value = {"status": "success"}
 
         response = self.notion_client.mark_page_as_completed(123)
         assert response is not None
@@ -84,9 +169,7 @@ class TestNotionClient:
 
     def test_parse_notion_response(self):
         """Test parse_notion_response method."""
-        parsed_data = self.notion_client.parse_notion_response(
-            MOCK_NOTION_RESPONSE
-        )
+        parsed_data = self.notion_client.parse_notion_response(MOCK_NOTION_RESPONSE)
 
         assert len(parsed_data) == 1
         assert parsed_data[0]["page_id"] == "page_1"
@@ -94,10 +177,56 @@ class TestNotionClient:
         assert parsed_data[0]["importance"] == "High"
         assert parsed_data[0]["title"] == "Task 1"
 
-    @patch("requests.post")
-    def test_get_filtered_sorted_database_file_not_found(self, mock_post):
+    def test_iter_parsed_pages_with_fields(self):
+        """Test iter_parsed_pages parses only the requested fields, response by response."""
+        second_response = {
+            "results": [
+                {
+                    "id": "page-2",
+                    "properties": {
+                        "ID": {"unique_id": {"number": 456}},
+                        "Status": {"status": {"name": "Done"}},
+                    },
+                }
+            ]
+        }
+        self.session.request.return_value.status_code = 200
+        self.session.request.return_value.json.return_value = MOCK_PARENT_PAGE_RESPONSE
+
+        pages = self.notion_client.iter_parsed_pages(
+            iter([MOCK_NOTION_RESPONSE, second_response]),
+            fields=("title", "page_status", "parent_page_name"),
+        )
+        first = next(pages)
+        assert isinstance(first, NotionPage)
+        assert first.title == "Task 1"
+        assert first["parent_page_name"] == "Parent Page"
+        assert first["page_status"] is None
+        # Unrequested fields are missing, the IDs are always parsed for the cache
+        assert "tags" not in first and first.get("tags", "missing") == "missing"
+        with pytest.raises(KeyError):
+            first["importance"]
+        assert self.notion_client.page_id_cache.get_page_id(456) is None
+
+        second = next(pages)
+        assert second.to_dict() == {
+            "unique_id": 456,
+            "page_id": "page2",
+            "title": None,
+            "page_status": "Done",
+            "parent_page_id": None,
+            "parent_page_name": None,
+        }
+        assert self.notion_client.page_id_cache.get_page_id(456) == "page2"
+        assert next(pages, None) is None
+        self.session.request.assert_called_once()
+
+        with pytest.raises(ValueError):
+            list(self.notion_client.iter_parsed_pages([], fields=("unknown",)))
+
+    def test_get_filtered_sorted_database_file_not_found(self):
         """Test get_filtered_sorted_database when payload file is missing."""
-        mock_post.return_value.status_code = 200
+        self.session.request.return_value.status_code = 200
 
         with patch("builtins.open", side_effect=FileNotFoundError):
             response = self.notion_client.get_filtered_sorted_database()
@@ -117,16 +246,13 @@ class TestNotionClient:
                 }
             ]
         }
-        parsed_data = self.notion_client.parse_notion_response(
-            incomplete_response
-        )
+        parsed_data = self.notion_client.parse_notion_response(incomplete_response)
 
         assert len(parsed_data) == 1
         assert parsed_data[0]["tags"] is None
         assert parsed_data[0]["title"] == "Task 1"
 
-    @patch("services.notion.src.notion_client.requests.patch")
-    def test_mark_page_as_completed_failure(self, mock_patch):
+    def test_mark_page_as_completed_failure(self):
         """Test mark_page_as_completed with a failed API call."""
         self.notion_client.get_filtered_sorted_database = MagicMock(
             return_value={
@@ -141,19 +267,20 @@ class TestNotionClient:
 
         mock_patch_response = MagicMock()
         mock_patch_response.status_code = 400
+        mock_patch = self.session.request
         mock_patch.return_value = mock_patch_response
 
         result = self.notion_client.mark_page_as_completed(task_id=123)
 
         assert result is None
         mock_patch.assert_called_once_with(
+            "PATCH",
             "https://api.notion.com/v1/pages/mock_page_id",
             headers=self.notion_client.headers,
             json={"properties": {"Status": {"status": {"name": "Done"}}}},
         )
 
-    @patch("services.notion.src.notion_client.requests.patch")
-    def test_mark_page_as_completed_api_failure(self, mock_patch):
+    def test_mark_page_as_completed_api_failure(self):
         """Test mark_page_as_completed with an API failure."""
         self.notion_client.get_filtered_sorted_database = MagicMock(
             return_value={
@@ -169,13 +296,201 @@ class TestNotionClient:
         mock_patch_response = MagicMock()
         mock_patch_response.status_code = 500
         mock_patch_response.text = "Internal Server Error"
+        mock_patch = self.session.request
         mock_patch.return_value = mock_patch_response
 
         result = self.notion_client.mark_page_as_completed(task_id=123)
 
         assert result is None
-        mock_patch.assert_called_once_with(
+        # Server errors on an idempotent PATCH are retried before giving up
+        assert mock_patch.call_count == self.notion_client.retry_policy.max_attempts
+        mock_patch.assert_called_with(
+            "PATCH",
             "https://api.notion.com/v1/pages/mock_page_id",
             headers=self.notion_client.headers,
             json={"properties": {"Status": {"status": {"name": "Done"}}}},
         )
+        assert self.notion_client.retry_policy.counters["PATCH /v1/pages/{id}"] == {
+            "calls": 1,
+            "retries": 3,
+            "failures": 1,
+        }
+
+    def test_default_session_is_pooled_with_timeout(self):
+        """Test the default session mounts a pooled adapter with a timeout."""
+        with NotionClient(
+            "fake_api_key",
+            "fake_database_id",
+            "/fake/project/root",
+            page_id_cache=PageIdCache(":memory:"),
+            parent_name_cache=TTLCache(),
+            parent_index_cache=TTLCache(),
+        ) as notion_client:
+            adapter = notion_client.session.get_adapter("https://api.notion.com")
+            assert adapter.timeout == NotionClient.DEFAULT_TIMEOUT
+            assert adapter._pool_maxsize == NotionClient.POOL_MAXSIZE
+
+    def test_query_pages_by_unique_ids_chunks_ids(self):
+        """Test query_pages_by_unique_ids splits IDs into filter-sized chunks."""
+        queried_chunks = []
+
+        def fake_iter_database_query(query_page_ids):
+            queried_chunks.append(query_page_ids)
+            yield {
+                "results": [
+                    {
+                        "id": f"page_{page_id}",
+                        "properties": {
+                            "ID": {"unique_id": {"number": page_id}},
+                            "Status": {"status": {"name": "Done"}},
+                        },
+                    }
+                    for page_id in query_page_ids
+                ]
+            }
+
+        self.notion_client.iter_database_query = fake_iter_database_query
+
+        pages = self.notion_client.query_pages_by_unique_ids(range(1, 251))
+
+        assert sorted(len(chunk) for chunk in queried_chunks) == [50, 100, 100]
+        assert len(pages) == 250
+        assert pages[250]["page_id"] == "page_250"
+
+        statuses = self.notion_client.retrieve_pages_status([1, 2])
+        assert {status["task_id"] for status in statuses} == {1, 2}
+        assert all(status["page_status"] == "Done" for status in statuses)
+
+    def test_mark_pages_as_completed(self):
+        """Test mark_pages_as_completed skips pages already marked as 'Done'."""
+        self.notion_client.query_pages_by_unique_ids = MagicMock(
+            return_value={
+                1: {"unique_id": 1, "page_id": "page_1", "page_status": "Done"},
+                2: {"unique_id": 2, "page_id": "page_2", "page_status": "To Do"},
+            }
+        )
+        self.session.request.return_value.status_code = 200
+        self.session.request.return_value.json.return_value = {"id": "page_2"}
+
+        results = self.notion_client.mark_pages_as_completed([1, 2, 3])
+
+        assert results == {1: None, 2: {"id": "page_2"}, 3: None}
+        self.session.request.assert_called_once_with(
+            "PATCH",
+            "https://api.notion.com/v1/pages/page_2",
+            headers=self.notion_client.headers,
+            json={"properties": {"Status": {"status": {"name": "Done"}}}},
+        )
+
+    def test_mark_page_as_completed_uses_page_id_cache(self):
+        """Test mark_page_as_completed skips the database query on a cache hit."""
+        self.notion_client.parse_notion_response(MOCK_NOTION_RESPONSE)
+        self.notion_client.get_filtered_sorted_database = MagicMock()
+        self.session.request.return_value.status_code = 200
+        self.session.request.return_value.json.return_value = {"id": "page_1"}
+
+        assert self.notion_client.mark_page_as_completed(123) == {"id": "page_1"}
+        self.notion_client.get_filtered_sorted_database.assert_not_called()
+
+    def test_mark_page_as_completed_skips_cached_done_page(self):
+        """Test a cached page already marked as 'Done' is read, not updated."""
+        self.notion_client.page_id_cache.set_many({123: "page_1"})
+        self.notion_client.get_filtered_sorted_database = MagicMock()
+        self.session.request.return_value.status_code = 200
+        self.session.request.return_value.json.return_value = {
+            "id": "page_1",
+            "properties": {"Status": {"status": {"name": "Done"}}},
+        }
+
+        assert self.notion_client.mark_page_as_completed(123) is None
+        self.session.request.assert_called_once_with(
+            "GET",
+            "https://api.notion.com/v1/pages/page_1",
+            headers=self.notion_client.headers,
+        )
+        self.notion_client.get_filtered_sorted_database.assert_not_called()
+
+    def test_mark_page_as_completed_invalidates_stale_cache(self):
+        """Test a deleted cached page falls back to the database query."""
+        self.notion_client.page_id_cache.set_many({123: "deleted_page"})
+        self.notion_client.get_filtered_sorted_database = MagicMock(return_value=None)
+        self.session.request.return_value.status_code = 404
+
+        assert self.notion_client.mark_page_as_completed(123) is None
+        assert self.notion_client.page_id_cache.get_page_id(123) is None
+        self.notion_client.get_filtered_sorted_database.assert_called_once()
+
+        # Trashed pages are still returned by Notion, flagged as archived
+        for flag in ("archived", "in_trash"):
+            self.notion_client.page_id_cache.set_many({123: "trashed_page"})
+            self.notion_client.get_filtered_sorted_database.reset_mock()
+            self.session.request.return_value.status_code = 200
+            self.session.request.return_value.json.return_value = {
+                "id": "trashed_page",
+                flag: True,
+                "properties": {"Status": {"status": {"name": "In progress"}}},
+            }
+
+            assert self.notion_client.mark_page_as_completed(123) is None
+            assert self.notion_client.page_id_cache.get_page_id(123) is None
+            self.notion_client.get_filtered_sorted_database.assert_called_once()
+            assert self.session.request.call_args.args[0] == "GET"
+
+    def test_find_parent_page_by_name_uses_index(self):
+        """Test a missing parent name costs one query, then one search if unknown."""
+        index_response = MagicMock()
+        index_response.json.return_value = {
+            "results": [
+                {
+                    "id": "parent-1",
+                    "properties": {"Name": {"title": [{"text": {"content": "Home"}}]}},
+                }
+            ],
+            "has_more": False,
+        }
+        search_response = MagicMock()
+        search_response.json.return_value = {"results": []}
+        self.session.request.side_effect = lambda method, url, **kwargs: (
+            search_response if url.endswith("/search") else index_response
+        )
+
+        for _ in range(20):
+            assert self.notion_client.find_parent_page_by_name("home") == "parent1"
+        assert self.session.request.call_count == 1
+        # Only the missing name is queried, not the whole database
+        assert self.session.request.call_args.kwargs["json"]["filter"] == {
+            "property": "Name",
+            "title": {"equals": "home"},
+        }
+        assert self.session.request.call_args.kwargs["params"] == {
+            "filter_properties": "title"
+        }
+
+        # Unknown names fall back to a single search and are not searched again
+        assert self.notion_client.find_parent_page_by_name("Unknown") is None
+        assert self.notion_client.find_parent_page_by_name("Unknown") is None
+        assert self.session.request.call_count == 3
+
+    def test_request_retries_after_rate_limit(self):
+        """Test a 429 pauses the rate limiter for Retry-After and is sent again."""
+        self.notion_client.rate_limiter = MagicMock()
+        rate_limited = MagicMock(status_code=429, headers={"Retry-After": "2"})
+        success = MagicMock(status_code=200)
+        self.session.request.side_effect = [rate_limited, success]
+
+        response = self.notion_client._request("GET", "https://api.notion.com/v1/x")
+
+        assert response is success
+        self.notion_client.rate_limiter.pause.assert_called_once_with(2.0)
+        assert self.notion_client.rate_limiter.acquire.call_count == 2
+
+    def test_request_does_not_retry_non_idempotent_server_errors(self):
+        """Test page creations are not sent twice after a server error."""
+        self.session.request.return_value = MagicMock(status_code=502)
+
+        response = self.notion_client._request(
+            "POST", "https://api.notion.com/v1/pages", idempotent=False, json={}
+        )
+
+        assert response.status_code == 502
+        self.session.request.assert_called_once()
@@ -3,8 +3,11 @@ import datetime as dt
 from unittest.mock import patch
 
 import pytest
+from rich.console import Console
 
+from services.google_task.src.tasklist_snapshot import TasklistSnapshot
 from services.sync_notion_google_task.main import NotionToGoogleTaskSyncer
+from services.sync_notion_google_task.sync_state import SyncStateStore
 
 
 @pytest.fixture
@@ -26,6 +29,7 @@ def mock_syncer():
             "mock_token_path",
             "mock_sms_user",
             "mock_sms_password",
+            sync_state=SyncStateStore(":memory:"),
         )
         return syncer, mock_notion_client, mock_google_tasks_manager
 
@@ -38,9 +42,7 @@ def test_build_task_description(mock_syncer):
     text = "Complete the report"
     urls = ["http://example.com", "http://example.org"]
     page_url = "http://example.com/page"
-    due_date = (
-        datetime.utcnow() + timedelta(days=7)
-    ).isoformat()
+    due_date = (datetime.utcnow() + timedelta(days=7)).isoformat()
 
     description = syncer.build_task_description(
         importance, text, urls, page_url, due_date
@@ -119,15 +121,13 @@ def test_task_exists(mock_syncer):
     syncer, _, google_tasks_manager = mock_syncer
 
     # Mock task list data
-    google_tasks_manager.list_tasks_in_tasklist.side_effect = (
-        lambda tasklist_id: (
-            [
-                "Task 1 | (1)",
-                "Task 2 | (2)",
-            ]
-            if tasklist_id == "existing_tasklist_id"
-            else []
-        )
+    google_tasks_manager.list_tasks_in_tasklist.side_effect = lambda tasklist_id: (
+        {
+            "Task 1 | (1)": {"id": "task_1"},
+            "Task 2 | (2)": {"id": "task_2"},
+        }
+        if tasklist_id == "existing_tasklist_id"
+        else {}
     )
 
     # Test case: Task exists
@@ -137,18 +137,49 @@ def test_task_exists(mock_syncer):
     # Test case: Task does not exist
     assert syncer.task_exists(google_task_lists, "3") is False
 
+    # Test case: The index is built once, not once per lookup
+    assert google_tasks_manager.list_tasks_in_tasklist.call_count == 1
+
+    # Test case: Linked pages are resolved from the sync state without an index
+    syncer.task_index = None
+    assert syncer.task_exists(google_task_lists, "2") is True
+    assert google_tasks_manager.list_tasks_in_tasklist.call_count == 1
+    # Test case: Links are trusted, without a request per page
+    google_tasks_manager.get_task.assert_not_called()
+    google_tasks_manager.get_task_details.assert_not_called()
+
     # Test case: Empty task list
+    syncer.task_index = None
+    syncer.sync_state = SyncStateStore(":memory:")
     google_task_lists = {"Personal": "empty_tasklist_id"}
     assert syncer.task_exists(google_task_lists, "1") is False
 
 
+def test_build_task_index(mock_syncer):
+    syncer, _, google_tasks_manager = mock_syncer
+
+    google_tasks_manager.list_tasks_in_tasklist.side_effect = lambda tasklist_id: {
+        f"Task | ({tasklist_id[-1]})": {"id": f"task_{tasklist_id}"},
+        "Task without Notion ID": {"id": "orphan"},
+    }
+
+    task_index = syncer.build_task_index({"Work": "list_1", "Home": "list_2"})
+    assert task_index == {
+        1: {"tasklist_id": "list_1", "task_id": "task_list_1"},
+        2: {"tasklist_id": "list_2", "task_id": "task_list_2"},
+    }
+
+    # Newly created tasks are added in place
+    syncer._index_task(3, "list_1", "task_3")
+    assert syncer.task_exists({"Work": "list_1"}, 3) is True
+    assert google_tasks_manager.list_tasks_in_tasklist.call_count == 2
+
+
 def test_ensure_tasklist_exists(mock_syncer):
     syncer, _, google_tasks_manager = mock_syncer
 
     # Mock creating a task list
-    google_tasks_manager.create_task_list.return_value = {
-        "id": "new_tasklist_id"
-    }
+    google_tasks_manager.create_task_list.return_value = {"id": "new_tasklist_id"}
 
     # Test case: Task list already exists
     google_task_lists = {"Work": "existing_tasklist_id"}
@@ -188,9 +219,306 @@ def test_extract_page_id_from_task_title(mock_syncer):
     assert syncer.extract_page_id_from_task_title("") is None
 
     # Test case: Task title with multiple parentheses
-    assert (
-        syncer.extract_page_id_from_task_title("Task (456) Name (123)") == 123
-    )
+    assert syncer.extract_page_id_from_task_title("Task (456) Name (123)") == 123
 
     # Test case: Task title with only parentheses
     assert syncer.extract_page_id_from_task_title("()") is None
+
+
+def test_sync_pages_to_google_tasks_streams_results(mock_syncer):
+    syncer, notion_client, google_tasks_manager = mock_syncer
+
+    def parsed_page(unique_id):
+        return {
+            "unique_id": unique_id,
+            "title": f"Page {unique_id}",
+            "tags": "Work",
+            "due_date": None,
+            "importance": None,
+            "text": None,
+            "url": None,
+            "page_url": None,
+            "parent_page_id": None,
+            "parent_page_name": None,
+            "FromTask": False,
+        }
+
+    notion_client.iter_database_query.return_value = iter(
+        [{"results": ["first"]}, {"results": ["second"]}]
+    )
+    notion_client.iter_parsed_pages.side_effect = lambda responses, fields: [
+        parsed_page(1 if response["results"] == ["first"] else 2)
+        for response in responses
+    ]
+    google_tasks_manager.list_task_lists.return_value = {"Work": "list_1"}
+    google_tasks_manager.list_tasks_in_tasklist.return_value = {}
+    queued_titles = []
+
+    def queue_create_task(**kwargs):
+        queued_titles.append(kwargs["task_title"])
+        return kwargs["task_title"]
+
+    def execute_queued_requests():
+        results = {
+            title: {"response": {"id": f"task_{title[-2]}"}, "error": None}
+            for title in queued_titles
+        }
+        queued_titles.clear()
+        return results
+
+    google_tasks_manager.queue_create_task.side_effect = queue_create_task
+    google_tasks_manager.execute_queued_requests.side_effect = execute_queued_requests
+
+    syncer.sync_pages_to_google_tasks()
+
+    # One batch flush per Notion result page
+    assert google_tasks_manager.queue_create_task.call_count == 2
+    assert google_tasks_manager.execute_queued_requests.call_count == 2
+    assert syncer.task_index == {
+        1: {"tasklist_id": "list_1", "task_id": "task_1"},
+        2: {"tasklist_id": "list_1", "task_id": "task_2"},
+    }
+
+
+def test_sync_google_tasks_to_notion_parallel_tasklists(mock_syncer):
+    """
+    Test task lists are synced on a worker pool and errors are aggregated.
+    """
+    import threading
+
+    syncer, notion_client, google_tasks_manager = mock_syncer
+    syncer.tasklist_workers = 3
+    google_tasks_manager.list_task_lists.return_value = {
+        "Work": "list_1",
+        "Home": "list_2",
+        "Broken": "list_3",
+    }
+    # Every task list must be in its first step at the same time to get through
+    barrier = threading.Barrier(3, timeout=5)
+
+    def get_tasklist_snapshot(tasklist_id):
+        barrier.wait()
+        if tasklist_id == "list_3":
+            raise Exception("Error listing tasks")
+        return TasklistSnapshot(
+            tasklist_id,
+            [
+                {
+                    "title": f"Active | ({tasklist_id[-1]})",
+                    "id": "t",
+                    "status": "needsAction",
+                }
+            ],
+        )
+
+    google_tasks_manager.get_tasklist_snapshot.side_effect = get_tasklist_snapshot
+    google_tasks_manager.extract_task_id_from_task_title.side_effect = (
+        syncer.extract_page_id_from_task_title
+    )
+    notion_client.retrieve_pages_status.return_value = []
+
+    with pytest.raises(Exception, match="1 of 3 task lists: Error listing tasks"):
+        syncer.sync_google_tasks_to_notion(datetime(2024, 1, 1))
+
+    # The other task lists went through every step
+    assert sorted(
+        call.args[0] for call in notion_client.retrieve_pages_status.call_args_list
+    ) == [[1], [2]]
+    notion_client.mark_pages_as_completed.assert_not_called()
+
+
+def test_sync_tasklist_uses_sync_state(mock_syncer):
+    """
+    Test tasks linked in the sync state are resolved without their title, completions
+    already propagated are skipped, and statuses read during the run are not queried.
+    """
+    import time
+
+    syncer, notion_client, google_tasks_manager = mock_syncer
+    syncer.sync_state.upsert_many(
+        {
+            # Completion already propagated to Notion
+            1: {
+                "task_id": "task_1",
+                "notion_status": "Done",
+                "google_updated": "2024-01-02T00:00:00.000Z",
+            },
+            # Linked task whose title lost its Notion ID
+            2: {"task_id": "task_2"},
+            # Status read from Notion during this run
+            3: {
+                "task_id": "task_3",
+                "notion_status": "In progress",
+                "notion_checked_at": time.time(),
+            },
+            # Task deleted from the task list since it was linked
+            8: {"tasklist_id": "list_1", "task_id": "deleted_task"},
+            # Task of another task list
+            9: {"tasklist_id": "list_2", "task_id": "task_9"},
+        }
+    )
+    google_tasks_manager.get_tasklist_snapshot.return_value = TasklistSnapshot(
+        "list_1",
+        [
+            {
+                "title": "Done | (1)",
+                "id": "task_1",
+                "status": "completed",
+                "updated": "2024-01-02T00:00:00.000Z",
+            },
+            {
+                "title": "Renamed",
+                "id": "task_2",
+                "status": "completed",
+                "updated": "2024-01-02T00:00:00.000Z",
+            },
+            {"title": "Active | (3)", "id": "task_3", "status": "needsAction"},
+            {"title": "Active | (4)", "id": "task_4", "status": "needsAction"},
+        ],
+    )
+    google_tasks_manager.extract_task_id_from_task_title.side_effect = (
+        syncer.extract_page_id_from_task_title
+    )
+    notion_client.mark_pages_as_completed.return_value = {2: {"id": "page_2"}}
+    notion_client.retrieve_pages_status.return_value = [
+        {"task_id": 4, "title": "Active", "page_status": "In progress"}
+    ]
+
+    syncer._sync_tasklist("Work", "list_1", datetime(2024, 1, 1), Console())
+
+    notion_client.create_new_page.assert_not_called()
+    notion_client.mark_pages_as_completed.assert_called_once_with({2})
+    notion_client.retrieve_pages_status.assert_called_once_with([4])
+    assert syncer.sync_state.get(2)["notion_status"] == "Done"
+    assert syncer.sync_state.get(4)["notion_status"] == "In progress"
+    assert syncer.sync_state.get(8) is None
+    assert syncer.sync_state.get(9)["task_id"] == "task_9"
+
+
+def test_existing_tasks_updated_only_when_content_changes(mock_syncer):
+    """
+    Test existing tasks are patched when their content hash changed, and left
+    alone otherwise.
+    """
+    syncer, _, google_tasks_manager = mock_syncer
+    syncer.sync_state.upsert(1, tasklist_id="list_1", task_id="task_1")
+    page = {
+        "unique_id": 1,
+        "title": "Task",
+        "tags": "Work",
+        "due_date": "2024-01-10",
+        "importance": "High",
+        "text": None,
+        "url": None,
+        "page_url": None,
+        "parent_page_id": None,
+        "parent_page_name": None,
+        "FromTask": False,
+    }
+    google_tasks_manager.queue_update_task.return_value = "0"
+    google_tasks_manager.execute_queued_requests.return_value = {
+        "0": {"response": {"id": "task_1"}, "error": None}
+    }
+
+    # No content recorded yet: the hash is recorded without patching the task
+    syncer._sync_parsed_pages([page], {"Work": "list_1"}, Console())
+    google_tasks_manager.queue_update_task.assert_not_called()
+    assert syncer.sync_state.get(1)["content_hash"] is not None
+
+    # Same content: nothing to send
+    syncer._sync_parsed_pages([page], {"Work": "list_1"}, Console())
+    google_tasks_manager.queue_update_task.assert_not_called()
+
+    # Changed content: patched
+    syncer._sync_parsed_pages(
+        [{**page, "title": "Renamed"}], {"Work": "list_1"}, Console()
+    )
+    update = google_tasks_manager.queue_update_task.call_args.kwargs
+    assert update["tasklist_id"] == "list_1"
+    assert update["task_id"] == "task_1"
+    assert update["task_title"] == "Renamed | (1)"
+    assert update["task_notes"] == "Importance: High\nDue Date: 10-01-24"
+    google_tasks_manager.queue_create_task.assert_not_called()
+
+    # Parent page whose name could not be fetched: not patched without its parent
+    unnamed_parent = {**page, "parent_page_id": "parent_1"}
+    syncer._sync_parsed_pages([unnamed_parent], {"Work": "list_1"}, Console())
+    assert google_tasks_manager.queue_update_task.call_count == 1
+
+    # Deleted task: the update fails with a 404 and the task is created again
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    google_tasks_manager.queue_update_task.return_value = "1"
+    google_tasks_manager.queue_create_task.return_value = "2"
+    google_tasks_manager.execute_queued_requests.side_effect = [
+        {
+            "1": {
+                "response": None,
+                "error": HttpError(httplib2.Response({"status": 404}), b"{}"),
+            }
+        },
+        {"2": {"response": {"id": "task_2"}, "error": None}},
+    ]
+    syncer._sync_parsed_pages(
+        [{**page, "title": "Edited"}], {"Work": "list_1"}, Console()
+    )
+    creation = google_tasks_manager.queue_create_task.call_args.kwargs
+    assert creation["tasklist_id"] == "list_1"
+    assert creation["task_title"] == "Edited | (1)"
+    record = syncer.sync_state.get(1)
+    assert record["task_id"] == "task_2"
+    assert record["content_hash"] is not None
+
+
+def test_compute_content_hash(mock_syncer):
+    syncer, _, _ = mock_syncer
+
+    content_hash = syncer.compute_content_hash(
+        "Task | (1)", "Importance: High", datetime(2024, 1, 10, 8)
+    )
+    # Only the date of the due date is part of the content
+    assert content_hash == syncer.compute_content_hash(
+        "Task | (1)", "Importance: High", datetime(2024, 1, 10, 20)
+    )
+    assert content_hash != syncer.compute_content_hash(
+        "Task | (1)", "Importance: Low", datetime(2024, 1, 10, 8)
+    )
+    assert content_hash != syncer.compute_content_hash(
+        "Task | (1)", "Importance: High", None
+    )
+    assert content_hash != syncer.compute_content_hash(
+        "Task | (1)", "Importance: High", datetime(2024, 1, 10, 8), "parent_1"
+    )
+
+    # Dates too far away are moved to the current day in the task, not in the hash
+    page = {
+        "unique_id": 1,
+        "title": "Task",
+        "due_date": "2099-01-10",
+        "importance": None,
+        "text": None,
+        "url": None,
+        "page_url": None,
+        "parent_page_id": None,
+        "parent_page_name": None,
+    }
+    with patch.object(
+        syncer,
+        "compute_due_date",
+        side_effect=[datetime(2024, 1, 10), datetime(2024, 1, 11)],
+    ):
+        first_run = syncer._task_content(page, Console())
+        second_run = syncer._task_content(page, Console())
+    assert first_run["due_date"] != second_run["due_date"]
+    assert first_run["content_hash"] == second_run["content_hash"]
+
+    # The parent page is hashed by ID, whether or not its name could be fetched
+    child = {**page, "parent_page_id": "parent_1", "parent_page_name": "Parent"}
+    with patch.object(syncer, "compute_due_date", return_value=datetime(2024, 1, 10)):
+        named = syncer._task_content(child, Console())
+        unnamed = syncer._task_content({**child, "parent_page_name": None}, Console())
+    assert named["title"] == "Task - Parent | (1)"
+    assert unnamed["title"] == "Task | (1)"
+    assert named["content_hash"] == unnamed["content_hash"]
+    assert named["content_hash"] != first_run["content_hash"]
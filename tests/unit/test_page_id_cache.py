@@ -0,0 +1,27 @@
+from services.notion.src.page_id_cache import PageIdCache
+
+
+def test_page_id_cache_round_trip(tmp_path):
+    """Test mappings persist across cache instances and can be invalidated."""
+    db_path = str(tmp_path / "cache" / "page_ids.sqlite3")
+    cache = PageIdCache(db_path)
+    cache.set_many({1: "page_1", 2: "page_2"})
+    cache.close()
+
+    cache = PageIdCache(db_path)
+    assert cache.get_page_id(1) == "page_1"
+    assert cache.get_page_ids([1, 2, 3]) == {1: "page_1", 2: "page_2"}
+
+    cache.invalidate(1)
+    assert cache.get_page_id(1) is None
+    cache.close()
+
+
+def test_page_id_cache_disabled_on_error(tmp_path):
+    """Test the cache degrades to misses when its database cannot be opened."""
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("")
+    cache = PageIdCache(str(blocker / "page_ids.sqlite3"))
+
+    cache.set_many({1: "page_1"})
+    assert cache.get_page_id(1) is None
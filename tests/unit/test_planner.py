@@ -0,0 +1,425 @@
+import dataclasses
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from services.google_task.src.tasklist_snapshot import TasklistSnapshot
+from services.sync_notion_google_task.journal import SyncJournal
+from services.sync_notion_google_task.main import NotionToGoogleTaskSyncer
+from services.sync_notion_google_task.planner import (
+    CreatePage,
+    CreateTask,
+    CreateTasklist,
+    MarkPageDone,
+    MarkTaskDone,
+    SyncPlan,
+    SyncPlanner,
+    UpdateTask,
+)
+from services.sync_notion_google_task.sync_state import SyncStateStore
+
+
+@pytest.fixture
+def mock_planner():
+    with patch(
+        "services.sync_notion_google_task.main.NotionClient"
+    ) as MockNotionClient, patch(
+        "services.sync_notion_google_task.main.GoogleTasksManager"
+    ) as MockGoogleTasksManager, patch(
+        "services.sync_notion_google_task.main.SMSAPI"
+    ):
+        syncer = NotionToGoogleTaskSyncer(
+            "mock_notion_api_key",
+            "mock_database_id",
+            "mock_project_root",
+            "mock_token_path",
+            "mock_sms_user",
+            "mock_sms_password",
+            sync_state=SyncStateStore(":memory:"),
+        )
+        return (
+            SyncPlanner(syncer),
+            MockNotionClient.return_value,
+            MockGoogleTasksManager.return_value,
+        )
+
+
+def parsed_page(unique_id, title, tags="Work", page_status="Not started"):
+    return {
+        "unique_id": unique_id,
+        "title": title,
+        "tags": tags,
+        "due_date": "2024-01-10",
+        "importance": None,
+        "text": None,
+        "url": None,
+        "page_url": None,
+        "parent_page_id": None,
+        "parent_page_name": None,
+        "page_status": page_status,
+        "FromTask": False,
+    }
+
+
+def test_plan_and_execute(mock_planner):
+    """
+    Test a plan covers every kind of operation and is executed with a single batch.
+    """
+    planner, mock_notion_client, mock_google_tasks_manager = mock_planner
+    syncer = planner.syncer
+    last_sync = datetime(2024, 1, 1)
+
+    pages = [
+        parsed_page(1, "New task"),
+        parsed_page(2, "New task in a new list", tags="Home"),
+        parsed_page(3, "Changed task"),
+        parsed_page(4, "Unchanged task"),
+    ]
+    mock_notion_client.iter_database_query.return_value = [{"results": []}]
+    mock_notion_client.iter_parsed_pages.return_value = pages
+    mock_google_tasks_manager.list_task_lists.return_value = {"Work": "list_work"}
+
+    syncer.sync_state.upsert_many(
+        {
+            3: {"tasklist_id": "list_work", "task_id": "task_3", "content_hash": "old"},
+            4: {
+                "tasklist_id": "list_work",
+                "task_id": "task_4",
+                "content_hash": syncer._task_content(pages[3], None)["content_hash"],
+            },
+            # Linked task whose page is not in the query, i.e. possibly Done
+            5: {"tasklist_id": "list_work", "task_id": "task_5"},
+        }
+    )
+    mock_google_tasks_manager.list_tasks_in_tasklist.return_value = {
+        "Changed task | (3)": {"id": "task_3"},
+        "Unchanged task | (4)": {"id": "task_4"},
+    }
+    updated = "2024-01-02T00:00:00.000Z"
+    mock_google_tasks_manager.get_tasklist_snapshot.return_value = TasklistSnapshot(
+        "list_work",
+        [
+            {
+                "id": "task_3",
+                "title": "Changed task | (3)",
+                "status": "needsAction",
+                "updated": updated,
+            },
+            {
+                "id": "task_4",
+                "title": "Unchanged task | (4)",
+                "status": "needsAction",
+                "updated": updated,
+            },
+            {
+                "id": "task_5",
+                "title": "Renamed in Google",
+                "status": "needsAction",
+                "updated": updated,
+            },
+            {
+                "id": "task_6",
+                "title": "Done in Google | (6)",
+                "status": "completed",
+                "updated": updated,
+            },
+            {
+                "id": "task_7",
+                "title": "Created in Google",
+                "status": "needsAction",
+                "updated": updated,
+            },
+        ],
+    )
+    mock_notion_client.retrieve_pages_status.return_value = [
+        {"task_id": 5, "title": "Renamed", "page_status": "Done"}
+    ]
+
+    plan = planner.plan(last_successful_sync=last_sync)
+
+    assert [operation.kind for operation in plan] == [
+        "create_tasklist",
+        "create_task",
+        "create_task",
+        "update_task",
+        "mark_task_done",
+        "mark_page_done",
+        "create_page",
+    ]
+    assert plan.of_type(CreateTasklist) == [CreateTasklist(name="Home")]
+    assert [operation.page_id for operation in plan.of_type(CreateTask)] == [1, 2]
+    assert plan.of_type(CreateTask)[1].tasklist_id is None
+    assert plan.of_type(UpdateTask)[0].task_id == "task_3"
+    assert plan.of_type(MarkTaskDone) == [
+        MarkTaskDone(page_id=5, tasklist_id="list_work", task_id="task_5")
+    ]
+    assert plan.of_type(MarkPageDone) == [
+        MarkPageDone(page_id=6, google_updated=updated)
+    ]
+    assert plan.of_type(CreatePage)[0].task_id == "task_7"
+    # Statuses of the queried pages were read with them
+    mock_notion_client.retrieve_pages_status.assert_called_once_with([5])
+    # Planning does not write to either service
+    mock_google_tasks_manager.create_task_list.assert_not_called()
+    mock_google_tasks_manager.queue_create_task.assert_not_called()
+    mock_notion_client.mark_pages_as_completed.assert_not_called()
+
+    mock_google_tasks_manager.create_task_list.return_value = {"id": "list_home"}
+    mock_google_tasks_manager.queue_create_task.side_effect = ["c1", "c2"]
+    mock_google_tasks_manager.queue_update_task.return_value = "u3"
+    mock_google_tasks_manager.queue_mark_task_completed.return_value = "m5"
+    mock_google_tasks_manager.execute_queued_requests.return_value = {
+        "c1": {"response": {"id": "task_1"}, "error": None},
+        "c2": {"response": {"id": "task_2"}, "error": None},
+        "u3": {"response": {"id": "task_3"}, "error": None},
+        "m5": {"response": {"id": "task_5"}, "error": None},
+    }
+    mock_notion_client.mark_pages_as_completed.return_value = {6: {}}
+    mock_notion_client.create_new_page.return_value = 7
+
+    planner.execute(plan)
+
+    assert (
+        mock_google_tasks_manager.queue_create_task.call_args_list[1].kwargs[
+            "tasklist_id"
+        ]
+        == "list_home"
+    )
+    mock_google_tasks_manager.execute_queued_requests.assert_called_once()
+    mock_notion_client.mark_pages_as_completed.assert_called_once_with({6})
+    mock_google_tasks_manager.modify_task_title.assert_called_once_with(
+        tasklist_id="list_work", task_id="task_7", new_title="Created in Google | (7)"
+    )
+    assert syncer.sync_state.get(2)["task_id"] == "task_2"
+    assert (
+        syncer.sync_state.get(3)["content_hash"]
+        == plan.of_type(UpdateTask)[0].content_hash
+    )
+    assert syncer.sync_state.get(5)["google_status"] == "completed"
+    assert syncer.sync_state.get(6)["notion_status"] == "Done"
+
+
+def test_dry_run_plan_has_no_side_effects(mock_planner):
+    """
+    Test planning leaves the sync state unchanged until the plan is executed, and a
+    dry run planner sends no SMS alert.
+    """
+    planner, mock_notion_client, mock_google_tasks_manager = mock_planner
+    syncer = planner.syncer
+    planner.dry_run = True
+    pages = [parsed_page(2, "Indexed task")]
+    mock_notion_client.iter_database_query.return_value = [{"results": []}]
+    mock_notion_client.iter_parsed_pages.return_value = pages
+    mock_google_tasks_manager.list_task_lists.return_value = {"Work": "list_work"}
+    # The task linked to page 1 was deleted, the task of page 2 is found by title
+    syncer.sync_state.upsert(1, tasklist_id="list_work", task_id="deleted_task")
+    task_2 = {"id": "task_2", "title": "Indexed task | (2)", "status": "needsAction"}
+    mock_google_tasks_manager.list_tasks_in_tasklist.return_value = {
+        task_2["title"]: task_2
+    }
+    mock_google_tasks_manager.get_tasklist_snapshot.return_value = TasklistSnapshot(
+        "list_work", [task_2]
+    )
+    mock_notion_client.retrieve_pages_status.return_value = []
+
+    plan = planner.plan(last_successful_sync=datetime(2024, 1, 1))
+
+    # The task of page 2 has no recorded content yet: its hash is recorded instead
+    assert list(plan) == []
+    assert syncer.sync_state.get(1)["task_id"] == "deleted_task"
+    assert syncer.sync_state.get(2) is None
+    # The plan sees the sync state as it will be once executed
+    assert plan.sync_state_changes.get(1) is None
+    assert plan.sync_state_changes.get(2)["task_id"] == "task_2"
+    assert plan.sync_state_changes.get(2)["content_hash"] is not None
+    assert plan.sync_state_changes.get_by_task_ids(
+        ["task_2", "deleted_task"]
+    ).keys() == {"task_2"}
+
+    with patch.object(
+        syncer, "build_task_description", side_effect=ValueError("Invalid date")
+    ):
+        with pytest.raises(ValueError):
+            planner.plan()
+    syncer.sms_client.send_sms.assert_not_called()
+
+    plan.sync_state_changes.commit()
+    assert syncer.sync_state.get(1) is None
+    assert syncer.sync_state.get(2)["google_status"] == "needsAction"
+
+
+def test_sync_plan_deduplicates_and_serialises():
+    """
+    Test operations are deduplicated by key and survive a JSON round trip.
+    """
+    plan = SyncPlan()
+    assert plan.add(MarkPageDone(page_id=6, google_updated="2024-01-02T00:00:00.000Z"))
+    assert not plan.add(
+        MarkPageDone(page_id=6, google_updated="2024-01-03T00:00:00.000Z")
+    )
+    plan.add(CreateTasklist(name="Home"))
+    plan.add(
+        CreateTask(
+            page_id=2,
+            tasklist_name="Home",
+            title="Task | (2)",
+            notes="Notes",
+            due=None,
+            content_hash="hash",
+        )
+    )
+
+    data = json.loads(plan.to_json())
+    assert data["summary"]["mark_page_done"] == 1
+    assert [operation["kind"] for operation in data["operations"]] == [
+        "create_tasklist",
+        "create_task",
+        "mark_page_done",
+    ]
+    assert list(SyncPlan.from_dict(data)) == list(plan)
+
+    with pytest.raises(ValueError):
+        SyncPlan.from_dict({"operations": [{"kind": "delete_everything"}]})
+
+
+def test_resume_replays_unfinished_operations(mock_planner, tmp_path):
+    """
+    Test an interrupted run is resumed without creating tasks or pages twice.
+    """
+    planner, mock_notion_client, mock_google_tasks_manager = mock_planner
+    syncer = planner.syncer
+    planner.journal = SyncJournal(str(tmp_path / "sync_journal.jsonl"))
+
+    created_task = CreateTask(
+        page_id=1,
+        tasklist_name="Work",
+        tasklist_id="list_work",
+        title="Created | (1)",
+        notes="",
+        due=None,
+        content_hash="hash_1",
+    )
+    lost_task = CreateTask(
+        page_id=2,
+        tasklist_name="Work",
+        tasklist_id="list_work",
+        title="Lost | (2)",
+        notes="",
+        due=None,
+        content_hash="hash_2",
+    )
+    created_page = CreatePage(
+        tasklist_name="Work",
+        tasklist_id="list_work",
+        task_id="task_7",
+        task_title="Created in Google",
+    )
+    plan = SyncPlan()
+    for operation in (created_task, lost_task, created_page):
+        plan.add(operation)
+
+    # The process dies while the batch is in flight
+    mock_google_tasks_manager.queue_create_task.side_effect = ["c1", "c2"]
+    mock_google_tasks_manager.execute_queued_requests.side_effect = KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        planner.execute(plan)
+    planner.journal.record_progress(created_page, notion_page_id=7)
+
+    # Only the first task reached Google Tasks
+    mock_google_tasks_manager.list_task_lists.return_value = {"Work": "list_work"}
+    mock_google_tasks_manager.list_tasks_in_tasklist.return_value = {
+        "Created | (1)": {"id": "task_1"}
+    }
+    resumed_plan = planner.resume()
+
+    assert list(resumed_plan) == [
+        lost_task,
+        dataclasses.replace(created_page, notion_page_id=7),
+    ]
+    assert syncer.sync_state.get(1)["task_id"] == "task_1"
+    assert syncer.sync_state.get(1)["content_hash"] == "hash_1"
+
+    mock_google_tasks_manager.queue_create_task.side_effect = ["c2"]
+    mock_google_tasks_manager.execute_queued_requests.side_effect = None
+    mock_google_tasks_manager.execute_queued_requests.return_value = {
+        "c2": {"response": {"id": "task_2"}, "error": None}
+    }
+    planner.execute(resumed_plan)
+
+    mock_notion_client.create_new_page.assert_not_called()
+    mock_google_tasks_manager.modify_task_title.assert_called_once_with(
+        tasklist_id="list_work", task_id="task_7", new_title="Created in Google | (7)"
+    )
+    assert planner.journal.unfinished() == []
+
+
+def test_execute_journals_recreated_tasks(mock_planner, tmp_path):
+    """
+    Test the creation of a task found deleted by its update is journaled before
+    it is queued, so that an interrupted run creates it once.
+    """
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    planner, _, mock_google_tasks_manager = mock_planner
+    syncer = planner.syncer
+    planner.journal = SyncJournal(str(tmp_path / "sync_journal.jsonl"))
+    syncer.sync_state.upsert(3, tasklist_id="list_work", task_id="deleted_task")
+    plan = SyncPlan()
+    plan.add(
+        UpdateTask(
+            page_id=3,
+            tasklist_id="list_work",
+            task_id="deleted_task",
+            title="Edited | (3)",
+            notes="",
+            due=None,
+            content_hash="hash_3",
+        )
+    )
+    mock_google_tasks_manager.list_task_lists.return_value = {"Work": "list_work"}
+    mock_google_tasks_manager.queue_update_task.return_value = "u3"
+    mock_google_tasks_manager.queue_create_task.return_value = "c3"
+
+    # The process dies while the task is created again
+    mock_google_tasks_manager.execute_queued_requests.side_effect = [
+        {
+            "u3": {
+                "response": None,
+                "error": HttpError(httplib2.Response({"status": 404}), b"{}"),
+            }
+        },
+        KeyboardInterrupt,
+    ]
+    with pytest.raises(KeyboardInterrupt):
+        planner.execute(plan)
+
+    recreated_task = CreateTask(
+        page_id=3,
+        tasklist_name="Work",
+        tasklist_id="list_work",
+        title="Edited | (3)",
+        notes="",
+        due=None,
+        content_hash="hash_3",
+    )
+    assert [entry.operation for entry in planner.journal.unfinished()] == [
+        recreated_task
+    ]
+
+    # The task did not reach Google Tasks: it is created by the resumed run only
+    mock_google_tasks_manager.list_tasks_in_tasklist.return_value = {}
+    resumed_plan = planner.resume()
+    assert list(resumed_plan) == [recreated_task]
+
+    mock_google_tasks_manager.execute_queued_requests.side_effect = None
+    mock_google_tasks_manager.execute_queued_requests.return_value = {
+        "c3": {"response": {"id": "task_3"}, "error": None}
+    }
+    planner.execute(resumed_plan)
+
+    assert mock_google_tasks_manager.queue_create_task.call_count == 2
+    assert syncer.sync_state.get(3)["task_id"] == "task_3"
+    assert planner.journal.unfinished() == []
@@ -0,0 +1,54 @@
+import pstats
+from datetime import datetime, timedelta
+
+from rich.console import Console
+
+from services.common.profiling import RunProfiler
+from services.sync_notion_google_task.async_syncer import (
+    AsyncNotionToGoogleTaskSyncer,
+)
+from tests.stubs import GoogleTasksStubServer, NotionStubServer
+from tests.stubs.environment import build_stub_syncer
+
+
+def test_run_profiler_reports_worker_threads(tmp_path):
+    """
+    Test a profiled run writes its reports, with the calls made in worker threads.
+    """
+    with NotionStubServer() as notion_stub, GoogleTasksStubServer() as google_stub:
+        for index in range(5):
+            notion_stub.add_page(f"Page {index}", tag="Work")
+        syncer = build_stub_syncer(
+            notion_stub,
+            google_stub,
+            str(tmp_path / "project"),
+            syncer_class=AsyncNotionToGoogleTaskSyncer,
+            verbose=False,
+        )
+        profiler = RunProfiler(str(tmp_path / "profiles"), top=5)
+        try:
+            with profiler:
+                syncer.sync_pages_to_google_tasks(
+                    last_successful_sync=datetime.utcnow() - timedelta(hours=1)
+                )
+        finally:
+            syncer.close()
+
+    # The async engine parses the pages in worker threads only
+    functions = {
+        function for _, _, function in pstats.Stats(profiler.profile_path).stats
+    }
+    assert "iter_parsed_pages" in functions
+    assert "_sync_parsed_pages" in functions
+
+    allocations = (tmp_path / "profiles").glob("*-allocations.txt")
+    report = next(allocations).read_text().splitlines()
+    assert report[0].startswith("Peak traced memory:")
+    assert 1 <= len(report[2:]) <= 5
+
+    hottest = profiler.hottest_functions()
+    assert 1 <= len(hottest) <= 5
+    assert all(location.startswith("services/") for location, _, _, _ in hottest)
+    console = Console(record=True, width=200)
+    profiler.print_summary(console)
+    assert "Hottest functions" in console.export_text()
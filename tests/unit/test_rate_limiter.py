@@ -0,0 +1,47 @@
+from services.notion.src.rate_limiter import TokenBucketRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_limits_rate_after_burst():
+    """Test requests beyond the burst are spaced at the configured rate."""
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(rate=2, burst=2, clock=clock, sleep=clock.sleep)
+
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0.5
+    assert limiter.acquire() == 0.5
+
+
+def test_token_bucket_pause_honours_retry_after():
+    """Test a pause blocks every request until the delay has elapsed."""
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(rate=3, burst=3, clock=clock, sleep=clock.sleep)
+
+    limiter.pause(5)
+    assert limiter.acquire() == 5
+
+
+def test_token_bucket_shared_through_lock_file(tmp_path):
+    """Test limiters using the same lock file share one budget."""
+    clock = FakeClock()
+    lock_file = str(tmp_path / "notion_rate.lock")
+    first = TokenBucketRateLimiter(
+        rate=1, burst=1, lock_file=lock_file, clock=clock, sleep=clock.sleep
+    )
+    second = TokenBucketRateLimiter(
+        rate=1, burst=1, lock_file=lock_file, clock=clock, sleep=clock.sleep
+    )
+
+    assert first.acquire() == 0
+    assert second.acquire() == 1
@@ -0,0 +1,57 @@
+import pytest
+
+from services.common.retry import RetryPolicy
+
+
+def make_policy(**kwargs):
+    delays = []
+    policy = RetryPolicy(sleep=delays.append, jitter=lambda low, high: high, **kwargs)
+    return policy, delays
+
+
+def test_retry_policy_backs_off_exponentially_with_cap():
+    """Test delays double per attempt up to max_delay and honour Retry-After."""
+    policy, _ = make_policy(base_delay=1, max_delay=3)
+
+    assert [policy.backoff(attempt) for attempt in range(1, 5)] == [1, 2, 3, 3]
+    assert policy.backoff(1, retry_after=10) == 10
+
+
+def test_retry_policy_retries_until_success():
+    """Test transient failures are retried and counted per call site."""
+    policy, delays = make_policy(max_attempts=4, base_delay=1)
+    outcomes = iter([ConnectionError("reset"), ConnectionError("reset"), "ok"])
+
+    def flaky_call():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    result = policy.call(
+        "GET /v1/pages/{id}",
+        flaky_call,
+        lambda result, error: 0.0 if error else None,
+    )
+
+    assert result == "ok"
+    assert delays == [1, 2]
+    assert policy.counters["GET /v1/pages/{id}"] == {
+        "calls": 1,
+        "retries": 2,
+        "failures": 0,
+    }
+
+
+def test_retry_policy_gives_up_after_max_attempts():
+    """Test the last error is raised once attempts run out."""
+    policy, delays = make_policy(max_attempts=2)
+
+    def failing_call():
+        raise TimeoutError("timed out")
+
+    with pytest.raises(TimeoutError):
+        policy.call("site", failing_call, lambda result, error: 0.0)
+
+    assert len(delays) == 1
+    assert policy.counters["site"]["failures"] == 1
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from tests.stubs import GoogleTasksStubServer, NotionStubServer
+from tests.stubs.environment import build_stub_syncer
+
+
+@pytest.fixture
+def stubs():
+    with NotionStubServer() as notion_stub, GoogleTasksStubServer() as google_stub:
+        yield notion_stub, google_stub
+
+
+def test_sync_round_trip_against_stub_servers(stubs, tmp_path):
+    """
+    Test both sync directions end to end over HTTP, with paginated responses.
+    """
+    notion_stub, google_stub = stubs
+    for index in range(150):
+        notion_stub.add_page(f"Page {index}", tag=["Work", "Home"][index % 2])
+    notion_stub.add_page("Already done", tag="Work", status="Done")
+    notion_stub.add_page("Not for today", tag="Work", today=False)
+
+    syncer = build_stub_syncer(notion_stub, google_stub, str(tmp_path), verbose=False)
+    last_sync = datetime.utcnow() - timedelta(hours=1)
+    try:
+        syncer.sync_pages_to_google_tasks(last_successful_sync=last_sync)
+
+        tasks = {
+            task["title"]: task
+            for tasks in google_stub.tasks.values()
+            for task in tasks.values()
+        }
+        assert len(tasks) == 150
+        assert "Page 0 | (1)" in tasks
+        assert {tasklist["title"] for tasklist in google_stub.tasklists.values()} == {
+            "Work",
+            "Home",
+        }
+        # 150 pages are fetched in two result pages, and tasks created in batches
+        assert notion_stub.request_counts["POST /v1/databases/{database_id}/query"] == 2
+        assert google_stub.batch_requests == 3
+
+        work_list_id = next(
+            tasklist["id"]
+            for tasklist in google_stub.tasklists.values()
+            if tasklist["title"] == "Work"
+        )
+        google_stub.tasks[work_list_id][tasks["Page 0 | (1)"]["id"]][
+            "status"
+        ] = "completed"
+        new_task = google_stub.add_task(work_list_id, "Created in Google")
+
+        syncer.sync_google_tasks_to_notion(last_successful_sync=last_sync)
+    finally:
+        syncer.close()
+
+    assert notion_stub.page_status(1) == "Done"
+    created_page = notion_stub.pages_by_unique_id[153]
+    assert created_page["properties"]["FromTask"] == {"checkbox": True}
+    assert google_stub.tasks[work_list_id][new_task["id"]]["title"] == (
+        "Created in Google | (153)"
+    )
+
+
+def test_stub_servers_inject_rate_limits(tmp_path):
+    """
+    Test injected 429 responses are retried by the clients.
+    """
+    with NotionStubServer(rate_limit_every=2) as notion_stub, GoogleTasksStubServer(
+        rate_limit_every=2
+    ) as google_stub:
+        for index in range(5):
+            notion_stub.add_page(f"Page {index}", tag="Work")
+        notion_stub.add_page("Done in Notion", tag="Work")
+        syncer = build_stub_syncer(
+            notion_stub, google_stub, str(tmp_path), verbose=False
+        )
+        last_sync = datetime.utcnow() - timedelta(hours=1)
+        try:
+            syncer.sync_pages_to_google_tasks(last_successful_sync=last_sync)
+        finally:
+            syncer.close()
+
+        # The next run aligns the status changed in Notion since
+        notion_stub.pages_by_unique_id[6]["properties"]["Status"] = {
+            "status": {"name": "Done"}
+        }
+        syncer = build_stub_syncer(
+            notion_stub, google_stub, str(tmp_path), verbose=False
+        )
+        try:
+            syncer.sync_google_tasks_to_notion(last_successful_sync=last_sync)
+        finally:
+            syncer.close()
+
+    assert notion_stub.rate_limited_count > 0
+    assert google_stub.rate_limited_count > 0
+    tasks = [task for tasks in google_stub.tasks.values() for task in tasks.values()]
+    assert len(tasks) == 6
+    assert [task["title"] for task in tasks if task["status"] == "completed"] == [
+        "Done in Notion | (6)"
+    ]
+    assert syncer.retry_policy.counters["POST /v1/databases/{id}/query"]["retries"] > 0
+
+
+def test_sync_recreates_deleted_google_tasks(stubs, tmp_path):
+    """
+    Test a Google Task deleted by the user is created again when its page is edited,
+    although the sync state still links the page to it.
+    """
+    notion_stub, google_stub = stubs
+    notion_stub.add_page("Page", tag="Work")
+    last_sync = datetime.utcnow() - timedelta(hours=1)
+    syncer = build_stub_syncer(notion_stub, google_stub, str(tmp_path), verbose=False)
+    try:
+        syncer.sync_pages_to_google_tasks(last_successful_sync=last_sync)
+    finally:
+        syncer.close()
+
+    for tasks in google_stub.tasks.values():
+        tasks.clear()
+    notion_stub.pages_by_unique_id[1]["properties"]["Name"] = {
+        "title": [{"text": {"content": "Edited page"}}]
+    }
+    syncer = build_stub_syncer(notion_stub, google_stub, str(tmp_path), verbose=False)
+    try:
+        syncer.sync_pages_to_google_tasks(last_successful_sync=last_sync)
+        linked_task_id = syncer.sync_state.get(1)["task_id"]
+    finally:
+        syncer.close()
+
+    tasks = [task for tasks in google_stub.tasks.values() for task in tasks.values()]
+    assert [task["title"] for task in tasks] == ["Edited page | (1)"]
+    assert linked_task_id == tasks[0]["id"]
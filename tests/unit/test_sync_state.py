@@ -0,0 +1,52 @@
+import pytest
+
+from services.sync_notion_google_task.sync_state import SyncStateStore
+
+
+def test_sync_state_partial_upserts():
+    """
+    Test records are created and updated field by field, and found by task ID.
+    """
+    store = SyncStateStore(":memory:")
+    assert store.get(1) is None
+
+    store.upsert(1, page_id="page_1", notion_status="In progress")
+    store.upsert_many(
+        {
+            1: {"tasklist_id": "list_1", "task_id": "task_1"},
+            2: {"tasklist_id": "list_1", "task_id": "task_2"},
+        }
+    )
+    store.upsert(1, notion_status="Done")
+
+    record = store.get(1)
+    assert record["page_id"] == "page_1"
+    assert record["notion_status"] == "Done"
+    assert record["task_id"] == "task_1"
+    assert record["content_hash"] is None
+    assert set(store.get_many([1, 2, 3])) == {1, 2}
+    assert store.get_by_task_ids(["task_2", "unknown"])["task_2"]["unique_id"] == 2
+
+    store.delete(2)
+    assert store.get(2) is None
+
+    with pytest.raises(ValueError):
+        store.upsert(1, title="Not a sync state field")
+
+
+def test_sync_state_persists_and_disables_on_error(tmp_path):
+    """
+    Test records survive reopening the database, and an unusable path only
+    disables the store.
+    """
+    db_path = tmp_path / "state" / "sync_state.sqlite3"
+    store = SyncStateStore(str(db_path))
+    store.upsert(1, task_id="task_1")
+    store.close()
+    assert SyncStateStore(str(db_path)).get(1)["task_id"] == "task_1"
+
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    disabled = SyncStateStore(str(blocker / "sync_state.sqlite3"))
+    disabled.upsert(1, task_id="task_1")
+    assert disabled.get(1) is None
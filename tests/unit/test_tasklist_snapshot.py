@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from services.google_task.src.tasklist_snapshot import TasklistSnapshot
+
+TASKS = [
+    {
+        "title": "Old active | (1)",
+        "id": "1",
+        "status": "needsAction",
+        "updated": "2023-11-01T12:00:00.000Z",
+        "due": None,
+    },
+    {
+        "title": "Old completed | (2)",
+        "id": "2",
+        "status": "completed",
+        "completed": "2023-11-01T12:00:00.000Z",
+        "updated": "2023-11-01T12:00:00.000Z",
+    },
+    {
+        "title": "New task",
+        "id": "3",
+        "status": "needsAction",
+        "updated": "2023-11-06T12:00:00.000Z",
+        "due": "2023-11-10T00:00:00.000Z",
+    },
+    {
+        "title": "Completed | (4)",
+        "id": "4",
+        "status": "completed",
+        "completed": "2023-11-06T12:00:00.000Z",
+        "updated": "2023-11-06T12:00:00.000Z",
+    },
+]
+
+
+def test_tasklist_snapshot_views():
+    """
+    Test the created, completed and active views apply the filters of the listings
+    they replace.
+    """
+    snapshot = TasklistSnapshot("list_1", TASKS)
+    last_checked = datetime(2023, 11, 5)
+
+    assert list(snapshot.created_since(last_checked)) == ["New task", "Completed | (4)"]
+    assert snapshot.created_since(last_checked)["New task"] == {
+        "id": "3",
+        "status": "needsAction",
+        "completed": None,
+        "updated": "2023-11-06T12:00:00.000Z",
+        "due": "2023-11-10T00:00:00.000Z",
+    }
+    assert list(snapshot.created_since(last_checked, only_needs_action=True)) == [
+        "New task"
+    ]
+    assert snapshot.completed_since(last_checked) == {
+        "Completed | (4)": {
+            "id": "4",
+            "status": "completed",
+            "completed": "2023-11-06T12:00:00.000Z",
+            "updated": "2023-11-06T12:00:00.000Z",
+        }
+    }
+    assert list(snapshot.active()) == ["Old active | (1)", "New task"]
+
+
+def test_tasklist_snapshot_updated_min_is_inclusive():
+    """
+    Test tasks updated exactly at the last check are included, for naive and aware
+    timestamps alike.
+    """
+    from datetime import timezone
+
+    snapshot = TasklistSnapshot("list_1", TASKS)
+    naive = datetime(2023, 11, 6, 12)
+    aware = datetime(2023, 11, 6, 12, tzinfo=timezone.utc)
+
+    assert list(snapshot.created_since(naive)) == ["New task", "Completed | (4)"]
+    assert snapshot.created_since(aware) == snapshot.created_since(naive)
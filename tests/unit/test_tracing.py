@@ -0,0 +1,109 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.common.tracing import Tracer
+from tests.stubs import GoogleTasksStubServer, NotionStubServer
+from tests.stubs.environment import build_stub_syncer
+
+
+def test_tracer_writes_chrome_trace(tmp_path):
+    """
+    Test spans are nested, recorded on errors and written in the Chrome trace format.
+    """
+    tracer = Tracer(name="test")
+    with tracer.span("sync", mode="full") as span:
+        assert list(tracer.iter_spans("fetch", iter(["a", "b"]))) == ["a", "b"]
+        span.set_attribute("pages", 2)
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError()
+
+    def work():
+        with tracer.span("worker"):
+            pass
+
+    worker = threading.Thread(target=work, name="worker-thread")
+    worker.start()
+    worker.join()
+
+    trace_path = tmp_path / "trace.json"
+    tracer.write(str(trace_path))
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    # The producing of each item and the end of the iteration are timed
+    assert [event["name"] for event in spans] == [
+        "sync",
+        "fetch",
+        "fetch",
+        "fetch",
+        "failing",
+        "worker",
+    ]
+    sync = spans[0]
+    assert sync["args"] == {"mode": "full", "pages": 2}
+    assert spans[1]["args"] == {"index": 0}
+    for fetch in spans[1:4]:
+        assert sync["ts"] <= fetch["ts"]
+        assert fetch["ts"] + fetch["dur"] <= sync["ts"] + sync["dur"]
+    assert spans[-1]["tid"] != sync["tid"]
+    thread_names = {
+        event["tid"]: event["args"]["name"]
+        for event in events
+        if event["name"] == "thread_name"
+    }
+    assert thread_names[spans[-1]["tid"]] == "worker-thread"
+
+    disabled = Tracer(enabled=False)
+    with disabled.span("sync") as span:
+        span.set_attribute("pages", 1)
+    assert disabled.spans == []
+    assert disabled.to_chrome_trace()["traceEvents"][1:] == []
+
+
+def test_syncer_traces_sync_phases(tmp_path):
+    """
+    Test the phases of both sync directions are traced against the stub servers.
+    """
+    with NotionStubServer() as notion_stub, GoogleTasksStubServer() as google_stub:
+        parent = notion_stub.add_page("Project", tag="Work", today=False)
+        notion_stub.add_page("Child", tag="Work", parent_page_id=parent["id"])
+        notion_stub.add_page("Page", tag="Home")
+        tracer = Tracer()
+        last_sync = datetime.utcnow() - timedelta(hours=1)
+        syncer = build_stub_syncer(
+            notion_stub, google_stub, str(tmp_path), verbose=False, tracer=tracer
+        )
+        try:
+            syncer.sync_pages_to_google_tasks(last_successful_sync=last_sync)
+            work_list_id = next(
+                tasklist["id"]
+                for tasklist in google_stub.tasklists.values()
+                if tasklist["title"] == "Work"
+            )
+            google_stub.add_task(work_list_id, "Created in Google - Project")
+            syncer.sync_google_tasks_to_notion(last_successful_sync=last_sync)
+        finally:
+            syncer.close()
+
+    names = [span.name for span in tracer.spans]
+    for name in (
+        "sync_pages_to_google_tasks",
+        "notion.fetch",
+        "notion.parse",
+        "notion.resolve_parents",
+        "google.build_task_index",
+        "google.write_tasks",
+        "sync_google_tasks_to_notion",
+        "notion.create_page",
+        "notion.find_parent",
+    ):
+        assert name in names
+    # The three steps run once per task list, whose name is hidden without verbose
+    steps = [span for span in tracer.spans if span.name.startswith("tasklist.")]
+    assert len(steps) == 3 * 2
+    assert all("tasklist" not in span.attributes for span in steps)
+    parse = next(span for span in tracer.spans if span.name == "notion.parse")
+    assert parse.attributes == {"pages": 2}
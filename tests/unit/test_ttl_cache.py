@@ -0,0 +1,46 @@
+from services.notion.src.ttl_cache import MISSING, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expiry_and_lru_eviction():
+    """Test entries expire after their TTL and the least recently used are evicted."""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+
+    cache.set("a", "Parent A")
+    cache.set("b", None)
+    assert cache.get("b") is None
+    assert cache.get("a") == "Parent A"
+
+    # "b" is now the least recently used entry
+    cache.set("c", "Parent C")
+    assert cache.get("b") is MISSING
+    assert "a" in cache and "c" in cache
+
+    clock.now += 11
+    assert cache.get("a", "expired") == "expired"
+
+
+def test_ttl_cache_persistence(tmp_path):
+    """Test unexpired entries survive a save and load cycle."""
+    clock = FakeClock()
+    path = str(tmp_path / "cache" / "parent_page_names.json")
+    cache = TTLCache(ttl=10, path=path, clock=clock)
+    cache.set("a", "Parent A")
+    cache.save()
+
+    reloaded = TTLCache(ttl=10, path=path, clock=clock)
+    reloaded.load()
+    assert reloaded.get("a") == "Parent A"
+
+    clock.now += 11
+    expired = TTLCache(ttl=10, path=path, clock=clock)
+    expired.load()
+    assert len(expired) == 0